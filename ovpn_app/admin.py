@@ -10,6 +10,7 @@ from django.utils.html import format_html
 from .models import (
     CertificateAuthority,
     ClientCertificate,
+    ClientCertificateMaterial,
     OpenVPNServer,
     ServerTask,
     VPNConnection,
@@ -172,6 +173,13 @@ class CertificateAuthorityAdmin(admin.ModelAdmin):
     is_valid_status.short_description = "Статус"  # type: ignore[attr-defined]
 
 
+class ClientCertificateMaterialInline(admin.StackedInline):
+    model = ClientCertificateMaterial
+    can_delete = False
+    classes = ("collapse",)
+    verbose_name_plural = "Сертификат и ключ"
+
+
 @admin.register(ClientCertificate)
 class ClientCertificateAdmin(admin.ModelAdmin):
     list_display = [
@@ -187,11 +195,11 @@ class ClientCertificateAdmin(admin.ModelAdmin):
     list_filter = ["status", "server", "created_at"]
     search_fields = ["name", "email", "server__name"]
     readonly_fields = ["created_at", "expires_at", "revoked_at"]
+    inlines = [ClientCertificateMaterialInline]
 
     fieldsets = (
         ("Информация о клиенте", {"fields": ("name", "email", "description", "server")}),
         ("Статус сертификата", {"fields": ("status", "created_at", "expires_at", "revoked_at")}),
-        ("Сертификат и ключ", {"fields": ("client_cert", "client_key"), "classes": ("collapse",)}),
         (
             "Метаданные",
             {
@@ -211,10 +219,7 @@ class ClientCertificateAdmin(admin.ModelAdmin):
     actions = ["revoke_certificates"]
 
     def revoke_certificates(self, request, queryset):
-        count = 0
-        for cert in queryset.filter(status="active"):
-            cert.revoke()
-            count += 1
+        count = ClientCertificate.bulk_revoke(queryset.values_list("pk", flat=True))
 
         self.message_user(request, f"Отозвано {count} сертификатов.")
 
@@ -5,7 +5,7 @@ Autonomous agent for executing OpenVPN commands on remote servers
 without SSH overhead and timeout issues.
 """
 
-from .client import AgentClient
+from .client import AgentClient, new_task_id
 from .deployment import AgentDeployer
 
-__all__ = ["AgentClient", "AgentDeployer"]
+__all__ = ["AgentClient", "AgentDeployer", "new_task_id"]
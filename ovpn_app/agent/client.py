@@ -6,6 +6,7 @@ Client for interacting with ovpn-agent on remote servers
 
 import json
 import logging
+import os
 from typing import Dict, Optional
 
 from ..models import OpenVPNServer
@@ -14,6 +15,11 @@ from ..ssh_service import SSHCredentials, SSHService
 logger = logging.getLogger(__name__)
 
 
+def new_task_id() -> str:
+    """Random 32-character hex task identifier for agent calls"""
+    return os.urandom(16).hex()
+
+
 class AgentClient:
     """Client for executing commands via agent"""
 
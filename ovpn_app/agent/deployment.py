@@ -4,14 +4,32 @@ Agent Deployment Module
 Automatically deploys and manages ovpn-agent on remote OpenVPN servers
 """
 
+import asyncio
+import hashlib
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
 
 from ..ssh_service import CommandResult, SSHCredentials, SSHService
 
 logger = logging.getLogger(__name__)
 
+DeployKey = Tuple[str, int, str, str]
+
+# Hosts this process already deployed the current agent to, keyed by
+# (host, port, user, agent digest); services are created per request
+_deployed: Set[DeployKey] = set()
+# Deploys in progress, so concurrent callers share one upload
+_deploying: Dict[DeployKey, "asyncio.Task[CommandResult]"] = {}
+
+
+@lru_cache(maxsize=4)
+def _agent_source(agent_path: Path) -> Tuple[str, str]:
+    """Read the agent code once and return it with its SHA-256 digest"""
+    agent_code = agent_path.read_text()
+    return agent_code, hashlib.sha256(agent_code.encode()).hexdigest()
+
 
 class AgentDeployer:
     """Deploy and manage agent on remote servers"""
@@ -64,8 +82,7 @@ class AgentDeployer:
                 success=False,
             )
 
-        with open(self.agent_path) as f:
-            agent_code = f.read()
+        agent_code, digest = _agent_source(self.agent_path)
 
         # Deploy agent in single SSH command (batched)
         temp_path = "/tmp/ovpn-agent.py"
@@ -83,6 +100,7 @@ sudo chown root:root /usr/local/bin/ovpn-agent"""
             return result
 
         logger.info("Agent deployed successfully")
+        _deployed.add(self._deploy_key(credentials, digest))
 
         return CommandResult(
             stdout="Agent deployed to /usr/local/bin/ovpn-agent",
@@ -91,6 +109,43 @@ sudo chown root:root /usr/local/bin/ovpn-agent"""
             success=True,
         )
 
+    @staticmethod
+    def _deploy_key(credentials: SSHCredentials, digest: str) -> DeployKey:
+        return (credentials.hostname, credentials.port, credentials.username, digest)
+
+    async def ensure_agent(self, credentials: SSHCredentials) -> CommandResult:
+        """
+        Deploy agent unless this process already deployed the current version
+
+        Concurrent calls for the same server wait for a single deploy.
+
+        Args:
+            credentials: SSH credentials
+
+        Returns:
+            CommandResult
+        """
+        if not self.agent_path.exists():
+            # deploy_agent reports the missing file
+            return await self.deploy_agent(credentials)
+
+        key = self._deploy_key(credentials, _agent_source(self.agent_path)[1])
+        if key in _deployed:
+            return CommandResult(
+                stdout="Agent already deployed", stderr="", exit_code=0, success=True
+            )
+
+        loop = asyncio.get_running_loop()
+        task = _deploying.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self.deploy_agent(credentials))
+            _deploying[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and _deploying.get(key) is task:
+                del _deploying[key]
+
     async def install_agent_service(self, credentials: SSHCredentials) -> CommandResult:
         """
         Install agent as systemd service
@@ -158,6 +213,8 @@ WantedBy=multi-user.target
             CommandResult
         """
         logger.info("Removing agent")
+        host = (credentials.hostname, credentials.port, credentials.username)
+        _deployed.difference_update({key for key in _deployed if key[:3] == host})
 
         commands = [
             "sudo systemctl stop ovpn-agent 2>/dev/null || true",
@@ -50,15 +50,13 @@ def create_client(request, server_id: int) -> Response:
         # Create client certificate via agent (run async in sync context)
         client_data = asyncio.run(service.create_client(client_name))
 
-        # Save client to database (1 year expiration)
+        # Save client to database (1 year expiration); cert and key are managed by agent
         expires_at = timezone.now() + timedelta(days=365)
 
-        client = ClientCertificate.objects.create(
+        client = ClientCertificate.objects.create_with_material(
             server=server,
             name=client_name,
             email=request.data.get("email", ""),
-            client_cert="",  # Cert managed by agent
-            client_key="",  # Key managed by agent
             expires_at=expires_at,
             created_by=request.user,
         )
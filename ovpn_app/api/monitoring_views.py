@@ -72,20 +72,25 @@ def update_all_connections(request) -> Response:
     """
     try:
         # Update all servers
-        servers = OpenVPNServer.objects.filter(status="running")
+        servers = list(OpenVPNServer.objects.filter(status="running"))
+        services = [MonitoringService(server) for server in servers]
+
+        async def get_all_statuses() -> list:
+            """Query every server's agent concurrently"""
+            return await asyncio.gather(
+                *(service.get_status() for service in services), return_exceptions=True
+            )
 
         total_connections = 0
-        for server in servers:
-            service = MonitoringService(server)
-            try:
-                status_data = asyncio.run(service.get_status())
-                total_connections += len(status_data.get("connections", []))
-            except Exception as e:
-                logger.warning(f"Failed to get status for server {server.name}: {e}")
+        for server, status_data in zip(servers, asyncio.run(get_all_statuses())):
+            if isinstance(status_data, Exception):
+                logger.warning(f"Failed to get status for server {server.name}: {status_data}")
+                continue
+            total_connections += len(status_data.get("connections", []))
 
         return BaseAPIView.success_response(
             "All connections updated",
-            data={"total_connections": total_connections, "active_servers": servers.count()},
+            data={"total_connections": total_connections, "active_servers": len(servers)},
         )
 
     except Exception as e:
@@ -432,8 +432,9 @@ def check_server_status(request, server_id: int) -> Response:
 
         # Check status
         async def check_status_async():
-            status_result = await monitor.check_server_status()
-            await monitor.update_server_status()
+            async with monitor.session():
+                status_result = await monitor.check_server_status()
+                await monitor.update_server_status()
             return status_result
 
         status_result = asyncio.run(check_status_async())
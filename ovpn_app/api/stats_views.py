@@ -9,6 +9,7 @@ from typing import Any, Dict, List
 
 from django.db.models import Sum
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -103,8 +104,9 @@ def get_server_stats(request, server_id: int) -> Response:
             Returns:
                 Tuple of (uptime, load)
             """
-            uptime = await monitor.get_openvpn_uptime()
-            load = await monitor.get_system_load()
+            async with monitor.session():
+                uptime = await monitor.get_openvpn_uptime()
+                load = await monitor.get_system_load()
             return uptime, load
 
         # Run async function
@@ -116,6 +118,7 @@ def get_server_stats(request, server_id: int) -> Response:
         # Calculate statistics
         total_bandwidth = 0
         connections_data: List[Dict[str, Any]] = []
+        now = timezone.now()
 
         for conn in connections:
             # Calculate data transfer
@@ -133,7 +136,7 @@ def get_server_stats(request, server_id: int) -> Response:
                     "client_name": conn.client.name,
                     "virtual_ip": conn.virtual_ip,
                     "real_ip": conn.client_ip,
-                    "duration": conn.format_duration(),
+                    "duration": conn.format_duration(now),
                     "data_transfer": data_transfer,
                     "bytes_received": conn.bytes_received,
                     "bytes_sent": conn.bytes_sent,
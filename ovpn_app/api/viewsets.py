@@ -13,7 +13,7 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from ..models import ClientCertificate, OpenVPNServer, ServerTask
+from ..models import ClientCertificate, ClientCertificateMaterial, OpenVPNServer, ServerTask
 from ..services.monitoring_service import MonitoringService
 from ..services.server_service import ServerManagementService
 from ..ssh_service import SSHCredentials, SSHService
@@ -160,10 +160,28 @@ class ClientCertificateViewSet(viewsets.ModelViewSet):
         from rest_framework import serializers
 
         class ClientCertificateSerializer(serializers.ModelSerializer):
+            # PEM material lives in ClientCertificateMaterial
+            client_cert = serializers.CharField(source="material.client_cert")
+            client_key = serializers.CharField(source="material.client_key")
+
             class Meta:
                 model = ClientCertificate
                 fields = "__all__"
 
+            def create(self, validated_data):
+                material = validated_data.pop("material", {})
+                return ClientCertificate.objects.create_with_material(**validated_data, **material)
+
+            def update(self, instance, validated_data):
+                material = validated_data.pop("material", {})
+                instance = super().update(instance, validated_data)
+                if material:
+                    ClientCertificateMaterial.objects.update_or_create(
+                        cert=instance, defaults=material
+                    )
+                    instance.refresh_from_db()
+                return instance
+
         return ClientCertificateSerializer
 
     def perform_create(self, serializer):
@@ -242,6 +260,7 @@ class ClientCertificateViewSet(viewsets.ModelViewSet):
             str: OpenVPN configuration file content
         """
         server = client.server
+        material = client.material
 
         config = f"""client
 dev tun
@@ -256,15 +275,15 @@ auth SHA256
 verb 3
 
 <ca>
-{client.ca_cert}
+{server.ca.ca_cert}
 </ca>
 
 <cert>
-{client.client_cert}
+{material.client_cert}
 </cert>
 
 <key>
-{client.client_key}
+{material.client_key}
 </key>
 """
         return config
@@ -2,7 +2,13 @@
 Django app configuration for OpenVPN management
 """
 
+import asyncio
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class OvpnAppConfig(AppConfig):
@@ -16,3 +22,16 @@ class OvpnAppConfig(AppConfig):
             pass
         except ImportError:
             pass
+
+        if getattr(settings, "USE_UVLOOP", False):
+            self._install_uvloop()
+
+    @staticmethod
+    def _install_uvloop():
+        """Make event loops created from now on (asyncio.run in views) use uvloop"""
+        try:
+            import uvloop
+        except ImportError:
+            logger.debug("uvloop is not installed, using the default asyncio loop")
+            return
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
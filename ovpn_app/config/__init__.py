@@ -4,6 +4,9 @@ Centralized configuration following Clean Code principles
 """
 
 from .constants import *
-from .agent_config import AgentConfig
+from .agent_config import AgentConfig, server_agent_config
 
-__all__ = ['AgentConfig', 'DEFAULT_SUBNET', 'DEFAULT_NETMASK', 'OVPN_CONFIG_PATH']
+__all__ = [
+    'AgentConfig', 'server_agent_config',
+    'DEFAULT_SUBNET', 'DEFAULT_NETMASK', 'OVPN_CONFIG_PATH',
+]
@@ -3,8 +3,10 @@ Agent configuration dataclass
 Type-safe configuration for agent operations
 """
 
+import copy
 from dataclasses import dataclass, field
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -50,3 +52,21 @@ class AgentConfig:
             netmask=server.server_netmask,
             dns_servers=server.get_dns_servers_list(),
         )
+
+
+# Agent config dict per server id, valid while the server's updated_at is unchanged
+_config_cache: Dict[int, Tuple[datetime, dict]] = {}
+
+
+def server_agent_config(server) -> dict:
+    """
+    Agent config dict for a server, rebuilt only after the server is saved again
+
+    Returns a fresh copy on every call, so callers may add keys to it.
+    """
+    cached = _config_cache.get(server.pk)
+    if cached is None or cached[0] != server.updated_at:
+        cached = (server.updated_at, copy.deepcopy(AgentConfig.from_server(server).to_dict()))
+        if server.pk is not None:
+            _config_cache[server.pk] = cached
+    return copy.deepcopy(cached[1])
@@ -6,7 +6,7 @@ Provides domain-specific exceptions and Result pattern for better error handling
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable, Generic, Optional, TypeVar
+from typing import Any, Callable, Generic, Optional, Tuple, TypeVar
 
 # Type variable for Result pattern
 T = TypeVar("T")
@@ -27,13 +27,43 @@ class ErrorSeverity(Enum):
 
 
 class OpenVPNAppError(Exception):
-    """Base exception for all application errors"""
+    """
+    Base exception for all application errors
+
+    Subclasses keep their raw fields and override ``_format_message``; the text is
+    only built (once) when the exception is rendered, so errors that are caught and
+    dropped never pay for string formatting. Subclasses pass their constructor
+    arguments as ``fields`` so ``args``, ``repr()`` and pickling keep working.
+    """
 
-    def __init__(self, message: str, severity: ErrorSeverity = ErrorSeverity.ERROR):
-        super().__init__(message)
-        self.message = message
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        severity: ErrorSeverity = ErrorSeverity.ERROR,
+        fields: Tuple[Any, ...] = (),
+    ):
+        super().__init__(*((message,) if message is not None else fields))
+        self._message = message
         self.severity = severity
 
+    def _format_message(self) -> str:
+        """Build the human readable message from the stored fields"""
+        return ""
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self._format_message()
+        return self._message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def _with_reason(message: str, reason: str) -> str:
+    """Append an optional reason to an error message"""
+    return f"{message}: {reason}" if reason else message
+
 
 # ============================================================================
 # SSH Exceptions
@@ -49,10 +79,11 @@ class SSHConnectionError(SSHError):
 
     def __init__(self, host: str, message: str = ""):
         self.host = host
-        full_message = f"Failed to connect to {host}"
-        if message:
-            full_message += f": {message}"
-        super().__init__(full_message, ErrorSeverity.ERROR)
+        self.reason = message
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(host, message))
+
+    def _format_message(self) -> str:
+        return _with_reason(f"Failed to connect to {self.host}", self.reason)
 
 
 class SSHAuthenticationError(SSHError):
@@ -61,7 +92,10 @@ class SSHAuthenticationError(SSHError):
     def __init__(self, host: str, username: str):
         self.host = host
         self.username = username
-        super().__init__(f"Authentication failed for {username}@{host}", ErrorSeverity.ERROR)
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(host, username))
+
+    def _format_message(self) -> str:
+        return f"Authentication failed for {self.username}@{self.host}"
 
 
 class SSHCommandError(SSHError):
@@ -71,10 +105,12 @@ class SSHCommandError(SSHError):
         self.command = command
         self.exit_code = exit_code
         self.stderr = stderr
-        message = f"Command '{command}' failed with exit code {exit_code}"
-        if stderr:
-            message += f": {stderr}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(command, exit_code, stderr))
+
+    def _format_message(self) -> str:
+        return _with_reason(
+            f"Command '{self.command}' failed with exit code {self.exit_code}", self.stderr
+        )
 
 
 class SSHTimeoutError(SSHError):
@@ -83,9 +119,10 @@ class SSHTimeoutError(SSHError):
     def __init__(self, operation: str, timeout: int):
         self.operation = operation
         self.timeout = timeout
-        super().__init__(
-            f"SSH operation '{operation}' timed out after {timeout} seconds", ErrorSeverity.ERROR
-        )
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(operation, timeout))
+
+    def _format_message(self) -> str:
+        return f"SSH operation '{self.operation}' timed out after {self.timeout} seconds"
 
 
 # ============================================================================
@@ -102,9 +139,10 @@ class OpenVPNNotInstalledError(OpenVPNError):
 
     def __init__(self, server_name: str):
         self.server_name = server_name
-        super().__init__(
-            f"OpenVPN is not installed on server '{server_name}'", ErrorSeverity.WARNING
-        )
+        super().__init__(severity=ErrorSeverity.WARNING, fields=(server_name,))
+
+    def _format_message(self) -> str:
+        return f"OpenVPN is not installed on server '{self.server_name}'"
 
 
 class OpenVPNInstallationError(OpenVPNError):
@@ -112,10 +150,13 @@ class OpenVPNInstallationError(OpenVPNError):
 
     def __init__(self, server_name: str, reason: str = ""):
         self.server_name = server_name
-        message = f"Failed to install OpenVPN on server '{server_name}'"
-        if reason:
-            message += f": {reason}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        self.reason = reason
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(server_name, reason))
+
+    def _format_message(self) -> str:
+        return _with_reason(
+            f"Failed to install OpenVPN on server '{self.server_name}'", self.reason
+        )
 
 
 class OpenVPNConfigurationError(OpenVPNError):
@@ -123,10 +164,13 @@ class OpenVPNConfigurationError(OpenVPNError):
 
     def __init__(self, server_name: str, reason: str = ""):
         self.server_name = server_name
-        message = f"Failed to configure OpenVPN on server '{server_name}'"
-        if reason:
-            message += f": {reason}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        self.reason = reason
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(server_name, reason))
+
+    def _format_message(self) -> str:
+        return _with_reason(
+            f"Failed to configure OpenVPN on server '{self.server_name}'", self.reason
+        )
 
 
 class OpenVPNServiceError(OpenVPNError):
@@ -135,10 +179,13 @@ class OpenVPNServiceError(OpenVPNError):
     def __init__(self, server_name: str, operation: str, reason: str = ""):
         self.server_name = server_name
         self.operation = operation
-        message = f"Failed to {operation} OpenVPN on server '{server_name}'"
-        if reason:
-            message += f": {reason}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        self.reason = reason
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(server_name, operation, reason))
+
+    def _format_message(self) -> str:
+        return _with_reason(
+            f"Failed to {self.operation} OpenVPN on server '{self.server_name}'", self.reason
+        )
 
 
 # ============================================================================
@@ -155,10 +202,11 @@ class CertificateGenerationError(CertificateError):
 
     def __init__(self, cert_name: str, reason: str = ""):
         self.cert_name = cert_name
-        message = f"Failed to generate certificate '{cert_name}'"
-        if reason:
-            message += f": {reason}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        self.reason = reason
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(cert_name, reason))
+
+    def _format_message(self) -> str:
+        return _with_reason(f"Failed to generate certificate '{self.cert_name}'", self.reason)
 
 
 class CertificateRevocationError(CertificateError):
@@ -166,10 +214,11 @@ class CertificateRevocationError(CertificateError):
 
     def __init__(self, cert_name: str, reason: str = ""):
         self.cert_name = cert_name
-        message = f"Failed to revoke certificate '{cert_name}'"
-        if reason:
-            message += f": {reason}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        self.reason = reason
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(cert_name, reason))
+
+    def _format_message(self) -> str:
+        return _with_reason(f"Failed to revoke certificate '{self.cert_name}'", self.reason)
 
 
 class CertificateNotFoundError(CertificateError):
@@ -177,7 +226,10 @@ class CertificateNotFoundError(CertificateError):
 
     def __init__(self, cert_name: str):
         self.cert_name = cert_name
-        super().__init__(f"Certificate '{cert_name}' not found", ErrorSeverity.WARNING)
+        super().__init__(severity=ErrorSeverity.WARNING, fields=(cert_name,))
+
+    def _format_message(self) -> str:
+        return f"Certificate '{self.cert_name}' not found"
 
 
 class CertificateExpiredError(CertificateError):
@@ -186,9 +238,10 @@ class CertificateExpiredError(CertificateError):
     def __init__(self, cert_name: str, expired_at: str):
         self.cert_name = cert_name
         self.expired_at = expired_at
-        super().__init__(
-            f"Certificate '{cert_name}' expired at {expired_at}", ErrorSeverity.WARNING
-        )
+        super().__init__(severity=ErrorSeverity.WARNING, fields=(cert_name, expired_at))
+
+    def _format_message(self) -> str:
+        return f"Certificate '{self.cert_name}' expired at {self.expired_at}"
 
 
 # ============================================================================
@@ -205,7 +258,10 @@ class ServerNotFoundError(ServerError):
 
     def __init__(self, server_id: int):
         self.server_id = server_id
-        super().__init__(f"Server with ID {server_id} not found", ErrorSeverity.WARNING)
+        super().__init__(severity=ErrorSeverity.WARNING, fields=(server_id,))
+
+    def _format_message(self) -> str:
+        return f"Server with ID {self.server_id} not found"
 
 
 class ServerNotAccessibleError(ServerError):
@@ -213,10 +269,11 @@ class ServerNotAccessibleError(ServerError):
 
     def __init__(self, server_name: str, reason: str = ""):
         self.server_name = server_name
-        message = f"Server '{server_name}' is not accessible"
-        if reason:
-            message += f": {reason}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        self.reason = reason
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(server_name, reason))
+
+    def _format_message(self) -> str:
+        return _with_reason(f"Server '{self.server_name}' is not accessible", self.reason)
 
 
 class ServerAlreadyRunningError(ServerError):
@@ -224,7 +281,10 @@ class ServerAlreadyRunningError(ServerError):
 
     def __init__(self, server_name: str):
         self.server_name = server_name
-        super().__init__(f"Server '{server_name}' is already running", ErrorSeverity.INFO)
+        super().__init__(severity=ErrorSeverity.INFO, fields=(server_name,))
+
+    def _format_message(self) -> str:
+        return f"Server '{self.server_name}' is already running"
 
 
 # ============================================================================
@@ -241,7 +301,10 @@ class ClientNotFoundError(ClientError):
 
     def __init__(self, client_name: str):
         self.client_name = client_name
-        super().__init__(f"Client '{client_name}' not found", ErrorSeverity.WARNING)
+        super().__init__(severity=ErrorSeverity.WARNING, fields=(client_name,))
+
+    def _format_message(self) -> str:
+        return f"Client '{self.client_name}' not found"
 
 
 class ClientAlreadyExistsError(ClientError):
@@ -249,7 +312,10 @@ class ClientAlreadyExistsError(ClientError):
 
     def __init__(self, client_name: str):
         self.client_name = client_name
-        super().__init__(f"Client '{client_name}' already exists", ErrorSeverity.WARNING)
+        super().__init__(severity=ErrorSeverity.WARNING, fields=(client_name,))
+
+    def _format_message(self) -> str:
+        return f"Client '{self.client_name}' already exists"
 
 
 class ClientDisconnectionError(ClientError):
@@ -257,10 +323,11 @@ class ClientDisconnectionError(ClientError):
 
     def __init__(self, client_name: str, reason: str = ""):
         self.client_name = client_name
-        message = f"Failed to disconnect client '{client_name}'"
-        if reason:
-            message += f": {reason}"
-        super().__init__(message, ErrorSeverity.ERROR)
+        self.reason = reason
+        super().__init__(severity=ErrorSeverity.ERROR, fields=(client_name, reason))
+
+    def _format_message(self) -> str:
+        return _with_reason(f"Failed to disconnect client '{self.client_name}'", self.reason)
 
 
 # ============================================================================
@@ -314,17 +381,17 @@ class Result(Generic[T]):
         """
         Unwrap successful result or raise exception
 
+        A ``None`` payload is returned as-is for ``Result[None]`` operations.
+
         Raises:
             ValueError: If result is not successful
         """
-        if not self.success:
-            raise ValueError(f"Cannot unwrap failed result: {self.error}")
-        if self.data is None:
-            raise ValueError("Cannot unwrap None data")
-        return self.data
+        if self.success:
+            return self.data
+        raise ValueError(f"Cannot unwrap failed result: {self.error}")
 
     def unwrap_or(self, default: T) -> T:
-        """Unwrap successful result or return default"""
+        """Unwrap successful result or return default (also when it carries no data)"""
         return self.data if self.success and self.data is not None else default
 
     def map(self, func: Callable[[T], "Result"]) -> "Result":
@@ -338,13 +405,12 @@ class Result(Generic[T]):
         except Exception as e:
             return Result.from_exception(e)
 
-    def and_then(self, func: Callable[[T], "Result"]) -> "Result":
-        """Chain operations on result (alias for map)"""
-        return self.map(func)
+    # Chain operations on result; bound directly to avoid an extra call frame
+    and_then = map
 
 
 # Export all exceptions and types
-__all__ = [
+__all__ = (
     # Base
     "OpenVPNAppError",
     "ErrorSeverity",
@@ -378,4 +444,4 @@ __all__ = [
     "ClientDisconnectionError",
     # Result pattern
     "Result",
-]
+)
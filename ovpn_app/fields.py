@@ -0,0 +1,95 @@
+"""
+Custom model fields
+
+Provides an encrypted-at-rest text field for SSH secrets.
+"""
+
+import base64
+import hashlib
+import os
+from functools import lru_cache
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+
+# Marks values written by EncryptedTextField; anything else is legacy plaintext
+_PREFIX = "aesgcm:"
+_NONCE_SIZE = 12
+
+
+@lru_cache(maxsize=1)
+def _get_cipher(secret: str) -> AESGCM:
+    """AES-256-GCM cipher keyed by a SHA-256 digest of the configured secret"""
+    return AESGCM(hashlib.sha256(secret.encode()).digest())
+
+
+def _cipher() -> AESGCM:
+    """
+    Cipher for the configured FIELD_ENCRYPTION_KEY
+
+    There is deliberately no fallback to SECRET_KEY: rotating that key must not
+    make stored secrets unreadable. Changing FIELD_ENCRYPTION_KEY itself does,
+    so it has to stay fixed for the lifetime of the database.
+    """
+    key = getattr(settings, "FIELD_ENCRYPTION_KEY", None)
+    if not key:
+        raise ImproperlyConfigured("FIELD_ENCRYPTION_KEY must be set to store SSH secrets")
+    return _get_cipher(key)
+
+
+def encrypt_value(value: str) -> str:
+    """Encrypt a string into a prefixed base64 token"""
+    nonce = os.urandom(_NONCE_SIZE)
+    token = nonce + _cipher().encrypt(nonce, value.encode(), None)
+    return _PREFIX + base64.b64encode(token).decode("ascii")
+
+
+@lru_cache(maxsize=128)
+def decrypt_value(value: str) -> str:
+    """
+    Decrypt a token produced by encrypt_value()
+
+    Values without the prefix are returned unchanged so rows written before
+    encryption was enabled keep working. Results are cached per token, so
+    tasks reading the same server share one decrypt.
+
+    Raises:
+        ValueError: If the token cannot be decrypted with the current key
+    """
+    if not value.startswith(_PREFIX):
+        return value
+    token = base64.b64decode(value[len(_PREFIX) :])
+    try:
+        plaintext = _cipher().decrypt(token[:_NONCE_SIZE], token[_NONCE_SIZE:], None)
+    except InvalidTag as e:
+        raise ValueError("Failed to decrypt field value: wrong key or corrupted data") from e
+    return plaintext.decode()
+
+
+class EncryptedTextField(models.TextField):
+    """TextField stored encrypted with AES-256-GCM and decrypted on load"""
+
+    def from_db_value(self, value, expression, connection):
+        if not value:
+            return value
+        return decrypt_value(value)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if not value or _is_encrypted(value):
+            return value
+        return encrypt_value(value)
+
+
+def _is_encrypted(value: str) -> bool:
+    """Whether value is a token we can decrypt (a plaintext may start with the prefix too)"""
+    if not value.startswith(_PREFIX):
+        return False
+    try:
+        decrypt_value(value)
+    except ValueError:
+        return False
+    return True
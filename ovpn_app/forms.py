@@ -11,19 +11,30 @@ from django.core.validators import validate_ipv4_address
 
 from .models import ClientCertificate, OpenVPNServer
 
+# Shared validator for the DNS fields; avoids a GenericIPAddressField per form instance
+_IPV4_VALIDATOR = validate_ipv4_address
+
+
+def _clean_ipv4(value):
+    """Validate an optional IPv4 address coming from a CharField"""
+    if value:
+        try:
+            _IPV4_VALIDATOR(value)
+        except ValidationError:
+            raise forms.ValidationError("Введите корректный IPv4 адрес.")
+    return value
+
 
 class ServerForm(forms.ModelForm):
     """Form for creating/editing OpenVPN servers"""
 
-    dns1 = forms.GenericIPAddressField(
-        protocol="IPv4",
+    dns1 = forms.CharField(
         label="DNS сервер 1",
         initial="8.8.8.8",
         required=False,
         widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "8.8.8.8"}),
     )
-    dns2 = forms.GenericIPAddressField(
-        protocol="IPv4",
+    dns2 = forms.CharField(
         label="DNS сервер 2",
         initial="8.8.4.4",
         required=False,
@@ -83,13 +94,13 @@ class ServerForm(forms.ModelForm):
             self.initial["dns2"] = "8.8.4.4"
 
     def clean_host(self):
-        host = self.cleaned_data.get("host")
-        if host:
-            try:
-                validate_ipv4_address(host)
-            except ValidationError:
-                raise forms.ValidationError("Введите корректный IPv4 адрес.")
-        return host
+        return _clean_ipv4(self.cleaned_data.get("host"))
+
+    def clean_dns1(self):
+        return _clean_ipv4(self.cleaned_data.get("dns1"))
+
+    def clean_dns2(self):
+        return _clean_ipv4(self.cleaned_data.get("dns2"))
 
     def clean_ssh_port(self):
         port = self.cleaned_data.get("ssh_port")
@@ -194,8 +205,8 @@ class ClientCertificateForm(forms.ModelForm):
 class ServerConfigForm(forms.ModelForm):
     """Form for updating server configuration"""
 
-    dns1 = forms.GenericIPAddressField(protocol="IPv4", label="DNS сервер 1", initial="8.8.8.8")
-    dns2 = forms.GenericIPAddressField(protocol="IPv4", label="DNS сервер 2", initial="8.8.4.4")
+    dns1 = forms.CharField(label="DNS сервер 1", initial="8.8.8.8")
+    dns2 = forms.CharField(label="DNS сервер 2", initial="8.8.4.4")
 
     class Meta:
         model = OpenVPNServer
@@ -237,6 +248,12 @@ class ServerConfigForm(forms.ModelForm):
             ),
         )
 
+    def clean_dns1(self):
+        return _clean_ipv4(self.cleaned_data.get("dns1"))
+
+    def clean_dns2(self):
+        return _clean_ipv4(self.cleaned_data.get("dns2"))
+
     def save(self, commit=True):
         instance = super().save(commit=False)
 
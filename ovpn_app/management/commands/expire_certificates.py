@@ -0,0 +1,16 @@
+"""
+Django management command to mark expired client certificates
+Usage: python manage.py expire_certificates (e.g. hourly from cron)
+"""
+
+from django.core.management.base import BaseCommand
+
+from ovpn_app.models import ClientCertificate
+
+
+class Command(BaseCommand):
+    help = "Mark active client certificates past their expiry date as expired"
+
+    def handle(self, *args, **options):
+        count = ClientCertificate.mark_expired()
+        self.stdout.write(self.style.SUCCESS(f"✓ Marked {count} certificate(s) as expired"))
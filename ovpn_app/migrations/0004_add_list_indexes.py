@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-16 13:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ovpn_app', '0003_alter_vpnconnection_connected_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientcertificate',
+            index=models.Index(fields=['server', 'status'], name='ovpn_app_cl_server__d3d87c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientcertificate',
+            index=models.Index(fields=['-created_at'], name='ovpn_app_cl_created_e5f9f2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='openvpnserver',
+            index=models.Index(fields=['-created_at'], name='ovpn_app_op_created_5a3aab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='openvpnserver',
+            index=models.Index(fields=['status'], name='ovpn_app_op_status_3ab628_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servertask',
+            index=models.Index(fields=['server', 'status'], name='ovpn_app_se_server__96415d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servertask',
+            index=models.Index(fields=['-created_at'], name='ovpn_app_se_created_caa3ce_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vpnconnection',
+            index=models.Index(fields=['client', '-connected_at'], name='ovpn_app_vp_client__17c6a2_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-16 13:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_material(apps, schema_editor):
+    ClientCertificate = apps.get_model("ovpn_app", "ClientCertificate")
+    ClientCertificateMaterial = apps.get_model("ovpn_app", "ClientCertificateMaterial")
+    ClientCertificateMaterial.objects.bulk_create(
+        ClientCertificateMaterial(cert_id=pk, client_cert=cert, client_key=key)
+        for pk, cert, key in ClientCertificate.objects.values_list(
+            "pk", "client_cert", "client_key"
+        ).iterator()
+    )
+
+
+def restore_material(apps, schema_editor):
+    ClientCertificate = apps.get_model("ovpn_app", "ClientCertificate")
+    ClientCertificateMaterial = apps.get_model("ovpn_app", "ClientCertificateMaterial")
+    for material in ClientCertificateMaterial.objects.iterator():
+        ClientCertificate.objects.filter(pk=material.cert_id).update(
+            client_cert=material.client_cert, client_key=material.client_key
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ovpn_app', '0004_add_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientCertificateMaterial',
+            fields=[
+                ('cert', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='material', serialize=False, to='ovpn_app.clientcertificate', verbose_name='Сертификат')),
+                ('client_cert', models.TextField(verbose_name='Клиентский сертификат')),
+                ('client_key', models.TextField(verbose_name='Клиентский ключ')),
+            ],
+            options={
+                'verbose_name': 'Сертификат и ключ клиента',
+                'verbose_name_plural': 'Сертификаты и ключи клиентов',
+            },
+        ),
+        migrations.RunPython(copy_material, restore_material),
+        migrations.RemoveField(
+            model_name='clientcertificate',
+            name='client_cert',
+        ),
+        migrations.RemoveField(
+            model_name='clientcertificate',
+            name='client_key',
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 13:39
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ovpn_app', '0005_split_client_certificate_material'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='servertask',
+            name='parameters',
+            field=models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Параметры'),
+        ),
+        migrations.AlterField(
+            model_name='servertask',
+            name='result',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Результат'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-16 13:42
+
+import ovpn_app.fields
+from django.db import migrations
+from django.db.models import Value
+
+
+def encrypt_existing_secrets(apps, schema_editor):
+    OpenVPNServer = apps.get_model("ovpn_app", "OpenVPNServer")
+    # Plaintext rows load unchanged and are encrypted again on save
+    for pk, password, private_key in OpenVPNServer.objects.values_list(
+        "pk", "ssh_password", "ssh_private_key"
+    ).iterator():
+        OpenVPNServer.objects.filter(pk=pk).update(
+            ssh_password=password, ssh_private_key=private_key
+        )
+
+
+def decrypt_existing_secrets(apps, schema_editor):
+    OpenVPNServer = apps.get_model("ovpn_app", "OpenVPNServer")
+    # Value() bypasses the field's encryption so plaintext is written back
+    for pk, password, private_key in OpenVPNServer.objects.values_list(
+        "pk", "ssh_password", "ssh_private_key"
+    ).iterator():
+        OpenVPNServer.objects.filter(pk=pk).update(
+            ssh_password=Value(password), ssh_private_key=Value(private_key)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ovpn_app', '0006_servertask_json_encoder'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='openvpnserver',
+            name='ssh_password',
+            field=ovpn_app.fields.EncryptedTextField(blank=True, verbose_name='SSH пароль'),
+        ),
+        migrations.AlterField(
+            model_name='openvpnserver',
+            name='ssh_private_key',
+            field=ovpn_app.fields.EncryptedTextField(blank=True, verbose_name='SSH приватный ключ'),
+        ),
+        migrations.RunPython(encrypt_existing_secrets, decrypt_existing_secrets),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 13:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ovpn_app', '0007_encrypt_ssh_secrets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientcertificate',
+            index=models.Index(condition=models.Q(('revoked_at__isnull', True), ('status', 'active')), fields=['server', 'expires_at'], name='cc_active_idx'),
+        ),
+    ]
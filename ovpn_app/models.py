@@ -2,10 +2,81 @@
 Django models for OpenVPN management system
 """
 
+import sys
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Case, F, Prefetch, Q, When
+from django.db.models.functions import Now
 from django.utils import timezone
 
+from .fields import EncryptedTextField
+
+# ClientCertificate status values, interned so comparisons are identity checks
+_STATUS_ACTIVE = sys.intern("active")
+_STATUS_REVOKED = sys.intern("revoked")
+_STATUS_EXPIRED = sys.intern("expired")
+
+# Static body of the client .ovpn file, filled in by ClientCertificate.generate_config()
+_CLIENT_CONFIG_TEMPLATE = """client
+dev tun
+proto {proto}
+remote {host} {port}
+resolv-retry infinite
+nobind
+user nobody
+group nogroup
+persist-key
+persist-tun
+verb 3
+cipher AES-256-CBC
+auth SHA256
+key-direction 1
+
+<ca>
+{ca}
+</ca>
+
+<cert>
+{cert}
+</cert>
+
+<key>
+{key}
+</key>
+"""
+
+
+class OpenVPNServerQuerySet(models.QuerySet):
+    """QuerySet helpers for OpenVPNServer"""
+
+    def list_view(self):
+        """Columns shown on server lists; SSH secrets are left unread"""
+        return self.only(
+            "id",
+            "name",
+            "description",
+            "host",
+            "status",
+            "last_check",
+            "openvpn_port",
+            "openvpn_protocol",
+            "created_at",
+        )
+
+    def with_active_clients(self):
+        """Prefetch active clients with their creators into ``server.active_clients``"""
+        return self.prefetch_related(
+            Prefetch(
+                "clients",
+                queryset=ClientCertificate.objects.active()
+                .select_related("created_by")
+                .only("id", "name", "status", "expires_at", "server_id", "created_by"),
+                to_attr="active_clients",
+            )
+        )
+
 
 class OpenVPNServer(models.Model):
     """OpenVPN Server model"""
@@ -26,9 +97,9 @@ class OpenVPNServer(models.Model):
     host = models.GenericIPAddressField(protocol="IPv4", verbose_name="IP адрес")
     ssh_port = models.PositiveIntegerField(default=22, verbose_name="SSH порт")
     ssh_username = models.CharField(max_length=50, verbose_name="SSH пользователь")
-    ssh_password = models.CharField(max_length=255, blank=True, verbose_name="SSH пароль")
+    ssh_password = EncryptedTextField(blank=True, verbose_name="SSH пароль")
     ssh_key_path = models.CharField(max_length=500, blank=True, verbose_name="Путь к SSH ключу")
-    ssh_private_key = models.TextField(blank=True, verbose_name="SSH приватный ключ")
+    ssh_private_key = EncryptedTextField(blank=True, verbose_name="SSH приватный ключ")
 
     # OpenVPN configuration
     openvpn_port = models.PositiveIntegerField(default=1194, verbose_name="OpenVPN порт")
@@ -59,19 +130,28 @@ class OpenVPNServer(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлено")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Создал")
 
+    # Pushed to clients when no DNS servers are configured
+    _DEFAULT_DNS = ("8.8.8.8", "8.8.4.4")
+
+    objects = OpenVPNServerQuerySet.as_manager()
+
     class Meta:
         verbose_name = "OpenVPN Сервер"
         verbose_name_plural = "OpenVPN Серверы"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["status"]),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.host})"
 
     def get_dns_servers_list(self):
         """Get DNS servers as a list"""
-        if isinstance(self.dns_servers, list):
+        if isinstance(self.dns_servers, list) and self.dns_servers:
             return self.dns_servers
-        return ["8.8.8.8", "8.8.4.4"]
+        return list(self._DEFAULT_DNS)
 
     def is_accessible(self):
         """Check if server is accessible via SSH"""
@@ -113,13 +193,99 @@ class CertificateAuthority(models.Model):
         return timezone.now() < self.expires_at
 
 
+class ClientCertificateQuerySet(models.QuerySet):
+    """QuerySet helpers for ClientCertificate"""
+
+    def with_config_relations(self):
+        """Pre-join the PEM material, server and CA used by generate_config()"""
+        return self.select_related("material", "server", "server__ca")
+
+    def active(self):
+        """Certificates that are currently valid (SQL equivalent of is_valid())"""
+        return self.filter(status=_STATUS_ACTIVE, revoked_at__isnull=True, expires_at__gt=Now())
+
+    def with_is_valid(self):
+        """Annotate each row with ``is_valid_db`` computed by the database"""
+        return self.annotate(
+            is_valid_db=Case(
+                When(
+                    status=_STATUS_ACTIVE,
+                    revoked_at__isnull=True,
+                    expires_at__gt=Now(),
+                    then=True,
+                ),
+                default=False,
+                output_field=models.BooleanField(),
+            )
+        )
+
+    def create_with_material(self, client_cert="", client_key="", **fields):
+        """
+        Create a certificate together with its ClientCertificateMaterial row
+
+        generate_config() reads ``material``, so every certificate needs one;
+        cert and key stay empty when the agent keeps them on the server.
+        """
+        with transaction.atomic(using=self.db):
+            client = self.create(**fields)
+            ClientCertificateMaterial.objects.using(self.db).create(
+                cert=client, client_cert=client_cert, client_key=client_key
+            )
+        return client
+
+    def bulk_import(self, server, specs, created_by, batch_size=500):
+        """
+        Create or update many certificates on a server in batched INSERTs
+
+        Each spec is a dict with ``name``, ``cert``, ``key`` and ``expires_at``.
+        Existing certificates with the same name get new material and expiry.
+        """
+        specs = list(specs)
+        with transaction.atomic(using=self.db):
+            self.bulk_create(
+                [
+                    self.model(
+                        server=server,
+                        name=spec["name"],
+                        expires_at=spec["expires_at"],
+                        created_by=created_by,
+                    )
+                    for spec in specs
+                ],
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["server", "name"],
+                update_fields=["expires_at"],
+            )
+            ids = dict(
+                self.filter(server=server, name__in=[spec["name"] for spec in specs]).values_list(
+                    "name", "pk"
+                )
+            )
+            ClientCertificateMaterial.objects.using(self.db).bulk_create(
+                [
+                    ClientCertificateMaterial(
+                        cert_id=ids[spec["name"]],
+                        client_cert=spec["cert"],
+                        client_key=spec["key"],
+                    )
+                    for spec in specs
+                ],
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["cert"],
+                update_fields=["client_cert", "client_key"],
+            )
+        return len(specs)
+
+
 class ClientCertificate(models.Model):
     """Client Certificate model"""
 
     STATUS_CHOICES = [
-        ("active", "Active"),
-        ("revoked", "Revoked"),
-        ("expired", "Expired"),
+        (_STATUS_ACTIVE, "Active"),
+        (_STATUS_REVOKED, "Revoked"),
+        (_STATUS_EXPIRED, "Expired"),
     ]
 
     server = models.ForeignKey(
@@ -131,13 +297,9 @@ class ClientCertificate(models.Model):
     email = models.EmailField(blank=True, verbose_name="Email клиента")
     description = models.TextField(blank=True, verbose_name="Описание")
 
-    # Certificate data
-    client_cert = models.TextField(verbose_name="Клиентский сертификат")
-    client_key = models.TextField(verbose_name="Клиентский ключ")
-
     # Status
     status = models.CharField(
-        max_length=20, choices=STATUS_CHOICES, default="active", verbose_name="Статус"
+        max_length=20, choices=STATUS_CHOICES, default=_STATUS_ACTIVE, verbose_name="Статус"
     )
 
     # Metadata
@@ -146,56 +308,96 @@ class ClientCertificate(models.Model):
     revoked_at = models.DateTimeField(null=True, blank=True, verbose_name="Отозван")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Создал")
 
+    objects = ClientCertificateQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Клиентский Сертификат"
         verbose_name_plural = "Клиентские Сертификаты"
         unique_together = ["server", "name"]
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["server", "status"]),
+            models.Index(fields=["-created_at"]),
+            # Only currently active certificates, matches ClientCertificateQuerySet.active()
+            models.Index(
+                fields=["server", "expires_at"],
+                name="cc_active_idx",
+                condition=Q(status=_STATUS_ACTIVE, revoked_at__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.server.name})"
 
     def revoke(self):
         """Revoke the certificate"""
-        self.status = "revoked"
+        self.status = _STATUS_REVOKED
         self.revoked_at = timezone.now()
-        self.save()
+        self.save(update_fields=["status", "revoked_at"])
+
+    @classmethod
+    def bulk_revoke(cls, ids):
+        """Revoke all active certificates with the given ids in a single UPDATE"""
+        return cls.objects.filter(pk__in=ids, status=_STATUS_ACTIVE).update(
+            status=_STATUS_REVOKED, revoked_at=timezone.now()
+        )
+
+    @classmethod
+    def mark_expired(cls):
+        """Move active certificates past their expiry date to "expired" in a single UPDATE"""
+        return cls.objects.filter(status=_STATUS_ACTIVE, expires_at__lt=Now()).update(
+            status=_STATUS_EXPIRED
+        )
 
     def is_valid(self):
         """Check if certificate is valid"""
         now = timezone.now()
-        return self.status == "active" and now < self.expires_at and not self.revoked_at
+        return self.status == _STATUS_ACTIVE and now < self.expires_at and not self.revoked_at
 
     def generate_config(self):
-        """Generate OpenVPN client configuration"""
-        config = f"""client
-dev tun
-proto {self.server.openvpn_protocol}
-remote {self.server.host} {self.server.openvpn_port}
-resolv-retry infinite
-nobind
-user nobody
-group nogroup
-persist-key
-persist-tun
-verb 3
-cipher AES-256-CBC
-auth SHA256
-key-direction 1
-
-<ca>
-{self.server.ca.ca_cert}
-</ca>
+        """
+        Generate OpenVPN client configuration
+
+        When rendering many clients, fetch them with
+        ``ClientCertificate.objects.with_config_relations()`` to avoid extra queries.
+        """
+        material = self.material
+        return _CLIENT_CONFIG_TEMPLATE.format_map(
+            {
+                "proto": self.server.openvpn_protocol,
+                "host": self.server.host,
+                "port": self.server.openvpn_port,
+                "ca": self.server.ca.ca_cert,
+                "cert": material.client_cert,
+                "key": material.client_key,
+            }
+        )
+
+
+class ClientCertificateMaterial(models.Model):
+    """
+    PEM certificate and key of a client
+
+    Kept out of ClientCertificate so list pages and status queries do not
+    read the large text columns.
+    """
+
+    cert = models.OneToOneField(
+        ClientCertificate,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="material",
+        verbose_name="Сертификат",
+    )
+    client_cert = models.TextField(verbose_name="Клиентский сертификат")
+    client_key = models.TextField(verbose_name="Клиентский ключ")
 
-<cert>
-{self.client_cert}
-</cert>
+    class Meta:
+        verbose_name = "Сертификат и ключ клиента"
+        verbose_name_plural = "Сертификаты и ключи клиентов"
 
-<key>
-{self.client_key}
-</key>
-"""
-        return config
+    def __str__(self):
+        return f"Материал {self.cert_id}"
 
 
 class VPNConnection(models.Model):
@@ -220,26 +422,31 @@ class VPNConnection(models.Model):
     connected_at = models.DateTimeField(default=timezone.now, verbose_name="Подключен")
     last_seen = models.DateTimeField(auto_now=True, verbose_name="Последняя активность")
 
+    # Units for format_bytes(); each is 2**10 of the previous one
+    _UNITS = ("B", "KB", "MB", "GB", "TB")
+
     class Meta:
         verbose_name = "VPN Подключение"
         verbose_name_plural = "VPN Подключения"
         ordering = ["-connected_at"]
+        indexes = [
+            models.Index(fields=["client", "-connected_at"]),
+        ]
 
     def __str__(self):
         return f"{self.client.name} ({self.client_ip})"
 
-    def duration(self):
-        """Get connection duration"""
-        return timezone.now() - self.connected_at
+    def duration(self, now=None):
+        """Get connection duration (pass ``now`` to reuse one timestamp across rows)"""
+        return (now or timezone.now()) - self.connected_at
 
-    def format_duration(self):
+    def format_duration(self, now=None):
         """Format duration in human readable format"""
-        duration = self.duration()
+        duration = self.duration(now)
 
         days = duration.days
-        hours = duration.seconds // 3600
-        minutes = (duration.seconds % 3600) // 60
-        seconds = duration.seconds % 60
+        hours, remainder = divmod(duration.seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
 
         if days > 0:
             return f"{days}d {hours}h {minutes}m"
@@ -250,13 +457,31 @@ class VPNConnection(models.Model):
         else:
             return f"{seconds}s"
 
-    def format_bytes(self, bytes_count):
+    @classmethod
+    def record_traffic(cls, pk, rx, tx):
+        """Add traffic deltas to a connection's counters in one atomic UPDATE"""
+        return cls.objects.filter(pk=pk).update(
+            bytes_received=F("bytes_received") + rx,
+            bytes_sent=F("bytes_sent") + tx,
+            last_seen=Now(),
+        )
+
+    @classmethod
+    def format_bytes(cls, bytes_count):
         """Format bytes in human readable format"""
-        for unit in ["B", "KB", "MB", "GB"]:
-            if bytes_count < 1024:
-                return f"{bytes_count:.2f} {unit}"
-            bytes_count /= 1024
-        return f"{bytes_count:.2f} TB"
+        if bytes_count < 1024:
+            return f"{bytes_count:.2f} B"
+        # The unit index is bit_length // 10, capped at the largest unit
+        idx = min((int(bytes_count).bit_length() - 1) // 10, len(cls._UNITS) - 1)
+        return f"{bytes_count / (1 << (idx * 10)):.2f} {cls._UNITS[idx]}"
+
+
+class ServerTaskQuerySet(models.QuerySet):
+    """QuerySet helpers for ServerTask"""
+
+    def list_view(self):
+        """Skip the JSON payloads and error text that task lists never display"""
+        return self.defer("parameters", "result", "error_message")
 
 
 class ServerTask(models.Model):
@@ -288,8 +513,10 @@ class ServerTask(models.Model):
 
     # Task details
     task_id = models.CharField(max_length=255, unique=True, verbose_name="ID задачи")
-    parameters = models.JSONField(default=dict, verbose_name="Параметры")
-    result = models.JSONField(default=dict, blank=True, verbose_name="Результат")
+    parameters = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Параметры")
+    result = models.JSONField(
+        default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Результат"
+    )
     error_message = models.TextField(blank=True, verbose_name="Сообщение об ошибке")
 
     # Progress tracking
@@ -301,10 +528,16 @@ class ServerTask(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершено")
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Создал")
 
+    objects = ServerTaskQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Задача Сервера"
         verbose_name_plural = "Задачи Серверов"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["server", "status"]),
+            models.Index(fields=["-created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.get_task_type_display()} - {self.server.name}"
@@ -316,11 +549,11 @@ class ServerTask(models.Model):
         self.completed_at = timezone.now()
         if result:
             self.result = result
-        self.save()
+        self.save(update_fields=["status", "progress", "completed_at", "result"])
 
     def mark_failed(self, error_message):
         """Mark task as failed"""
         self.status = "failed"
         self.error_message = error_message
         self.completed_at = timezone.now()
-        self.save()
+        self.save(update_fields=["status", "error_message", "completed_at"])
@@ -4,14 +4,380 @@ Simplified OpenVPN Service
 Clean implementation for OpenVPN installation and management.
 """
 
+import asyncio
+import io
 import logging
+import random
+import shlex
+import time
 from dataclasses import dataclass
-from typing import List
-
-from .ssh_service import CommandResult, SSHCredentials, SSHService
+from functools import lru_cache
+from types import MappingProxyType
+from typing import AbstractSet, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .ssh_service import (
+    MAX_PARALLEL_CHANNELS,
+    CommandResult,
+    SSHCommandError,
+    SSHConnectionError,
+    SSHCredentials,
+    SSHService,
+)
 
 logger = logging.getLogger(__name__)
 
+# Prefix echoed before each command of a batch script, mirrors an interactive shell
+_COMMAND_PREFIX = "$ "
+
+# Concurrent setup phases per server, each on its own channel
+MAX_PARALLEL_SESSIONS = MAX_PARALLEL_CHANNELS
+
+# Retry policy for transient SSH failures: attempts after the first, backoff in seconds
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+# Exit codes worth retrying; 255 is what ssh itself reports for a dropped connection
+TRANSIENT_EXIT_CODES = frozenset({255})
+# apt exits with 100 on errors, including a dpkg lock held by unattended-upgrades
+APT_ERROR_EXIT_CODE = 100
+
+# Seconds a successful host probe (sudo, netcat) is trusted before re-checking
+PROBE_CACHE_TTL = 300.0
+
+# Setup phases in execution order, each mapped to the phases it depends on
+SETUP_PHASE_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {
+    "prep": (),
+    "pki_init": ("prep",),
+    "ca": ("pki_init",),
+    "ta": ("prep",),
+    "copy": ("ca", "ta"),
+    "server_conf": (),
+    "sysctl": (),
+    "firewall": (),
+}
+
+
+def build_batch_script(commands: Sequence[str]) -> str:
+    """
+    Join commands into one shell script that stops at the first failure
+
+    Each command is echoed with ``$ `` before it runs, so the output reads like
+    the per-command transcript and the last echoed line names a failed command.
+    An explicit exit check follows every command because ``set -e`` ignores
+    failures inside ``&&`` lists.
+    """
+    lines = []
+    for command in commands:
+        lines.append(f"printf '%s\\n' {shlex.quote(_COMMAND_PREFIX + command)}")
+        lines.append(command)
+        lines.append("rc=$?; [ $rc -eq 0 ] || exit $rc")
+    return "\n".join(lines)
+
+
+def failed_command(output: str) -> str:
+    """Return the last command echoed by a batch script (the one that failed)"""
+    for line in reversed(output.splitlines()):
+        if line.startswith(_COMMAND_PREFIX):
+            return line[len(_COMMAND_PREFIX) :]
+    return ""
+
+
+async def exec_retry(
+    ssh_service: SSHService,
+    credentials: SSHCredentials,
+    command: str,
+    retry_exit_codes: AbstractSet[int] = TRANSIENT_EXIT_CODES,
+    max_retries: int = RETRY_ATTEMPTS,
+) -> CommandResult:
+    """
+    Execute a command, retrying transient failures with jittered exponential backoff
+
+    Connection errors and exit codes in ``retry_exit_codes`` are retried up to
+    ``max_retries`` times; any other result is returned immediately.
+
+    Raises:
+        SSHConnectionError, SSHCommandError: If the last attempt still fails to connect
+    """
+    attempt = 0
+    while True:
+        try:
+            result = await ssh_service.execute_command(credentials, command)
+        except (SSHConnectionError, SSHCommandError) as e:
+            if attempt >= max_retries:
+                raise
+            logger.warning("Transient SSH failure (attempt %s): %s", attempt + 1, e)
+        else:
+            if result.exit_code not in retry_exit_codes or attempt >= max_retries:
+                return result
+            logger.warning(
+                "Transient exit code %s (attempt %s), retrying", result.exit_code, attempt + 1
+            )
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt)
+        await asyncio.sleep(delay * (1 + random.random() * 0.5))
+        attempt += 1
+
+
+# (hostname, port, username, command) -> monotonic time the probe last succeeded
+_probe_cache: Dict[Tuple[str, int, str, str], float] = {}
+
+
+async def cached_probe(ssh_service: SSHService, credentials: SSHCredentials, command: str) -> bool:
+    """
+    Run a yes/no probe command, remembering success for ``PROBE_CACHE_TTL`` seconds
+
+    Only successes are cached, so a host that was just fixed (sudo configured,
+    netcat installed) is re-checked on the next call.
+    """
+    key = (credentials.hostname, credentials.port, credentials.username, command)
+    checked_at = _probe_cache.get(key)
+    if checked_at is not None and time.monotonic() - checked_at < PROBE_CACHE_TTL:
+        return True
+
+    result = await exec_retry(ssh_service, credentials, command)
+    if result.success:
+        _probe_cache[key] = time.monotonic()
+    return result.success
+
+
+async def run_batch(
+    ssh_service: SSHService,
+    credentials: SSHCredentials,
+    commands: Sequence[str],
+    retry_exit_codes: AbstractSet[int] = TRANSIENT_EXIT_CODES,
+    max_retries: int = RETRY_ATTEMPTS,
+) -> CommandResult:
+    """
+    Run commands as a single script over one SSH exec instead of one exec each
+
+    Transient failures rerun the whole script, so batches must be safe to repeat;
+    pass ``max_retries=0`` for batches that are not.
+    """
+    script = build_batch_script(commands)
+    return await exec_retry(
+        ssh_service, credentials, f"bash -c {shlex.quote(script)}", retry_exit_codes, max_retries
+    )
+
+
+async def upload_files(
+    ssh_service: SSHService, credentials: SSHCredentials, files: Mapping[str, str]
+) -> Optional[CommandResult]:
+    """
+    Write files over SFTP instead of piping heredocs through the shell
+
+    Returns a failed result shaped like batch output (naming the file) if an
+    upload fails, otherwise None.
+    """
+    for path, content in files.items():
+        try:
+            await ssh_service.upload_file(credentials, path, content)
+        except SSHConnectionError as e:
+            return CommandResult(
+                stdout=f"{_COMMAND_PREFIX}upload {path}\n",
+                stderr=str(e),
+                exit_code=1,
+                success=False,
+            )
+    return None
+
+
+def format_batch_output(result: CommandResult) -> str:
+    """Render batch output the way the per-command loops used to"""
+    output = result.stdout.rstrip("\n")
+    if result.stderr:
+        output += f"\nSTDERR: {result.stderr}"
+    return output
+
+
+# Exit code of the install batch when the user cannot run sudo without a password
+SUDO_REQUIRED_EXIT_CODE = 77
+# First step of the install batch, so a missing sudo costs no extra round trip
+_SUDO_CHECK = (
+    f"sudo -n true 2>/dev/null || {{ echo 'SUDO_FAIL' >&2; exit {SUDO_REQUIRED_EXIT_CODE}; }}"
+)
+
+_INSTALL_COMMANDS = (
+    "sudo apt update -y",
+    "sudo DEBIAN_FRONTEND=noninteractive apt install -y openvpn easy-rsa netcat-openbsd",
+    "sudo systemctl enable openvpn",
+    "sudo mkdir -p /etc/openvpn",
+    "sudo mkdir -p /var/log/openvpn",
+    "echo 'OpenVPN installation completed'",
+)
+
+# Last step of revocation; picks up the new CRL without dropping other clients if possible
+_RELOAD_SERVER = "sudo systemctl reload openvpn@server || sudo systemctl restart openvpn@server"
+
+# server.conf is uploaded here (relative to the home directory) and installed by sudo
+_SERVER_CONF_UPLOAD = "server.conf.tmp"
+
+# Body of /etc/openvpn/server.conf, filled in by _build_server_conf()
+_SERVER_CONF_TEMPLATE = """port {port}
+proto {protocol}
+dev tun
+ca ca.crt
+cert server.crt
+key server.key
+dh dh.pem
+crl-verify crl.pem
+server {subnet} {netmask}
+ifconfig-pool-persist /var/log/openvpn/ipp.txt
+push "redirect-gateway def1 bypass-dhcp"
+{dns_config}
+keepalive 10 120
+tls-crypt ta.key
+cipher AES-256-GCM
+auth SHA256
+management localhost 7505
+management-client-auth
+user nobody
+group nogroup
+persist-key
+persist-tun
+status /var/log/openvpn/openvpn-status.log
+log-append /var/log/openvpn/openvpn.log
+verb 3
+{exit_notify}mssfix 0
+"""
+
+
+# Client config files, uploaded relative to the home directory
+_BASE_CONF_TEMPLATE = """client
+dev tun
+proto {protocol}
+remote {server_ip} {server_port}
+resolv-retry infinite
+nobind
+user nobody
+group nogroup
+persist-key
+persist-tun
+remote-cert-tls server
+cipher AES-256-GCM
+auth SHA256
+key-direction 1
+verb 3
+"""
+
+_MAKE_CONFIG_SCRIPT = """#!/bin/bash
+CLIENT=$1
+KEY_DIR=~/client-configs/keys
+OUTPUT_DIR=~/client-configs/files
+BASE_CONFIG=~/client-configs/base.conf
+
+cat ${BASE_CONFIG} \\
+    <(echo -e '<ca>') \\
+    ${KEY_DIR}/ca.crt \\
+    <(echo -e '</ca>\\n<cert>') \\
+    ${KEY_DIR}/${CLIENT}.crt \\
+    <(echo -e '</cert>\\n<key>') \\
+    ${KEY_DIR}/${CLIENT}.key \\
+    <(echo -e '</key>\\n<tls-crypt>') \\
+    ${KEY_DIR}/ta.key \\
+    <(echo -e '</tls-crypt>') \\
+    > ${OUTPUT_DIR}/${CLIENT}.ovpn
+"""
+
+
+@lru_cache(maxsize=32)
+def _build_server_conf(
+    port: int, protocol: str, subnet: str, netmask: str, dns_servers: Tuple[str, ...]
+) -> str:
+    """Render server.conf for one server configuration (cached)"""
+    # Build DNS push commands
+    dns_config = "\n".join(f'push "dhcp-option DNS {dns}"' for dns in dns_servers)
+
+    # explicit-exit-notify only for UDP
+    exit_notify = "" if protocol == "tcp" else "explicit-exit-notify 1\n"
+
+    return _SERVER_CONF_TEMPLATE.format_map(
+        {
+            "port": port,
+            "protocol": protocol,
+            "subnet": subnet,
+            "netmask": netmask,
+            "dns_config": dns_config,
+            "exit_notify": exit_notify,
+        }
+    )
+
+
+@lru_cache(maxsize=32)
+def _build_base_conf(server_ip: str, server_port: int, protocol: str) -> str:
+    """Render the client base.conf for one server (cached)"""
+    return _BASE_CONF_TEMPLATE.format(
+        protocol=protocol, server_ip=server_ip, server_port=server_port
+    )
+
+
+@lru_cache(maxsize=32)
+def _build_setup_phases(port: int, protocol: str) -> Mapping[str, Tuple[str, ...]]:
+    """Build the setup phases for one server configuration (cached)"""
+    return MappingProxyType(
+        {
+            "prep": (
+                # Step 1: Clean and recreate easy-rsa directory (without sudo!),
+                # unless a CA already exists - re-runs keep the existing PKI
+                "[ -f ~/easy-rsa/pki/ca.crt ] || rm -rf ~/easy-rsa 2>/dev/null || true",
+                "mkdir -p ~/easy-rsa",
+                # Step 2: Copy easyrsa files from package
+                "cp -r /usr/share/easy-rsa/* ~/easy-rsa/ 2>/dev/null || true",
+                # Step 3: Configure vars file (use full path)
+                "echo 'set_var EASYRSA_ALGO \"ec\"' > ~/easy-rsa/vars",
+                "echo 'set_var EASYRSA_DIGEST \"sha512\"' >> ~/easy-rsa/vars",
+            ),
+            "pki_init": (
+                # Step 4: Initialize PKI (each phase is one shell, so cd once per phase)
+                "cd ~/easy-rsa",
+                "[ -f pki/ca.crt ] || ./easyrsa --batch init-pki",
+            ),
+            "ca": (
+                "cd ~/easy-rsa",
+                # Step 5: Generate server certificate request
+                "[ -f pki/private/server.key ] || ./easyrsa --batch gen-req server nopass",
+                # Step 6: Build CA and sign server certificate
+                "[ -f pki/ca.crt ] || ./easyrsa --batch build-ca nopass",
+                "[ -f pki/issued/server.crt ] || ./easyrsa --batch sign-req server server",
+                # Step 6.5: Generate initial empty CRL
+                "./easyrsa gen-crl",
+            ),
+            "ta": (
+                # Step 7: Generate ta.key for TLS auth
+                "cd ~/easy-rsa",
+                "[ -f ta.key ] || openvpn --genkey secret ta.key",
+            ),
+            "copy": (
+                # Step 8: Create /etc/openvpn directory
+                "sudo mkdir -p /etc/openvpn",
+                # Step 9: Copy files to /etc/openvpn/ (no DH file for EC)
+                "sudo cp ~/easy-rsa/pki/private/server.key /etc/openvpn/",
+                "sudo cp ~/easy-rsa/pki/issued/server.crt /etc/openvpn/",
+                "sudo cp ~/easy-rsa/pki/ca.crt /etc/openvpn/",
+                "sudo cp ~/easy-rsa/ta.key /etc/openvpn/",
+                "sudo cp ~/easy-rsa/pki/crl.pem /etc/openvpn/",
+                "sudo chmod 644 /etc/openvpn/crl.pem",
+            ),
+            "server_conf": (
+                "sudo mkdir -p /etc/openvpn",
+                # Step 11: Install server config uploaded over SFTP (see get_setup_files)
+                f"sudo install -m 644 ~/{_SERVER_CONF_UPLOAD} /etc/openvpn/server.conf",
+                f"rm -f ~/{_SERVER_CONF_UPLOAD}",
+                # Step 12: Create log directory
+                "sudo mkdir -p /var/log/openvpn",
+            ),
+            "sysctl": (
+                # Step 13: Enable IP forwarding
+                "sudo sysctl -w net.ipv4.ip_forward=1",
+                "grep -qx 'net.ipv4.ip_forward=1' /etc/sysctl.conf"
+                " || echo 'net.ipv4.ip_forward=1' | sudo tee -a /etc/sysctl.conf",
+            ),
+            "firewall": (
+                # Step 14: Configure firewall (basic)
+                f"sudo ufw allow {port}/{protocol}",
+                "sudo ufw allow OpenSSH",
+            ),
+        }
+    )
+
 
 @dataclass
 class InstallationResult:
@@ -38,31 +404,28 @@ class OpenVPNInstaller:
     def __init__(self, ssh_service: SSHService):
         self.ssh_service = ssh_service
 
-    def get_install_commands(self) -> List[str]:
+    def get_install_commands(self) -> Sequence[str]:
         """Get commands for OpenVPN installation"""
-        return [
-            "sudo apt update -y",
-            "sudo DEBIAN_FRONTEND=noninteractive apt install -y openvpn easy-rsa netcat-openbsd",
-            "sudo systemctl enable openvpn",
-            "sudo mkdir -p /etc/openvpn",
-            "sudo mkdir -p /var/log/openvpn",
-            "echo 'OpenVPN installation completed'",
-        ]
+        return _INSTALL_COMMANDS
 
     async def check_sudo_access(self, credentials: SSHCredentials) -> bool:
         """Check if user has sudo access"""
         try:
             # Try non-interactive sudo first
-            result = await self.ssh_service.execute_command(credentials, "sudo -n true")
-            return result.success
+            return await cached_probe(self.ssh_service, credentials, "sudo -n true")
         except Exception as e:
-            logger.warning(f"Error checking sudo access: {e}")
+            logger.warning("Error checking sudo access: %s", e)
             return False
 
     async def check_openvpn_installed(self, credentials: SSHCredentials) -> bool:
         """Check if OpenVPN is installed"""
-        result = await self.ssh_service.execute_command(credentials, "dpkg -l | grep openvpn")
-        return result.success and "openvpn" in result.stdout.lower()
+        # Query the single package instead of listing the whole dpkg database
+        result = await exec_retry(
+            self.ssh_service,
+            credentials,
+            "dpkg-query -W -f='${Status}\\n' openvpn 2>/dev/null | grep -q 'install ok installed'",
+        )
+        return result.success
 
     async def install_openvpn(  # noqa: C901
         self, credentials: SSHCredentials
@@ -71,84 +434,85 @@ class OpenVPNInstaller:
         try:
             logger.info("Starting OpenVPN installation")
             logger.info(
-                f"Credentials: hostname={credentials.hostname}, port={credentials.port}, username={credentials.username}"
+                "Credentials: hostname=%s, port=%s, username=%s",
+                credentials.hostname,
+                credentials.port,
+                credentials.username,
             )
 
             # Check if already installed
-            logger.info("Checking if OpenVPN is already installed")
-            if await self.check_openvpn_installed(credentials):
-                logger.info("OpenVPN already installed")
-                return InstallationResult(
-                    success=True,
-                    message="OpenVPN уже установлен на сервере",
-                    output="OpenVPN is already installed",
-                )
-
-            # Check sudo access and warn if needed
-            logger.info("Checking sudo access")
-            has_sudo = await self.check_sudo_access(credentials)
+            async with self.ssh_service.session(credentials):
+                logger.info("Checking if OpenVPN is already installed")
+                if await self.check_openvpn_installed(credentials):
+                    logger.info("OpenVPN already installed")
+                    return InstallationResult(
+                        success=True,
+                        message="OpenVPN уже установлен на сервере",
+                        output="OpenVPN is already installed",
+                    )
 
-            if not has_sudo:
-                logger.warning(
-                    "Sudo access verification failed - user cannot use sudo without password"
+                # Install OpenVPN (all commands in one SSH exec, led by the sudo check)
+                commands = self.get_install_commands()
+                logger.info("Executing %s install commands", len(commands))
+                result = await run_batch(
+                    self.ssh_service,
+                    credentials,
+                    (_SUDO_CHECK, *commands),
+                    TRANSIENT_EXIT_CODES | {APT_ERROR_EXIT_CODE},
                 )
-                return InstallationResult(
-                    success=False,
-                    message="Пользователь не может использовать sudo без пароля. Пожалуйста, настройте NOPASSWD для sudo или используйте пользователя root.",
-                    output="Для установки OpenVPN требуется:\n1. Добавить пользователя в sudoers с NOPASSWD\n2. Или использовать пользователя root\n\nКоманда для настройки:\necho 'username ALL=(ALL) NOPASSWD: ALL' | sudo tee /etc/sudoers.d/username",
-                    error="Sudo access denied - passwordless sudo required",
-                )
-
-            logger.info("Sudo access OK")
 
-            # Install OpenVPN
-            commands = self.get_install_commands()
-            all_output = []
-
-            for command in commands:
-                logger.info(f"Executing: {command}")
-                result = await self.ssh_service.execute_command(credentials, command)
-
-                all_output.append(f"$ {command}")
-                if result.stdout:
-                    all_output.append(result.stdout)
-                if result.stderr:
-                    all_output.append(f"STDERR: {result.stderr}")
-
-                # For sudo commands, don't immediately fail on non-zero exit codes
-                # Some sudo commands may prompt for password but still work
-                if not result.success and not command.startswith("sudo"):
-                    logger.error(f"Command failed: {command}")
+                if result.exit_code == SUDO_REQUIRED_EXIT_CODE and (
+                    failed_command(result.stdout) == _SUDO_CHECK
+                ):
+                    logger.warning(
+                        "Sudo access verification failed - user cannot use sudo without password"
+                    )
                     return InstallationResult(
                         success=False,
-                        message=f"Ошибка при выполнении команды: {command}",
-                        output="\n".join(all_output),
-                        error=result.stderr,
+                        message="Пользователь не может использовать sudo без пароля. Пожалуйста, настройте NOPASSWD для sudo или используйте пользователя root.",
+                        output="Для установки OpenVPN требуется:\n1. Добавить пользователя в sudoers с NOPASSWD\n2. Или использовать пользователя root\n\nКоманда для настройки:\necho 'username ALL=(ALL) NOPASSWD: ALL' | sudo tee /etc/sudoers.d/username",
+                        error="Sudo access denied - passwordless sudo required",
                     )
-                elif not result.success and command.startswith("sudo"):
-                    # Log sudo issues but continue
-                    logger.warning(f"Sudo command may have required password: {command}")
-                    all_output.append("Note: sudo command may have required password prompt")
-
-            # Verify installation
-            if not await self.check_openvpn_installed(credentials):
-                logger.error("Installation verification failed")
+
+                buf = io.StringIO()
+                buf.write(format_batch_output(result))
+
+                if not result.success:
+                    command = failed_command(result.stdout)
+                    # For sudo commands, don't immediately fail on non-zero exit codes
+                    # Some sudo commands may prompt for password but still work
+                    if not command.startswith("sudo"):
+                        logger.error("Command failed: %s", command)
+                        return InstallationResult(
+                            success=False,
+                            message=f"Ошибка при выполнении команды: {command}",
+                            output=buf.getvalue(),
+                            error=result.stderr,
+                        )
+                    # Log sudo issues and let the verification decide
+                    logger.warning("Sudo command may have required password: %s", command)
+                    buf.write("\nNote: sudo command may have required password prompt")
+
+                    # A clean exit of the batch already proves the install, so the
+                    # package is only re-checked after a failed sudo step
+                    if not await self.check_openvpn_installed(credentials):
+                        logger.error("Installation verification failed")
+                        return InstallationResult(
+                            success=False,
+                            message="Установка завершена, но проверка не прошла. Возможно, требуется ручной ввод пароля sudo.",
+                            output=buf.getvalue(),
+                            error="Installation verification failed - may need manual sudo password",
+                        )
+
+                logger.info("OpenVPN installation completed successfully")
                 return InstallationResult(
-                    success=False,
-                    message="Установка завершена, но проверка не прошла. Возможно, требуется ручной ввод пароля sudo.",
-                    output="\n".join(all_output),
-                    error="Installation verification failed - may need manual sudo password",
+                    success=True,
+                    message="OpenVPN успешно установлен и настроен",
+                    output=buf.getvalue(),
                 )
 
-            logger.info("OpenVPN installation completed successfully")
-            return InstallationResult(
-                success=True,
-                message="OpenVPN успешно установлен и настроен",
-                output="\n".join(all_output),
-            )
-
         except Exception as e:
-            logger.error(f"Exception in install_openvpn: {e}")
+            logger.error("Exception in install_openvpn: %s", e)
             return InstallationResult(
                 success=False, message=f"Ошибка установки: {str(e)}", output="", error=str(e)
             )
@@ -160,94 +524,68 @@ class OpenVPNConfigurator:
     def __init__(self, ssh_service: SSHService):
         self.ssh_service = ssh_service
 
+    def get_setup_phases(
+        self, server_config: dict, username: str = "root"
+    ) -> Mapping[str, Sequence[str]]:
+        """
+        Get commands for OpenVPN setup grouped into phases - following DigitalOcean guide
+
+        Phase order and dependencies are described by ``SETUP_PHASE_DEPENDENCIES``.
+        The result is cached per configuration and must not be modified.
+        """
+        return _build_setup_phases(
+            port=server_config.get("port", 1194),
+            protocol=server_config.get("protocol", "udp"),
+        )
+
+    def get_setup_files(self, server_config: dict) -> Dict[str, Dict[str, str]]:
+        """Get files to upload before a phase runs, as ``{phase: {path: content}}``"""
+        server_conf = _build_server_conf(
+            port=server_config.get("port", 1194),
+            protocol=server_config.get("protocol", "udp"),
+            subnet=server_config.get("subnet", "10.8.0.0"),
+            netmask=server_config.get("netmask", "255.255.255.0"),
+            dns_servers=tuple(server_config.get("dns_servers", ["8.8.8.8", "8.8.4.4"])),
+        )
+        return {"server_conf": {_SERVER_CONF_UPLOAD: server_conf}}
+
     def get_setup_commands(self, server_config: dict, username: str = "root") -> List[str]:
-        """Get commands for OpenVPN setup - following DigitalOcean guide"""
-        port = server_config.get("port", 1194)
-        protocol = server_config.get("protocol", "udp")
-        subnet = server_config.get("subnet", "10.8.0.0")
-        netmask = server_config.get("netmask", "255.255.255.0")
-        dns_servers = server_config.get("dns_servers", ["8.8.8.8", "8.8.4.4"])
-
-        # Build full path to user's home directory
-        # Use current directory instead of absolute path to avoid permission issues
-
-        # Build DNS push commands
-        dns_push_lines = []
-        for dns in dns_servers:
-            dns_push_lines.append(f'push "dhcp-option DNS {dns}"')
-        dns_config = "\n".join(dns_push_lines)
-
-        # explicit-exit-notify only for UDP
-        exit_notify = "" if protocol == "tcp" else "explicit-exit-notify 1\n"
-
-        return [
-            # Step 1: Clean and recreate easy-rsa directory (without sudo!)
-            "rm -rf ~/easy-rsa 2>/dev/null || true",
-            "mkdir -p ~/easy-rsa",
-            # Step 2: Copy easyrsa files from package
-            "cp -r /usr/share/easy-rsa/* ~/easy-rsa/ 2>/dev/null || true",
-            # Step 3: Configure vars file (use full path)
-            "echo 'set_var EASYRSA_ALGO \"ec\"' > ~/easy-rsa/vars",
-            "echo 'set_var EASYRSA_DIGEST \"sha512\"' >> ~/easy-rsa/vars",
-            # Step 4: Initialize PKI
-            "cd ~/easy-rsa && ./easyrsa init-pki",
-            # Step 5: Generate server certificate request
-            "cd ~/easy-rsa && ./easyrsa --batch gen-req server nopass",
-            # Step 6: Build CA and sign server certificate
-            "cd ~/easy-rsa && ./easyrsa --batch build-ca nopass",
-            "cd ~/easy-rsa && ./easyrsa --batch sign-req server server",
-            # Step 7: Generate ta.key for TLS auth
-            "cd ~/easy-rsa && openvpn --genkey secret ta.key",
-            # Step 8: Create /etc/openvpn directory
-            "sudo mkdir -p /etc/openvpn",
-            # Step 9: Copy files to /etc/openvpn/ (no DH file for EC)
-            "sudo cp ~/easy-rsa/pki/private/server.key /etc/openvpn/",
-            "sudo cp ~/easy-rsa/pki/issued/server.crt /etc/openvpn/",
-            "sudo cp ~/easy-rsa/pki/ca.crt /etc/openvpn/",
-            "sudo cp ~/easy-rsa/ta.key /etc/openvpn/",
-            # Step 9.5: Generate initial empty CRL
-            "cd ~/easy-rsa && ./easyrsa gen-crl",
-            "sudo cp ~/easy-rsa/pki/crl.pem /etc/openvpn/",
-            "sudo chmod 644 /etc/openvpn/crl.pem",
-            # Step 11: Create server config in /etc/openvpn/server.conf
-            f"sudo tee /etc/openvpn/server.conf > /dev/null << 'EOF'\n"
-            f"port {port}\n"
-            f"proto {protocol}\n"
-            f"dev tun\n"
-            f"ca ca.crt\n"
-            f"cert server.crt\n"
-            f"key server.key\n"
-            f"dh dh.pem\n"
-            f"crl-verify crl.pem\n"
-            f"server {subnet} {netmask}\n"
-            f"ifconfig-pool-persist /var/log/openvpn/ipp.txt\n"
-            f'push "redirect-gateway def1 bypass-dhcp"\n'
-            f"{dns_config}\n"
-            f"keepalive 10 120\n"
-            f"tls-crypt ta.key\n"
-            f"cipher AES-256-GCM\n"
-            f"auth SHA256\n"
-            f"management localhost 7505\n"
-            f"management-client-auth\n"
-            f"user nobody\n"
-            f"group nogroup\n"
-            f"persist-key\n"
-            f"persist-tun\n"
-            f"status /var/log/openvpn/openvpn-status.log\n"
-            f"log-append /var/log/openvpn/openvpn.log\n"
-            f"verb 3\n"
-            f"{exit_notify}"
-            f"mssfix 0\n"
-            f"EOF",
-            # Step 12: Create log directory
-            "sudo mkdir -p /var/log/openvpn",
-            # Step 13: Enable IP forwarding
-            "sudo sysctl -w net.ipv4.ip_forward=1",
-            "echo 'net.ipv4.ip_forward=1' | sudo tee -a /etc/sysctl.conf",
-            # Step 14: Configure firewall (basic)
-            f"sudo ufw allow {port}/{protocol}",
-            "sudo ufw allow OpenSSH",
-        ]
+        """Get all setup commands as one list, in phase order"""
+        phases = self.get_setup_phases(server_config, username)
+        return [command for name in SETUP_PHASE_DEPENDENCIES for command in phases[name]]
+
+    async def _run_phases(
+        self,
+        credentials: SSHCredentials,
+        phases: Mapping[str, Sequence[str]],
+        files: Mapping[str, Mapping[str, str]],
+    ) -> Dict[str, Optional[CommandResult]]:
+        """
+        Run setup phases, starting each one as soon as its dependencies succeed
+
+        Independent phases run concurrently over separate SSH sessions, after
+        uploading the phase's files. A phase whose dependency failed is skipped
+        and reported as ``None``.
+        """
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_SESSIONS)
+        tasks: Dict[str, "asyncio.Task[Optional[CommandResult]]"] = {}
+
+        async def run_phase(name: str) -> Optional[CommandResult]:
+            for dependency in SETUP_PHASE_DEPENDENCIES[name]:
+                result = await tasks[dependency]
+                if result is None or not result.success:
+                    return None
+            async with semaphore:
+                logger.info("Running setup phase '%s' (%s commands)", name, len(phases[name]))
+                failed = await upload_files(self.ssh_service, credentials, files.get(name, {}))
+                if failed is not None:
+                    return failed
+                return await run_batch(self.ssh_service, credentials, phases[name])
+
+        for name in SETUP_PHASE_DEPENDENCIES:
+            tasks[name] = asyncio.ensure_future(run_phase(name))
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks, results))
 
     async def configure_openvpn(
         self, credentials: SSHCredentials, server_config: dict
@@ -256,37 +594,40 @@ class OpenVPNConfigurator:
         try:
             logger.info("Starting OpenVPN configuration")
 
-            commands = self.get_setup_commands(server_config, credentials.username)
-            all_output = []
-
-            for command in commands:
-                logger.info(f"Executing: {command}")
-                result = await self.ssh_service.execute_command(credentials, command)
-
-                all_output.append(f"$ {command}")
-                if result.stdout:
-                    all_output.append(result.stdout)
-                if result.stderr:
-                    all_output.append(f"STDERR: {result.stderr}")
-
-                if not result.success:
-                    logger.error(f"Command failed: {command}")
+            async with self.ssh_service.session(credentials):
+                phases = self.get_setup_phases(server_config, credentials.username)
+                files = self.get_setup_files(server_config)
+                results = await self._run_phases(credentials, phases, files)
+
+                buf = io.StringIO()
+                for phase_result in results.values():
+                    if phase_result is not None:
+                        if buf.tell():
+                            buf.write("\n")
+                        buf.write(format_batch_output(phase_result))
+                output = buf.getvalue()
+
+                failed = [r for r in results.values() if r is not None and not r.success]
+                if failed:
+                    result = failed[0]
+                    command = failed_command(result.stdout)
+                    logger.error("Command failed: %s", command)
                     return InstallationResult(
                         success=False,
                         message=f"Ошибка при выполнении команды: {command}",
-                        output="\n".join(all_output),
+                        output=output,
                         error=result.stderr,
                     )
 
-            logger.info("OpenVPN configuration completed successfully")
-            return InstallationResult(
-                success=True,
-                message="OpenVPN сервер успешно настроен",
-                output="\n".join(all_output),
-            )
+                logger.info("OpenVPN configuration completed successfully")
+                return InstallationResult(
+                    success=True,
+                    message="OpenVPN сервер успешно настроен",
+                    output=output,
+                )
 
         except Exception as e:
-            logger.error(f"Exception in configure_openvpn: {e}")
+            logger.error("Exception in configure_openvpn: %s", e)
             return InstallationResult(
                 success=False, message=f"Ошибка настройки: {str(e)}", output="", error=str(e)
             )
@@ -298,65 +639,53 @@ class OpenVPNClientManager:
     def __init__(self, ssh_service: SSHService):
         self.ssh_service = ssh_service
 
+    def get_client_generation_stages(self, client_name: str) -> Dict[str, List[str]]:
+        """
+        Get client generation commands grouped into stages
+
+        Only the ``sign`` stage touches shared CA state (index and serial);
+        ``request`` and ``package`` of different clients are independent.
+        """
+        return {
+            "request": [
+                # Step 1: Generate client certificate request (stages are separate shells)
+                "cd ~/easy-rsa",
+                f"./easyrsa --batch gen-req {client_name} nopass",
+            ],
+            "sign": [
+                # Step 2: Sign client certificate
+                "cd ~/easy-rsa",
+                f"./easyrsa --batch sign-req client {client_name}",
+            ],
+            "package": [
+                # Step 3: Create client-configs directory
+                "mkdir -p ~/client-configs/files",
+                "mkdir -p ~/client-configs/keys",
+                # Step 4: Copy client files
+                f"cp ~/easy-rsa/pki/private/{client_name}.key ~/client-configs/keys/",
+                f"cp ~/easy-rsa/pki/issued/{client_name}.crt ~/client-configs/keys/",
+                "cp ~/easy-rsa/pki/ca.crt ~/client-configs/keys/",
+                "cp ~/easy-rsa/ta.key ~/client-configs/keys/",
+                # Steps 5-6: base.conf and make_config.sh are uploaded (see get_client_files)
+                # Step 7: Make script executable and run it
+                "chmod +x ~/client-configs/make_config.sh",
+                f"cd ~/client-configs && ./make_config.sh {client_name}",
+            ],
+        }
+
     def get_client_generation_commands(
         self, client_name: str, server_ip: str, server_port: int, protocol: str
     ) -> List[str]:
         """Get commands to generate client certificate and .ovpn file"""
-        return [
-            # Step 1: Generate client certificate request
-            f"cd ~/easy-rsa && ./easyrsa --batch gen-req {client_name} nopass",
-            # Step 2: Sign client certificate
-            f"cd ~/easy-rsa && ./easyrsa --batch sign-req client {client_name}",
-            # Step 3: Create client-configs directory
-            "mkdir -p ~/client-configs/files",
-            "mkdir -p ~/client-configs/keys",
-            # Step 4: Copy client files
-            f"cp ~/easy-rsa/pki/private/{client_name}.key ~/client-configs/keys/",
-            f"cp ~/easy-rsa/pki/issued/{client_name}.crt ~/client-configs/keys/",
-            "cp ~/easy-rsa/pki/ca.crt ~/client-configs/keys/",
-            "cp ~/easy-rsa/ta.key ~/client-configs/keys/",
-            # Step 5: Create base client config
-            f"cat > ~/client-configs/base.conf << 'EOF'\n"
-            f"client\n"
-            f"dev tun\n"
-            f"proto {protocol}\n"
-            f"remote {server_ip} {server_port}\n"
-            f"resolv-retry infinite\n"
-            f"nobind\n"
-            f"user nobody\n"
-            f"group nogroup\n"
-            f"persist-key\n"
-            f"persist-tun\n"
-            f"remote-cert-tls server\n"
-            f"cipher AES-256-GCM\n"
-            f"auth SHA256\n"
-            f"key-direction 1\n"
-            f"verb 3\n"
-            f"EOF",
-            # Step 6: Create generation script
-            "cat > ~/client-configs/make_config.sh << 'EOF'\n"
-            "#!/bin/bash\n"
-            "CLIENT=$1\n"
-            "KEY_DIR=~/client-configs/keys\n"
-            "OUTPUT_DIR=~/client-configs/files\n"
-            "BASE_CONFIG=~/client-configs/base.conf\n"
-            "\n"
-            "cat ${BASE_CONFIG} \\\n"
-            "    <(echo -e '<ca>') \\\n"
-            "    ${KEY_DIR}/ca.crt \\\n"
-            "    <(echo -e '</ca>\\n<cert>') \\\n"
-            "    ${KEY_DIR}/${CLIENT}.crt \\\n"
-            "    <(echo -e '</cert>\\n<key>') \\\n"
-            "    ${KEY_DIR}/${CLIENT}.key \\\n"
-            "    <(echo -e '</key>\\n<tls-crypt>') \\\n"
-            "    ${KEY_DIR}/ta.key \\\n"
-            "    <(echo -e '</tls-crypt>') \\\n"
-            "    > ${OUTPUT_DIR}/${CLIENT}.ovpn\n"
-            "EOF",
-            # Step 7: Make script executable and run it
-            "chmod +x ~/client-configs/make_config.sh",
-            f"cd ~/client-configs && ./make_config.sh {client_name}",
-        ]
+        stages = self.get_client_generation_stages(client_name)
+        return [command for commands in stages.values() for command in commands]
+
+    def get_client_files(self, server_ip: str, server_port: int, protocol: str) -> Dict[str, str]:
+        """Get client config files to upload, as ``{path: content}``"""
+        return {
+            "client-configs/base.conf": _build_base_conf(server_ip, server_port, protocol),
+            "client-configs/make_config.sh": _MAKE_CONFIG_SCRIPT,
+        }
 
     async def create_client(
         self,
@@ -368,62 +697,126 @@ class OpenVPNClientManager:
     ) -> InstallationResult:
         """Create client certificate and .ovpn config"""
         try:
-            logger.info(f"Creating client: {client_name}")
+            logger.info("Creating client: %s", client_name)
 
-            commands = self.get_client_generation_commands(
-                client_name, server_ip, server_port, protocol
-            )
-            all_output = []
+            async with self.ssh_service.session(credentials):
+                commands = self.get_client_generation_commands(
+                    client_name, server_ip, server_port, protocol
+                )
+                logger.info("Executing %s client generation commands", len(commands))
+                files = self.get_client_files(server_ip, server_port, protocol)
+                result = await upload_files(self.ssh_service, credentials, files)
+                if result is None:
+                    result = await run_batch(self.ssh_service, credentials, commands)
+                return self._client_result(client_name, result, format_batch_output(result))
 
-            for command in commands:
-                logger.info(f"Executing: {command}")
-                result = await self.ssh_service.execute_command(credentials, command)
+        except Exception as e:
+            logger.error("Exception in create_client: %s", e)
+            return InstallationResult(
+                success=False, message=f"Ошибка создания клиента: {str(e)}", output="", error=str(e)
+            )
 
-                all_output.append(f"$ {command}")
-                if result.stdout:
-                    all_output.append(result.stdout)
-                if result.stderr:
-                    all_output.append(f"STDERR: {result.stderr}")
+    async def create_clients(
+        self,
+        credentials: SSHCredentials,
+        client_names: Sequence[str],
+        server_ip: str,
+        server_port: int,
+        protocol: str,
+    ) -> List[InstallationResult]:
+        """
+        Create several clients concurrently over one connection
 
-                if not result.success:
-                    logger.error(f"Command failed: {command}")
-                    return InstallationResult(
-                        success=False,
-                        message=f"Ошибка при выполнении команды: {command}",
-                        output="\n".join(all_output),
-                        error=result.stderr,
-                    )
+        Config files are uploaded once. Each client runs its generation stages
+        in order, with at most ``MAX_PARALLEL_SESSIONS`` clients in flight; the
+        ``sign`` stage is serialized because easy-rsa updates the CA database.
+        Results are returned in the order of ``client_names``.
+        """
+        pki_lock = asyncio.Lock()
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_SESSIONS)
+
+        async def create_one(client_name: str) -> InstallationResult:
+            stages = self.get_client_generation_stages(client_name)
+            buf = io.StringIO()
+            async with semaphore:
+                for stage, commands in stages.items():
+                    if stage == "sign":
+                        async with pki_lock:
+                            result = await run_batch(self.ssh_service, credentials, commands)
+                    else:
+                        result = await run_batch(self.ssh_service, credentials, commands)
+                    if buf.tell():
+                        buf.write("\n")
+                    buf.write(format_batch_output(result))
+                    if not result.success:
+                        break
+            return self._client_result(client_name, result, buf.getvalue())
 
-            logger.info(f"Client {client_name} created successfully")
-            return InstallationResult(
-                success=True,
-                message=f"Клиент {client_name} успешно создан",
-                output="\n".join(all_output),
-            )
+        try:
+            logger.info("Creating %s clients", len(client_names))
+
+            async with self.ssh_service.session(credentials):
+                files = self.get_client_files(server_ip, server_port, protocol)
+                failed = await upload_files(self.ssh_service, credentials, files)
+                if failed is not None:
+                    return [
+                        self._client_result(name, failed, format_batch_output(failed))
+                        for name in client_names
+                    ]
+                return list(await asyncio.gather(*(create_one(name) for name in client_names)))
 
         except Exception as e:
-            logger.error(f"Exception in create_client: {e}")
+            logger.error("Exception in create_clients: %s", e)
+            return [
+                InstallationResult(
+                    success=False,
+                    message=f"Ошибка создания клиента: {str(e)}",
+                    output="",
+                    error=str(e),
+                )
+                for _ in client_names
+            ]
+
+    @staticmethod
+    def _client_result(client_name: str, result: CommandResult, output: str) -> InstallationResult:
+        """Turn the last batch result of a client into an InstallationResult"""
+        if not result.success:
+            command = failed_command(result.stdout)
+            logger.error("Command failed: %s", command)
             return InstallationResult(
-                success=False, message=f"Ошибка создания клиента: {str(e)}", output="", error=str(e)
+                success=False,
+                message=f"Ошибка при выполнении команды: {command}",
+                output=output,
+                error=result.stderr,
             )
 
+        logger.info("Client %s created successfully", client_name)
+        return InstallationResult(
+            success=True,
+            message=f"Клиент {client_name} успешно создан",
+            output=output,
+        )
+
     async def download_client_config(
         self, credentials: SSHCredentials, client_name: str
     ) -> tuple[bool, str, bytes]:
         """Download .ovpn config file"""
         try:
-            # Read the .ovpn file from server
-            result = await self.ssh_service.execute_command(
-                credentials, f"cat ~/client-configs/files/{client_name}.ovpn"
+            # Read the .ovpn file over SFTP; relative paths start at the user's home
+            content = await self.ssh_service.download_file(
+                credentials, f"client-configs/files/{client_name}.ovpn"
             )
 
-            if result.success and result.stdout:
-                return True, f"{client_name}.ovpn", result.stdout.encode("utf-8")
+            if content:
+                return True, f"{client_name}.ovpn", content
             else:
                 return False, "", b""
 
+        except FileNotFoundError:
+            logger.warning("Client config not found on server: %s.ovpn", client_name)
+            return False, "", b""
         except Exception as e:
-            logger.error(f"Exception downloading config: {e}")
+            logger.error("Exception downloading config: %s", e)
             return False, "", b""
 
 
@@ -434,7 +827,26 @@ class OpenVPNManager:
         self.ssh_service = ssh_service
 
     async def get_status(self, credentials: SSHCredentials) -> dict:
-        """Get OpenVPN service status"""
+        """
+        Get OpenVPN service status
+
+        Uses ``systemctl is-active``, which prints a single state word and does
+        not depend on the locale; see get_detailed_status() for the full output.
+        """
+        result = await self.ssh_service.execute_command(
+            credentials, "systemctl is-active openvpn@server"
+        )
+        state = result.stdout.strip()
+
+        return {
+            "running": state == "active",
+            "output": state,
+            # is-active exits non-zero for any state but active; that is not an error
+            "error": result.stderr if not state else None,
+        }
+
+    async def get_detailed_status(self, credentials: SSHCredentials) -> dict:
+        """Get full ``systemctl status`` output of the OpenVPN service for display"""
         result = await self.ssh_service.execute_command(
             credentials, "sudo systemctl status openvpn@server --no-pager -l"
         )
@@ -484,59 +896,51 @@ class CertificateRevocationService:
             CommandResult with revocation status
         """
         try:
-            logger.info(f"Revoking certificate for client: {client_name}")
-
-            # Step 0: First, try to disconnect the client if connected
-            logger.info("Attempting to disconnect client before revoking...")
-            kill_result = await self.kill_client_connection(credentials, client_name)
-            if kill_result.success:
-                logger.info(f"Client {client_name} disconnected successfully")
-            else:
-                logger.warning(
-                    f"Could not disconnect client (may not be connected): {kill_result.stderr}"
-                )
+            logger.info("Revoking certificate for client: %s", client_name)
 
-            # Commands for certificate revocation
+            # Revocation runs as one exec; the cd carries over to the later steps.
+            # Never rerun: a second revoke of the same name fails, and a dropped
+            # connection may already have revoked it
             commands = [
+                # Step 0: Disconnect the client through the management interface.
+                # Best-effort: the client may not be connected or nc may be missing
+                f"echo {shlex.quote(f'kill {client_name}')} "
+                "| sudo nc -w 1 localhost 7505 2>/dev/null || true",
+                "cd ~/easy-rsa",
                 # Step 1: Revoke the certificate
-                f"cd ~/easy-rsa && echo 'yes' | ./easyrsa revoke {client_name}",
+                f"echo 'yes' | ./easyrsa revoke {client_name}",
                 # Step 2: Regenerate CRL
-                "cd ~/easy-rsa && ./easyrsa gen-crl",
+                "./easyrsa gen-crl",
                 # Step 3: Copy updated CRL to OpenVPN directory
-                "sudo cp ~/easy-rsa/pki/crl.pem /etc/openvpn/",
+                "sudo cp pki/crl.pem /etc/openvpn/",
                 "sudo chmod 644 /etc/openvpn/crl.pem",
                 # Step 4: Force OpenVPN to reload CRL
-                "sudo systemctl reload openvpn@server || sudo systemctl restart openvpn@server",
+                _RELOAD_SERVER,
             ]
+            result = await run_batch(self.ssh_service, credentials, commands, max_retries=0)
+            output = format_batch_output(result)
 
-            all_output = []
-            all_output.append(f"=== Disconnect Result ===\n{kill_result.stdout}\n")
-
-            for command in commands:
-                result = await self.ssh_service.execute_command(credentials, command)
-                all_output.append(f"$ {command}")
-                all_output.append(result.stdout)
-
-                if result.exit_code != 0 and "reload" not in command:
-                    error_msg = f"Failed to execute: {command}\nError: {result.stderr}"
-                    logger.error(error_msg)
-                    return CommandResult(
-                        stdout="\n".join(all_output),
-                        stderr=result.stderr,
-                        exit_code=result.exit_code,
-                        success=False,
-                    )
+            # A failed reload/restart does not undo the revocation
+            if not result.success and failed_command(result.stdout) != _RELOAD_SERVER:
+                command = failed_command(result.stdout)
+                logger.error("Failed to execute: %s\nError: %s", command, result.stderr)
+                return CommandResult(
+                    stdout=output,
+                    stderr=result.stderr,
+                    exit_code=result.exit_code,
+                    success=False,
+                )
 
-            logger.info(f"Certificate revoked successfully: {client_name}")
+            logger.info("Certificate revoked successfully: %s", client_name)
             return CommandResult(
-                stdout="\n".join(all_output),
+                stdout=output,
                 stderr="",
                 exit_code=0,
                 success=True,
             )
 
         except Exception as e:
-            logger.error(f"Exception in revoke_certificate: {e}")
+            logger.error("Exception in revoke_certificate: %s", e)
             return CommandResult(
                 stdout="",
                 stderr=str(e),
@@ -562,77 +966,85 @@ class CertificateRevocationService:
             CommandResult with disconnection status
         """
         try:
-            logger.info(f"Killing connection for client: {client_name}")
-
-            # Check if netcat is installed
-            check_nc = "command -v nc >/dev/null 2>&1 && echo 'installed' || echo 'not_installed'"
-            nc_check = await self.ssh_service.execute_command(credentials, check_nc)
-
-            if "not_installed" in nc_check.stdout:
-                logger.error("Netcat not installed, cannot use management interface")
-                return CommandResult(
-                    stdout="",
-                    stderr="Netcat (nc) is not installed. Please install: sudo apt install -y netcat-openbsd",
-                    exit_code=1,
-                    success=False,
+            logger.info("Killing connection for client: %s", client_name)
+
+            async with self.ssh_service.session(credentials):
+                # Find the client's CLIENT_LIST row server-side; awk exits 0 if found,
+                # 1 if not connected and 2 if the management interface gave no output
+                # Format: CLIENT_LIST,<CN>,<Real Address>,<Virtual Address>,...
+                status_cmd = (
+                    "echo 'status 2' | sudo nc -w 1 localhost 7505 2>/dev/null | awk -F, "
+                    f"-v cn={shlex.quote(client_name)} "
+                    '\'$1 == "CLIENT_LIST" && $2 == cn {print; found = 1} '
+                    "END {if (!NR) exit 2; exit !found}'"
                 )
 
-            # First, check current connections to find the exact CN
-            status_cmd = "echo 'status' | sudo nc -w 1 localhost 7505 2>/dev/null"
-            status_result = await self.ssh_service.execute_command(credentials, status_cmd)
-
-            if not status_result.success or "CLIENT_LIST" not in status_result.stdout:
-                logger.error("Cannot access management interface or no clients connected")
-                return CommandResult(
-                    stdout=status_result.stdout,
-                    stderr="Management interface not accessible",
-                    exit_code=1,
-                    success=False,
+                # Both queries are independent; run them on parallel channels
+                # (the netcat check is cached per host once it succeeds)
+                nc_installed, status_result = await asyncio.gather(
+                    cached_probe(self.ssh_service, credentials, "command -v nc >/dev/null 2>&1"),
+                    self.ssh_service.execute_command(credentials, status_cmd),
                 )
 
-            # Parse status output to find client Common Name
-            # Format: CLIENT_LIST,<CN>,<Real Address>,<Virtual Address>,...
-            client_found = False
-            for line in status_result.stdout.split("\n"):
-                if line.startswith("CLIENT_LIST") and client_name in line:
-                    client_found = True
-                    logger.info(f"Found client in connection list: {line}")
-                    break
-
-            if not client_found:
-                logger.warning(f"Client {client_name} not found in active connections")
-                return CommandResult(
-                    stdout=f"Client {client_name} is not currently connected",
-                    stderr="",
-                    exit_code=0,
-                    success=True,
-                )
+                if not nc_installed:
+                    logger.error("Netcat not installed, cannot use management interface")
+                    return CommandResult(
+                        stdout="",
+                        stderr="Netcat (nc) is not installed. Please install: sudo apt install -y netcat-openbsd",
+                        exit_code=1,
+                        success=False,
+                    )
 
-            # Kill the client using management interface
-            # Command format: kill <Common Name>
-            kill_cmd = f"echo 'kill {client_name}' | sudo nc -w 1 localhost 7505 2>/dev/null"
-            kill_result = await self.ssh_service.execute_command(credentials, kill_cmd)
+                if status_result.exit_code not in (0, 1):
+                    logger.error("Cannot access management interface")
+                    return CommandResult(
+                        stdout=status_result.stdout,
+                        stderr="Management interface not accessible",
+                        exit_code=1,
+                        success=False,
+                    )
 
-            logger.info(f"Kill command output: {kill_result.stdout}")
+                client_found = status_result.exit_code == 0
+                if client_found:
+                    logger.info("Found client in connection list: %s", status_result.stdout.strip())
 
-            # Check if kill was successful
-            if "SUCCESS" in kill_result.stdout or kill_result.exit_code == 0:
-                return CommandResult(
-                    stdout=f"Client {client_name} disconnected successfully\n{kill_result.stdout}",
-                    stderr="",
-                    exit_code=0,
-                    success=True,
-                )
-            else:
-                return CommandResult(
-                    stdout=kill_result.stdout,
-                    stderr=f"Failed to disconnect client: {kill_result.stderr}",
-                    exit_code=1,
-                    success=False,
+                if not client_found:
+                    logger.warning("Client %s not found in active connections", client_name)
+                    return CommandResult(
+                        stdout=f"Client {client_name} is not currently connected",
+                        stderr="",
+                        exit_code=0,
+                        success=True,
+                    )
+
+                # Kill the client using management interface
+                # Command format: kill <Common Name>
+                kill_cmd = (
+                    f"echo {shlex.quote(f'kill {client_name}')} "
+                    "| sudo nc -w 1 localhost 7505 2>/dev/null"
                 )
+                kill_result = await self.ssh_service.execute_command(credentials, kill_cmd)
+
+                logger.info("Kill command output: %s", kill_result.stdout)
+
+                # Check if kill was successful
+                if "SUCCESS" in kill_result.stdout or kill_result.exit_code == 0:
+                    return CommandResult(
+                        stdout=f"Client {client_name} disconnected successfully\n{kill_result.stdout}",
+                        stderr="",
+                        exit_code=0,
+                        success=True,
+                    )
+                else:
+                    return CommandResult(
+                        stdout=kill_result.stdout,
+                        stderr=f"Failed to disconnect client: {kill_result.stderr}",
+                        exit_code=1,
+                        success=False,
+                    )
 
         except Exception as e:
-            logger.error(f"Exception in kill_client_connection: {e}")
+            logger.error("Exception in kill_client_connection: %s", e)
             return CommandResult(
                 stdout="",
                 stderr=str(e),
@@ -657,14 +1069,14 @@ class CertificateRevocationService:
             CommandResult with block status
         """
         try:
-            logger.info(f"Force disconnecting client with IP: {client_ip}")
+            logger.info("Force disconnecting client with IP: %s", client_ip)
 
             # Block the IP using iptables (temporary, until iptables reload)
             block_cmd = f"sudo iptables -A INPUT -s {client_ip} -j DROP"
             result = await self.ssh_service.execute_command(credentials, block_cmd)
 
             if result.exit_code == 0:
-                logger.info(f"Successfully blocked IP: {client_ip}")
+                logger.info("Successfully blocked IP: %s", client_ip)
                 return CommandResult(
                     stdout=f"IP {client_ip} blocked successfully. Client will be disconnected.",
                     stderr="",
@@ -680,7 +1092,7 @@ class CertificateRevocationService:
                 )
 
         except Exception as e:
-            logger.error(f"Exception in force_disconnect_by_ip: {e}")
+            logger.error("Exception in force_disconnect_by_ip: %s", e)
             return CommandResult(
                 stdout="",
                 stderr=str(e),
@@ -2,15 +2,75 @@
 OpenVPN management services
 """
 
+import csv
 import os
 import tempfile
-import uuid
+from dataclasses import dataclass
 from datetime import timedelta
 
 import paramiko
 from django.utils import timezone
 
-from .models import ClientCertificate, ServerTask
+from .agent.client import new_task_id
+from .models import ClientCertificate, ClientCertificateMaterial, ServerTask
+
+
+@dataclass(slots=True)
+class Connection:
+    """One CLIENT_LIST row of the OpenVPN status log"""
+
+    client_name: str
+    real_address: str
+    virtual_address: str
+    bytes_received: int
+    bytes_sent: int
+    connected_since: str
+
+
+# CLIENT_LIST columns of a status-version 2 log on OpenVPN 2.4+, used until the
+# log's own HEADER,CLIENT_LIST row names them
+_CLIENT_LIST_COLUMNS = (
+    "CLIENT_LIST",
+    "Common Name",
+    "Real Address",
+    "Virtual Address",
+    "Virtual IPv6 Address",
+    "Bytes Received",
+    "Bytes Sent",
+    "Connected Since",
+)
+
+
+def _to_int(value):
+    """Parse a byte counter, treating anything malformed as 0"""
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def _parse_client_list(status_log):
+    """Parse the CLIENT_LIST rows of a status-version 2 log into Connection rows"""
+    columns = _CLIENT_LIST_COLUMNS
+    connections = []
+    for row in csv.reader(status_log.splitlines()):
+        if row[:2] == ["HEADER", "CLIENT_LIST"]:
+            columns = tuple(row[1:])
+        elif row and row[0] == "CLIENT_LIST":
+            fields = dict(zip(columns, row))
+            if "Bytes Sent" not in fields:
+                continue
+            connections.append(
+                Connection(
+                    client_name=fields.get("Common Name", ""),
+                    real_address=fields.get("Real Address", "").split(":")[0],
+                    virtual_address=fields.get("Virtual Address", ""),
+                    bytes_received=_to_int(fields.get("Bytes Received", "")),
+                    bytes_sent=_to_int(fields["Bytes Sent"]),
+                    connected_since=fields.get("Connected Since", ""),
+                )
+            )
+    return connections
 
 
 class SSHService:
@@ -102,7 +162,7 @@ class OpenVPNService:
         """Install OpenVPN on server"""
         # Create task
         task = ServerTask.objects.create(
-            server=server, task_type="install", task_id=str(uuid.uuid4()), created_by=user
+            server=server, task_type="install", task_id=new_task_id(), created_by=user
         )
 
         try:
@@ -310,11 +370,14 @@ explicit-exit-notify 1
                 server=server,
                 name=client_name,
                 email=email,
-                client_cert=cert_result["output"],
-                client_key=key_result["output"],
                 expires_at=timezone.now() + timedelta(days=365),
                 created_by_id=1,  # This should be passed as parameter
             )
+            ClientCertificateMaterial.objects.create(
+                cert=client,
+                client_cert=cert_result["output"],
+                client_key=key_result["output"],
+            )
 
             return client
 
@@ -366,7 +429,11 @@ class MonitoringService:
         self.ssh_service = SSHService()
 
     def get_active_connections(self, server):
-        """Get active VPN connections from server"""
+        """
+        Get active VPN connections from server
+
+        Returns a list of Connection rows; use dataclasses.asdict() to serialize them.
+        """
         try:
             self.ssh_service.connect(server)
 
@@ -378,34 +445,8 @@ class MonitoringService:
             if result["exit_code"] != 0:
                 return []
 
-            # Parse status file
-            connections = []
-            lines = result["output"].split("\n")
-
-            parsing_clients = False
-            for line in lines:
-                if line.startswith("CLIENT_LIST"):
-                    parsing_clients = True
-                    continue
-                elif line.startswith("ROUTING_TABLE"):
-                    parsing_clients = False
-                    continue
-
-                if parsing_clients and line.strip():
-                    parts = line.split(",")
-                    if len(parts) >= 5:
-                        connections.append(
-                            {
-                                "client_name": parts[0],
-                                "real_address": parts[1].split(":")[0],
-                                "virtual_address": parts[2],
-                                "bytes_received": int(parts[3]) if parts[3].isdigit() else 0,
-                                "bytes_sent": int(parts[4]) if parts[4].isdigit() else 0,
-                                "connected_since": parts[5] if len(parts) > 5 else "",
-                            }
-                        )
-
-            return connections
+            # Parse status file: only CLIENT_LIST rows carry connections
+            return _parse_client_list(result["output"])
 
         except Exception:
             return []
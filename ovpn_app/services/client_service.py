@@ -3,14 +3,14 @@ Client Management Service
 Single Responsibility: Handle all client certificate operations via agent
 """
 
-import uuid
+import json
 from typing import Dict, List, Optional
 
-from ovpn_app.agent.client import AgentClient
+from ovpn_app.agent.client import AgentClient, new_task_id
 from ovpn_app.agent.deployment import AgentDeployer
-from ovpn_app.config import AgentConfig
+from ovpn_app.config import server_agent_config
 from ovpn_app.models import ClientCertificate, OpenVPNServer
-from ovpn_app.ssh_service import SSHCredentials
+from ovpn_app.ssh_service import SSHCredentials, SSHService
 
 
 class ClientManagementService:
@@ -57,15 +57,14 @@ class ClientManagementService:
             Exception: If agent execution fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
+        await self.deployer.ensure_agent(self.credentials)
 
-        # Build configuration
-        config = AgentConfig.from_server(self.server)
-        config_dict = config.to_dict()
+        # Build configuration (cached until the server is saved again)
+        config_dict = server_agent_config(self.server)
         config_dict["server_host"] = self.server.host
 
         # Execute create-client command via agent
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.create_client(
             self.credentials,
             task_id,
@@ -77,7 +76,6 @@ class ClientManagementService:
             raise Exception(result.get("message", "Failed to create client"))
 
         # Parse output
-        import json
         client_data = json.loads(result.get("output", "{}"))
 
         return client_data
@@ -96,10 +94,10 @@ class ClientManagementService:
             Exception: If agent execution fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
+        await self.deployer.ensure_agent(self.credentials)
 
         # Execute revoke-client command via agent
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.revoke_client(
             self.credentials,
             task_id,
@@ -110,7 +108,6 @@ class ClientManagementService:
             raise Exception(result.get("message", "Failed to revoke client"))
 
         # Parse output
-        import json
         revoke_data = json.loads(result.get("output", "{}"))
 
         return revoke_data
@@ -126,10 +123,10 @@ class ClientManagementService:
             Exception: If agent execution fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
+        await self.deployer.ensure_agent(self.credentials)
 
         # Execute list-clients command via agent
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.list_clients(
             self.credentials,
             task_id,
@@ -139,7 +136,6 @@ class ClientManagementService:
             raise Exception(result.get("message", "Failed to list clients"))
 
         # Parse output
-        import json
         clients = json.loads(result.get("output", "[]"))
 
         return clients
@@ -158,8 +154,6 @@ class ClientManagementService:
             Exception: If file download fails
         """
         # Use SSHService to download file
-        from ovpn_app.ssh_service import SSHService
-
         ssh_service = SSHService()
         remote_path = f"/home/{self.server.ssh_username}/client-configs/{client_name}.ovpn"
 
@@ -3,10 +3,10 @@ Monitoring Service
 Single Responsibility: Handle all server monitoring and connection management
 """
 
-import uuid
+import json
 from typing import Dict, List
 
-from ovpn_app.agent.client import AgentClient
+from ovpn_app.agent.client import AgentClient, new_task_id
 from ovpn_app.agent.deployment import AgentDeployer
 from ovpn_app.models import OpenVPNServer
 from ovpn_app.ssh_service import SSHCredentials
@@ -57,17 +57,16 @@ class MonitoringService:
             Exception: If agent execution fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
+        await self.deployer.ensure_agent(self.credentials)
 
         # Execute get-status command via agent
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.get_status(
             self.credentials,
             task_id,
         )
 
         # Even if status is failed, we might have useful data
-        import json
         status_data = json.loads(result.get("output", "{}"))
 
         return status_data
@@ -86,10 +85,10 @@ class MonitoringService:
             Exception: If agent execution fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
+        await self.deployer.ensure_agent(self.credentials)
 
         # Execute disconnect-client command via agent
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.disconnect_client(
             self.credentials,
             task_id,
@@ -100,7 +99,6 @@ class MonitoringService:
             raise Exception(result.get("message", "Failed to disconnect client"))
 
         # Parse output
-        import json
         disconnect_data = json.loads(result.get("output", "{}"))
 
         return disconnect_data
@@ -144,6 +142,30 @@ class MonitoringService:
         status = await self.get_status()
         return status.get("connections", [])
 
+    async def get_dashboard(self) -> Dict:
+        """
+        Get running state, connections and statistics from a single status call
+
+        Use this instead of calling is_running(), get_active_connections() and
+        get_connection_stats() one after another, which costs one agent round trip each.
+
+        Returns:
+            Dictionary with is_running, connections and stats
+
+        Raises:
+            Exception: If status retrieval fails
+        """
+        status = await self.get_status()
+        return {
+            "is_running": status.get("is_running", False),
+            "connections": status.get("connections", []),
+            "stats": status.get("stats", {
+                "connected_clients": 0,
+                "total_bytes_in": 0,
+                "total_bytes_out": 0,
+            }),
+        }
+
     async def is_running(self) -> bool:
         """
         Check if OpenVPN service is running
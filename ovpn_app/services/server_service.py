@@ -3,14 +3,19 @@ Server Management Service
 Single Responsibility: Handle server installation, configuration, and lifecycle
 """
 
-import uuid
-from typing import Dict
+from typing import Dict, List, Optional, Sequence, Union
 
-from ovpn_app.agent.client import AgentClient
+from ovpn_app.agent.client import AgentClient, new_task_id
 from ovpn_app.agent.deployment import AgentDeployer
-from ovpn_app.config import AgentConfig
+from ovpn_app.config import server_agent_config
 from ovpn_app.models import OpenVPNServer
-from ovpn_app.ssh_service import SSHCredentials
+from ovpn_app.ssh_service import (
+    CommandResult,
+    OpenVPNCommandBuilder,
+    SSHConnectionPool,
+    SSHCredentials,
+    SSHServiceContainer,
+)
 
 
 class ServerManagementService:
@@ -25,17 +30,23 @@ class ServerManagementService:
     - Dependency Inversion: Depends on abstract AgentClient
     """
 
-    def __init__(self, server: OpenVPNServer):
+    def __init__(self, server: OpenVPNServer, connection_pool: Optional[SSHConnectionPool] = None):
         """
         Initialize server management service
 
         Args:
             server: OpenVPNServer instance to manage
+            connection_pool: Pool for service control commands (shared pool by default)
         """
         self.server = server
+        self.connection_pool = connection_pool or SSHServiceContainer.get_connection_pool()
         self.agent_client = AgentClient()
         self.deployer = AgentDeployer()
-        self.credentials = SSHCredentials(
+        self.credentials = self._credentials(server)
+
+    @staticmethod
+    def _credentials(server: OpenVPNServer) -> SSHCredentials:
+        return SSHCredentials(
             hostname=server.host,
             port=server.ssh_port,
             username=server.ssh_username,
@@ -54,10 +65,10 @@ class ServerManagementService:
             Exception: If installation fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
+        await self.deployer.ensure_agent(self.credentials)
 
         # Execute install command
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.execute_command(
             "install",
             task_id,
@@ -79,17 +90,14 @@ class ServerManagementService:
             Exception: If configuration fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
-
-        # Build configuration
-        config = AgentConfig.from_server(self.server)
+        await self.deployer.ensure_agent(self.credentials)
 
         # Execute configure command
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.execute_command(
             "configure",
             task_id,
-            config=config.to_dict(),
+            config=server_agent_config(self.server),
         )
 
         if result.get("status") != "success":
@@ -97,10 +105,13 @@ class ServerManagementService:
 
         return result
 
-    async def reinstall(self) -> Dict:
+    async def reinstall(self, force: bool = False) -> Dict:
         """
         Reinstall OpenVPN server (install + configure + generate certs)
 
+        Args:
+            force: Re-upload the agent even if this process already deployed it
+
         Returns:
             Dictionary with reinstallation result
 
@@ -108,17 +119,17 @@ class ServerManagementService:
             Exception: If reinstallation fails
         """
         # Ensure agent is deployed
-        await self.deployer.deploy_agent(self.credentials)
-
-        # Build configuration
-        config = AgentConfig.from_server(self.server)
+        if force:
+            await self.deployer.deploy_agent(self.credentials)
+        else:
+            await self.deployer.ensure_agent(self.credentials)
 
         # Execute reinstall command
-        task_id = str(uuid.uuid4())
+        task_id = new_task_id()
         result = await self.agent_client.execute_command(
             "reinstall",
             task_id,
-            config=config.to_dict(),
+            config=server_agent_config(self.server),
         )
 
         if result.get("status") != "success":
@@ -126,6 +137,44 @@ class ServerManagementService:
 
         return result
 
+    async def _systemctl(self, command: str) -> Dict:
+        """Run a service control command over the pooled SSH connection"""
+        connection = await self.connection_pool.get_connection(self.credentials)
+        return self._control_result(await connection.execute_command(command))
+
+    @staticmethod
+    def _control_result(result: Union[CommandResult, BaseException]) -> Dict:
+        if isinstance(result, BaseException):
+            return {"success": False, "output": "", "error": str(result)}
+        return {
+            "success": result.success,
+            "output": result.stdout,
+            "error": result.stderr,
+        }
+
+    @classmethod
+    async def bulk_restart(
+        cls,
+        servers: Sequence[OpenVPNServer],
+        connection_pool: Optional[SSHConnectionPool] = None,
+    ) -> List[Dict]:
+        """
+        Restart OpenVPN service on several servers concurrently
+
+        Args:
+            servers: Servers to restart
+            connection_pool: Pool to run the restarts on (shared pool by default)
+
+        Returns:
+            Service control result per server, in the order given
+        """
+        pool = connection_pool or SSHServiceContainer.get_connection_pool()
+        results = await pool.run_many(
+            [cls._credentials(server) for server in servers],
+            OpenVPNCommandBuilder.restart_openvpn(),
+        )
+        return [cls._control_result(result) for result in results]
+
     async def start(self) -> Dict:
         """
         Start OpenVPN service
@@ -133,22 +182,7 @@ class ServerManagementService:
         Returns:
             Dictionary with service control result
         """
-        import asyncssh
-
-        async with asyncssh.connect(
-            self.server.host,
-            username=self.server.ssh_username,
-            client_keys=[self.server.ssh_key_path] if self.server.ssh_key_path else None,
-            password=self.server.ssh_password if not self.server.ssh_key_path else None,
-            known_hosts=None,
-        ) as conn:
-            result = await conn.run("sudo systemctl start openvpn@server", check=False)
-
-            return {
-                "success": result.exit_status == 0,
-                "output": result.stdout,
-                "error": result.stderr,
-            }
+        return await self._systemctl(OpenVPNCommandBuilder.start_openvpn())
 
     async def stop(self) -> Dict:
         """
@@ -157,22 +191,7 @@ class ServerManagementService:
         Returns:
             Dictionary with service control result
         """
-        import asyncssh
-
-        async with asyncssh.connect(
-            self.server.host,
-            username=self.server.ssh_username,
-            client_keys=[self.server.ssh_key_path] if self.server.ssh_key_path else None,
-            password=self.server.ssh_password if not self.server.ssh_key_path else None,
-            known_hosts=None,
-        ) as conn:
-            result = await conn.run("sudo systemctl stop openvpn@server", check=False)
-
-            return {
-                "success": result.exit_status == 0,
-                "output": result.stdout,
-                "error": result.stderr,
-            }
+        return await self._systemctl(OpenVPNCommandBuilder.stop_openvpn())
 
     async def restart(self) -> Dict:
         """
@@ -181,19 +200,4 @@ class ServerManagementService:
         Returns:
             Dictionary with service control result
         """
-        import asyncssh
-
-        async with asyncssh.connect(
-            self.server.host,
-            username=self.server.ssh_username,
-            client_keys=[self.server.ssh_key_path] if self.server.ssh_key_path else None,
-            password=self.server.ssh_password if not self.server.ssh_key_path else None,
-            known_hosts=None,
-        ) as conn:
-            result = await conn.run("sudo systemctl restart openvpn@server", check=False)
-
-            return {
-                "success": result.exit_status == 0,
-                "output": result.stdout,
-                "error": result.stderr,
-            }
+        return await self._systemctl(OpenVPNCommandBuilder.restart_openvpn())
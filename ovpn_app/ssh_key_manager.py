@@ -5,8 +5,14 @@ SSH Key Management Module
 Использует cryptography для генерации ключей и asyncssh для установки.
 """
 
+import asyncio
+import atexit
 import logging
-from typing import Optional, Tuple
+import multiprocessing
+import shlex
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 
 import asyncssh
 from cryptography.hazmat.backends import default_backend
@@ -15,6 +21,13 @@ from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
 
 logger = logging.getLogger(__name__)
 
+# Минимальный размер RSA ключа, меньшие ключи считаются небезопасными
+MIN_RSA_KEY_SIZE = 3072
+# Одновременные подключения в bulk_provision; MaxStartups в sshd по умолчанию 10
+MAX_PARALLEL_PROVISION = 10
+# Процессы для генерации RSA; ключи создаются по одному на сервер, больше не нужно
+KEYGEN_WORKERS = 2
+
 
 class SSHKeyType:
     """Типы SSH ключей"""
@@ -23,6 +36,64 @@ class SSHKeyType:
     ED25519 = "ed25519"
 
 
+@lru_cache(maxsize=1)
+def _keygen_pool() -> ProcessPoolExecutor:
+    """
+    Пул процессов для генерации RSA, создается при первом использовании
+
+    Процессы запускаются через spawn: fork из многопоточного процесса
+    Django/Daphne копирует чужие захваченные блокировки и может зависнуть.
+    Пул закрывается при завершении процесса.
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=KEYGEN_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+    atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+    return pool
+
+
+def _rsa_key_pair(key_size: int) -> Tuple[str, str]:
+    """
+    Генерирует пару RSA ключей
+
+    Функция уровня модуля, чтобы ее можно было выполнить в пуле процессов.
+
+    Returns:
+        Tuple[str, str]: (private_key_pem, public_key_openssh)
+    """
+    # Генерация приватного ключа
+    private_key = rsa.generate_private_key(
+        public_exponent=65537, key_size=key_size, backend=default_backend()
+    )
+
+    # Сериализация приватного ключа в PEM формат
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.OpenSSH,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode("utf-8")
+
+    # Получение публичного ключа
+    public_key = private_key.public_key()
+    public_openssh = public_key.public_bytes(
+        encoding=serialization.Encoding.OpenSSH, format=serialization.PublicFormat.OpenSSH
+    ).decode("utf-8")
+
+    logger.info(f"Generated RSA-{key_size} key pair")
+    return private_pem, public_openssh
+
+
+def _install_key_script(public_key: str) -> str:
+    """Скрипт идемпотентной установки ключа в ~/.ssh/authorized_keys"""
+    key = shlex.quote(public_key)
+    return (
+        "set -e; mkdir -p ~/.ssh; chmod 700 ~/.ssh; touch ~/.ssh/authorized_keys; "
+        f"grep -qxF -- {key} ~/.ssh/authorized_keys || "
+        f"printf '%s\\n' {key} >> ~/.ssh/authorized_keys; "
+        "chmod 600 ~/.ssh/authorized_keys"
+    )
+
+
 class SSHKeyManager:
     """Менеджер для генерации и установки SSH ключей"""
 
@@ -32,8 +103,20 @@ class SSHKeyManager:
 
         Args:
             key_type: Тип ключа (rsa или ed25519)
-            rsa_key_size: Размер RSA ключа (по умолчанию 4096)
+            rsa_key_size: Размер RSA ключа (по умолчанию 4096, не меньше 3072)
+
+        Raises:
+            ValueError: Если размер RSA ключа меньше MIN_RSA_KEY_SIZE
         """
+        if key_type == SSHKeyType.RSA:
+            if rsa_key_size < MIN_RSA_KEY_SIZE:
+                raise ValueError(
+                    f"RSA key size must be at least {MIN_RSA_KEY_SIZE} bits, got {rsa_key_size}"
+                )
+            logger.warning(
+                "RSA keys are orders of magnitude slower to generate than Ed25519; "
+                "prefer SSHKeyType.ED25519"
+            )
         self.key_type = key_type
         self.rsa_key_size = rsa_key_size
 
@@ -53,28 +136,26 @@ class SSHKeyManager:
         else:
             raise ValueError(f"Unsupported key type: {self.key_type}")
 
-    def _generate_rsa_key(self) -> Tuple[str, str]:
-        """Генерирует RSA ключ"""
-        # Генерация приватного ключа
-        private_key = rsa.generate_private_key(
-            public_exponent=65537, key_size=self.rsa_key_size, backend=default_backend()
-        )
+    async def generate_key_pair_async(self) -> Tuple[str, str]:
+        """
+        Генерирует пару SSH ключей, не блокируя event loop
 
-        # Сериализация приватного ключа в PEM формат
-        private_pem = private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.OpenSSH,
-            encryption_algorithm=serialization.NoEncryption(),
-        ).decode("utf-8")
+        Генерация RSA занимает до нескольких секунд и выполняется в пуле процессов,
+        чтобы параллельные генерации не упирались в GIL; ED25519 генерируется
+        за доли миллисекунды и вызывается напрямую.
 
-        # Получение публичного ключа
-        public_key = private_key.public_key()
-        public_openssh = public_key.public_bytes(
-            encoding=serialization.Encoding.OpenSSH, format=serialization.PublicFormat.OpenSSH
-        ).decode("utf-8")
+        Returns:
+            Tuple[str, str]: (private_key_pem, public_key_openssh)
+        """
+        if self.key_type == SSHKeyType.RSA:
+            logger.info(f"Generating {self.key_type} SSH key pair...")
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_keygen_pool(), _rsa_key_pair, self.rsa_key_size)
+        return self.generate_key_pair()
 
-        logger.info(f"Generated RSA-{self.rsa_key_size} key pair")
-        return private_pem, public_openssh
+    def _generate_rsa_key(self) -> Tuple[str, str]:
+        """Генерирует RSA ключ"""
+        return _rsa_key_pair(self.rsa_key_size)
 
     def _generate_ed25519_key(self) -> Tuple[str, str]:
         """Генерирует ED25519 ключ"""
@@ -98,7 +179,13 @@ class SSHKeyManager:
         return private_pem, public_openssh
 
     async def install_public_key(
-        self, host: str, username: str, password: str, public_key: str, port: int = 22
+        self,
+        host: str,
+        username: str,
+        password: str,
+        public_key: str,
+        port: int = 22,
+        tunnel: Optional[asyncssh.SSHClientConnection] = None,
     ) -> bool:
         """
         Устанавливает публичный ключ на удаленный сервер
@@ -109,6 +196,7 @@ class SSHKeyManager:
             password: Пароль для подключения
             public_key: Публичный ключ в OpenSSH формате
             port: SSH порт
+            tunnel: Открытое соединение с jump-хостом, через которое подключаться
 
         Returns:
             bool: True если успешно установлен
@@ -118,38 +206,16 @@ class SSHKeyManager:
         try:
             # Подключаемся к серверу с паролем
             async with asyncssh.connect(
-                host, port=port, username=username, password=password, known_hosts=None
+                host,
+                port=port,
+                username=username,
+                password=password,
+                known_hosts=None,
+                tunnel=tunnel or (),
             ) as conn:
-                # Создаем директорию .ssh если её нет
-                await conn.run("mkdir -p ~/.ssh")
-                await conn.run("chmod 700 ~/.ssh")
-
-                # Добавляем публичный ключ в authorized_keys
-                # Используем grep для проверки, не добавлен ли уже этот ключ
-                public_key_clean = public_key.strip()
-
-                # Проверяем существование файла
-                result = await conn.run("test -f ~/.ssh/authorized_keys", check=False)
-
-                if result.exit_status != 0:
-                    # Файл не существует, создаем
-                    await conn.run(f'echo "{public_key_clean}" > ~/.ssh/authorized_keys')
-                    logger.info("Created new authorized_keys file")
-                else:
-                    # Файл существует, проверяем наличие ключа
-                    check_result = await conn.run(
-                        f'grep -F "{public_key_clean}" ~/.ssh/authorized_keys', check=False
-                    )
-
-                    if check_result.exit_status != 0:
-                        # Ключа нет, добавляем
-                        await conn.run(f'echo "{public_key_clean}" >> ~/.ssh/authorized_keys')
-                        logger.info("Appended key to authorized_keys")
-                    else:
-                        logger.info("Key already exists in authorized_keys")
-
-                # Устанавливаем правильные права доступа
-                await conn.run("chmod 600 ~/.ssh/authorized_keys")
+                # Все шаги одним exec: ключ подставляется через shlex.quote,
+                # повторная установка не дублирует строку в authorized_keys
+                await conn.run(_install_key_script(public_key.strip()), check=True)
 
                 logger.info(f"✓ Public key successfully installed on {host}")
                 return True
@@ -162,7 +228,12 @@ class SSHKeyManager:
             return False
 
     async def generate_and_install(
-        self, host: str, username: str, password: str, port: int = 22
+        self,
+        host: str,
+        username: str,
+        password: str,
+        port: int = 22,
+        tunnel: Optional[asyncssh.SSHClientConnection] = None,
     ) -> Optional[Tuple[str, str, bool]]:
         """
         Генерирует ключи и устанавливает публичный ключ на сервер
@@ -172,17 +243,23 @@ class SSHKeyManager:
             username: Имя пользователя
             password: Пароль для подключения
             port: SSH порт
+            tunnel: Открытое соединение с jump-хостом, через которое подключаться
 
         Returns:
             Optional[Tuple[str, str, bool]]: (private_key, public_key, success) или None
         """
         try:
             # Генерируем ключи
-            private_key, public_key = self.generate_key_pair()
+            private_key, public_key = await self.generate_key_pair_async()
 
             # Устанавливаем публичный ключ на сервер
             success = await self.install_public_key(
-                host=host, username=username, password=password, public_key=public_key, port=port
+                host=host,
+                username=username,
+                password=password,
+                public_key=public_key,
+                port=port,
+                tunnel=tunnel,
             )
 
             if success:
@@ -196,6 +273,38 @@ class SSHKeyManager:
             logger.error(f"Failed to generate and install SSH key: {e}")
             return None
 
+    async def bulk_provision(
+        self,
+        targets: Sequence[Tuple[str, str, str]],
+        port: int = 22,
+        tunnel: Optional[asyncssh.SSHClientConnection] = None,
+        concurrency: int = MAX_PARALLEL_PROVISION,
+    ) -> List[Optional[Tuple[str, str, bool]]]:
+        """
+        Генерирует и устанавливает ключи на несколько серверов параллельно
+
+        С tunnel все серверы подключаются через одно уже авторизованное
+        соединение с jump-хостом, и авторизация на нем не повторяется.
+
+        Args:
+            targets: Серверы в виде (host, username, password)
+            port: SSH порт
+            tunnel: Открытое соединение с jump-хостом
+            concurrency: Сколько серверов обрабатывать одновременно
+
+        Returns:
+            List: Результаты generate_and_install в порядке targets
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def provision(host: str, username: str, password: str):
+            async with semaphore:
+                return await self.generate_and_install(
+                    host, username, password, port=port, tunnel=tunnel
+                )
+
+        return list(await asyncio.gather(*(provision(*target) for target in targets)))
+
 
 def sync_generate_and_install(
     host: str, username: str, password: str, port: int = 22, key_type: str = SSHKeyType.ED25519
@@ -212,15 +321,10 @@ def sync_generate_and_install(
 
     Returns:
         Optional[Tuple[str, str, bool]]: (private_key, public_key, success) или None
-    """
-    import asyncio
 
+    Raises:
+        RuntimeError: Если вызвана из работающего event loop; там нужно
+            await SSHKeyManager.generate_and_install()
+    """
     manager = SSHKeyManager(key_type=key_type)
-
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-    return loop.run_until_complete(manager.generate_and_install(host, username, password, port))
+    return asyncio.run(manager.generate_and_install(host, username, password, port))
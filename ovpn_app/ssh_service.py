@@ -5,11 +5,16 @@ Provides secure SSH connectivity with proper abstraction and error handling.
 Follows SOLID principles and clean architecture patterns.
 """
 
+import asyncio
 import logging
+import posixpath
+import threading
+import time
 from abc import ABC, abstractmethod
-from contextlib import asynccontextmanager
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Protocol
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple, Union
 
 import asyncssh
 
@@ -17,6 +22,26 @@ from .models import OpenVPNServer
 
 logger = logging.getLogger(__name__)
 
+# Seconds between SSH keepalive requests on open connections
+KEEPALIVE_INTERVAL = 30
+# Seconds to wait for the liveness probe before a cached connection is dropped
+PROBE_TIMEOUT = 2
+# Prefer compression after authentication; configs, certificates and logs are text
+COMPRESSION_ALGS = ("zlib@openssh.com", "none")
+# Concurrent channels per connection; sshd's MaxSessions defaults to 10, keep one spare
+MAX_PARALLEL_CHANNELS = 9
+# Hosts contacted at once by SSHConnectionPool.run_many(), capped by the pool size
+MAX_PARALLEL_HOSTS = 20
+# Seconds a pooled connection may sit unused before it is closed
+POOL_IDLE_TTL = 300
+
+
+def _preview(command: str, limit: int = 120) -> str:
+    """Shorten a command for logging; batch scripts can be kilobytes long"""
+    if len(command) <= limit:
+        return command
+    return f"{command[:limit]}… ({len(command)} chars)"
+
 
 @dataclass
 class SSHCredentials:
@@ -114,7 +139,8 @@ class AsyncSSHConnection:
             raise SSHConnectionError("Connection is closed")
 
         try:
-            logger.info(f"Executing SSH command: {command}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Executing SSH command: %s", _preview(command))
             result = await self._connection.run(command)
 
             stdout_str = (
@@ -136,9 +162,20 @@ class AsyncSSHConnection:
                 success=result.exit_status == 0,
             )
         except Exception as e:
-            logger.error(f"SSH command execution failed: {e}")
+            logger.error("SSH command execution failed: %s", e)
             raise SSHCommandError(f"Command execution failed: {e}")
 
+    async def is_alive(self) -> bool:
+        """Check that the connection still runs commands (cheap ``true`` probe)"""
+        if self._closed:
+            return False
+        try:
+            result = await self._connection.run("true", timeout=PROBE_TIMEOUT)
+        except Exception as e:
+            logger.info("SSH connection liveness probe failed: %s", e)
+            return False
+        return result.exit_status == 0
+
     async def close(self) -> None:
         """Close SSH connection"""
         if not self._closed:
@@ -153,10 +190,16 @@ class SSHService(ISSHService):
 
     def __init__(self):
         self._connections: Dict[str, AsyncSSHConnection] = {}
+        # Connections held open by session(), reused by execute_command()
+        self._sessions: Dict[str, AsyncSSHConnection] = {}
+
+    @staticmethod
+    def _connection_key(credentials: SSHCredentials) -> str:
+        return f"{credentials.username}@{credentials.hostname}:{credentials.port}"
 
     async def create_connection(self, credentials: SSHCredentials) -> AsyncSSHConnection:
         """Create and return SSH connection"""
-        connection_key = f"{credentials.username}@{credentials.hostname}:{credentials.port}"
+        connection_key = self._connection_key(credentials)
 
         try:
             # Prepare connection options
@@ -165,6 +208,8 @@ class SSHService(ISSHService):
                 "port": credentials.port,
                 "username": credentials.username,
                 "known_hosts": None,  # In production, use proper known_hosts
+                "keepalive_interval": KEEPALIVE_INTERVAL,
+                "compression_algs": COMPRESSION_ALGS,
             }
 
             # Add authentication method
@@ -174,7 +219,7 @@ class SSHService(ISSHService):
                     key = asyncssh.import_private_key(credentials.private_key_content)
                     connect_kwargs["client_keys"] = [key]
                 except Exception as e:
-                    logger.error(f"Failed to import private key: {e}")
+                    logger.error("Failed to import private key: %s", e)
                     raise SSHConnectionError(f"Invalid private key format: {e}")
             elif credentials.private_key_path:
                 connect_kwargs["client_keys"] = [credentials.private_key_path]
@@ -184,27 +229,82 @@ class SSHService(ISSHService):
                 raise SSHConnectionError("No authentication method provided")
 
             # Create connection
-            logger.info(f"Creating SSH connection to {connection_key}")
+            logger.info("Creating SSH connection to %s", connection_key)
             conn = await asyncssh.connect(**connect_kwargs)
 
             ssh_connection = AsyncSSHConnection(conn)
             self._connections[connection_key] = ssh_connection
 
-            logger.info(f"SSH connection established to {connection_key}")
+            logger.info("SSH connection established to %s", connection_key)
             return ssh_connection
 
         except Exception as e:
-            logger.error(f"Failed to create SSH connection: {e}")
+            logger.error("Failed to create SSH connection: %s", e)
             raise SSHConnectionError(f"Connection failed: {e}")
 
     async def execute_command(self, credentials: SSHCredentials, command: str) -> CommandResult:
-        """Execute single command with temporary connection"""
+        """Execute single command on the open session or a temporary connection"""
+        key = self._connection_key(credentials)
+        session = self._sessions.get(key)
+        if session is not None:
+            try:
+                return await session.execute_command(command)
+            except SSHCommandError:
+                if self._sessions.get(key) is session and not await session.is_alive():
+                    # Connection lost mid-flow; later commands (and retries) reconnect
+                    del self._sessions[key]
+                raise
+
         connection = await self.create_connection(credentials)
         try:
             return await connection.execute_command(command)
         finally:
             await connection.close()
 
+    async def execute_commands_parallel(
+        self,
+        credentials: SSHCredentials,
+        commands: Sequence[str],
+        max_parallel: int = MAX_PARALLEL_CHANNELS,
+    ) -> List[CommandResult]:
+        """
+        Execute independent commands concurrently over one connection
+
+        Each command runs on its own channel of a shared session, at most
+        ``max_parallel`` at a time. Results are returned in command order.
+        """
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def run(command: str) -> CommandResult:
+            async with semaphore:
+                return await self.execute_command(credentials, command)
+
+        async with self.session(credentials):
+            return list(await asyncio.gather(*(run(command) for command in commands)))
+
+    @asynccontextmanager
+    async def session(self, credentials: SSHCredentials):
+        """
+        Keep one connection open for every command run with these credentials
+
+        Inside the block execute_command() reuses this connection instead of
+        connecting and authenticating per command; concurrent commands each get
+        their own channel on it. Nested blocks share the outer connection.
+        """
+        key = self._connection_key(credentials)
+        if key in self._sessions:
+            yield self._sessions[key]
+            return
+
+        connection = await self.create_connection(credentials)
+        self._sessions[key] = connection
+        try:
+            yield connection
+        finally:
+            if self._sessions.get(key) is connection:
+                del self._sessions[key]
+            await connection.close()
+
     async def download_file(self, credentials: SSHCredentials, remote_path: str) -> bytes:
         """
         Download file from remote server via SFTP
@@ -217,25 +317,56 @@ class SSHService(ISSHService):
             File content as bytes
 
         Raises:
+            FileNotFoundError: If the remote file does not exist
             SSHConnectionError: If download fails
         """
-        connection = await self.create_connection(credentials)
         try:
-            # Get the asyncssh connection object
-            conn = connection._connection
+            async with self.session(credentials) as connection:
+                # Get the asyncssh connection object
+                conn = connection._connection
+
+                # Open SFTP session and read file content
+                async with conn.start_sftp_client() as sftp:
+                    # Use open() to read file content directly into memory
+                    async with sftp.open(remote_path, 'rb') as remote_file:
+                        content = await remote_file.read()
+                        return content
+
+        except asyncssh.SFTPNoSuchFile as e:
+            raise FileNotFoundError(remote_path) from e
+        except Exception as e:
+            logger.error("Failed to download file %s: %s", remote_path, e)
+            raise SSHConnectionError(f"File download failed: {e}")
 
-            # Open SFTP session and read file content
-            async with conn.start_sftp_client() as sftp:
-                # Use open() to read file content directly into memory
-                async with sftp.open(remote_path, 'rb') as remote_file:
-                    content = await remote_file.read()
-                    return content
+    async def upload_file(
+        self, credentials: SSHCredentials, remote_path: str, content: str
+    ) -> None:
+        """
+        Write text content to a file on remote server via SFTP
+
+        Missing parent directories are created; relative paths start at the
+        user's home directory.
+
+        Args:
+            credentials: SSH credentials
+            remote_path: Path to file on remote server
+            content: File content
+
+        Raises:
+            SSHConnectionError: If upload fails
+        """
+        try:
+            async with self.session(credentials) as connection:
+                async with connection._connection.start_sftp_client() as sftp:
+                    directory = posixpath.dirname(remote_path)
+                    if directory:
+                        await sftp.makedirs(directory, exist_ok=True)
+                    async with sftp.open(remote_path, "w") as remote_file:
+                        await remote_file.write(content)
 
         except Exception as e:
-            logger.error(f"Failed to download file {remote_path}: {e}")
-            raise SSHConnectionError(f"File download failed: {e}")
-        finally:
-            await connection.close()
+            logger.error("Failed to upload file %s: %s", remote_path, e)
+            raise SSHConnectionError(f"File upload failed: {e}")
 
     @asynccontextmanager
     async def connection_context(self, credentials: SSHCredentials):
@@ -311,7 +442,9 @@ class OpenVPNCommandBuilder:
     @staticmethod
     def check_openvpn_installed() -> str:
         """Check if OpenVPN is installed"""
-        return "dpkg -l | grep openvpn"
+        return (
+            "dpkg-query -W -f='${Status}\\n' openvpn 2>/dev/null | grep -q 'install ok installed'"
+        )
 
     @staticmethod
     def check_openvpn_status() -> str:
@@ -376,44 +509,188 @@ explicit-exit-notify 1
 EOF"""
 
 
+# Pool key: the event loop a connection belongs to and "user@host:port"
+_PoolKey = Tuple[asyncio.AbstractEventLoop, str]
+# Pooled connection and the task that closes it when its loop shuts down
+_PoolEntry = Tuple[AsyncSSHConnection, "asyncio.Task[None]"]
+
+
 class SSHConnectionPool:
-    """Pool for managing SSH connections"""
+    """
+    Pool for managing SSH connections
+
+    Connections are bound to the event loop that opened them, so they are
+    pooled per loop. Views run each request in its own ``asyncio.run()``: the
+    connections of a request's loop are closed when that loop shuts down instead
+    of being left open. When full, the least recently used connection of the
+    running loop is evicted; connections idle for ``idle_ttl`` seconds are
+    closed on the next request instead of failing on first use.
 
-    def __init__(self, max_connections: int = 10):
+    The pool is shared by request threads, each with its own loop; the
+    bookkeeping is guarded by a thread lock.
+    """
+
+    def __init__(self, max_connections: int = 10, idle_ttl: float = POOL_IDLE_TTL):
         self._max_connections = max_connections
-        self._pool: Dict[str, AsyncSSHConnection] = {}
+        self._idle_ttl = idle_ttl
+        # Least recently used first
+        self._pool: "OrderedDict[_PoolKey, _PoolEntry]" = OrderedDict()
+        self._last_used: Dict[_PoolKey, float] = {}
+        # One lock per key so concurrent callers share a single connect
+        self._locks: Dict[_PoolKey, asyncio.Lock] = {}
         self._ssh_service = SSHService()
+        # Connections run_many() is still using; never evicted
+        self._busy: Counter = Counter()
+        self._mutex = threading.Lock()
 
     async def get_connection(self, credentials: SSHCredentials) -> AsyncSSHConnection:
         """Get connection from pool or create new one"""
-        key = self._get_connection_key(credentials)
+        loop = asyncio.get_running_loop()
+        key = (loop, self._get_connection_key(credentials))
+        await self._close_idle_connections()
 
-        if key in self._pool:
-            return self._pool[key]
+        lock = self._lock(key)
+        try:
+            async with lock:
+                entry = self._pool.get(key)
+                if entry is not None:
+                    if await entry[0].is_alive():
+                        self._touch(key)
+                        return entry[0]
+                    # Dropped by the server or the network; replace it
+                    await self._remove(key)
+
+                if len(self._pool) >= self._max_connections:
+                    await self._cleanup_oldest_connection()
+
+                connection = await self._ssh_service.create_connection(credentials)
+                closer = loop.create_task(self._close_with_loop(key, connection))
+                with self._mutex:
+                    self._pool[key] = (connection, closer)
+                self._touch(key)
+                return connection
+        finally:
+            # A failed connect leaves no entry; drop its lock, which pins the loop
+            with self._mutex:
+                if key not in self._pool and self._locks.get(key) is lock and not lock.locked():
+                    del self._locks[key]
+
+    def _lock(self, key: _PoolKey) -> asyncio.Lock:
+        with self._mutex:
+            return self._locks.setdefault(key, asyncio.Lock())
+
+    def _touch(self, key: _PoolKey) -> None:
+        """Mark a connection as most recently used"""
+        with self._mutex:
+            self._pool.move_to_end(key)
+            self._last_used[key] = time.monotonic()
+
+    def _in_use(self, key: _PoolKey) -> bool:
+        """Whether run_many() holds the connection or another caller is checking it out"""
+        lock = self._locks.get(key)
+        return bool(self._busy[key]) or (lock is not None and lock.locked())
+
+    def _keys_on_running_loop(self) -> List[_PoolKey]:
+        """Keys of the running loop, least recently used first"""
+        loop = asyncio.get_running_loop()
+        with self._mutex:
+            return [key for key in self._pool if key[0] is loop]
+
+    def _forget(self, key: _PoolKey, connection: AsyncSSHConnection) -> Optional[_PoolEntry]:
+        """Drop a key from the bookkeeping if it still holds ``connection``"""
+        with self._mutex:
+            entry = self._pool.get(key)
+            if entry is None or entry[0] is not connection:
+                return None
+            del self._pool[key]
+            self._last_used.pop(key, None)
+            lock = self._locks.get(key)
+            if lock is not None and not lock.locked():
+                del self._locks[key]
+            return entry
+
+    async def _remove(self, key: _PoolKey) -> None:
+        """Close a connection of the running loop and drop it from the pool"""
+        entry = self._pool.get(key)
+        if entry is not None and self._forget(key, entry[0]) is not None:
+            connection, closer = entry
+            closer.cancel()
+            await connection.close()
 
-        if len(self._pool) >= self._max_connections:
-            await self._cleanup_oldest_connection()
+    async def _close_with_loop(self, key: _PoolKey, connection: AsyncSSHConnection) -> None:
+        """Wait until the loop shuts down, then close the connection on it"""
+        try:
+            await asyncio.get_running_loop().create_future()
+        except asyncio.CancelledError:
+            # asyncio.run() cancels the tasks left on its loop and waits for them
+            self._forget(key, connection)
+            await connection.close()
 
-        connection = await self._ssh_service.create_connection(credentials)
-        self._pool[key] = connection
-        return connection
+    async def _close_idle_connections(self) -> None:
+        """Close connections nobody has used for longer than the idle TTL"""
+        expired = time.monotonic() - self._idle_ttl
+        for key in self._keys_on_running_loop():
+            if self._last_used.get(key, expired) < expired and not self._in_use(key):
+                await self._remove(key)
 
     def _get_connection_key(self, credentials: SSHCredentials) -> str:
         """Generate unique key for connection"""
         return f"{credentials.username}@{credentials.hostname}:{credentials.port}"
 
     async def _cleanup_oldest_connection(self) -> None:
-        """Remove oldest connection from pool"""
-        if self._pool:
-            key = next(iter(self._pool))
-            connection = self._pool.pop(key)
-            await connection.close()
+        """Remove least recently used connection of the running loop that is not in use"""
+        for key in self._keys_on_running_loop():
+            if not self._in_use(key):
+                await self._remove(key)
+                return
+
+    async def run_many(
+        self,
+        credentials_list: Sequence[SSHCredentials],
+        command: str,
+        concurrency: int = MAX_PARALLEL_HOSTS,
+    ) -> List[Union[CommandResult, BaseException]]:
+        """
+        Run one command on many servers concurrently
+
+        At most ``concurrency`` servers (no more than the pool size) are contacted
+        at once, over pooled connections. Results are returned in input order; a
+        server that fails yields its exception instead of aborting the rest.
+        """
+        semaphore = asyncio.Semaphore(max(1, min(concurrency, self._max_connections)))
+        loop = asyncio.get_running_loop()
+
+        async def run(credentials: SSHCredentials) -> CommandResult:
+            key = (loop, self._get_connection_key(credentials))
+            async with semaphore:
+                with self._mutex:
+                    self._busy[key] += 1
+                try:
+                    connection = await self.get_connection(credentials)
+                    return await connection.execute_command(command)
+                finally:
+                    with self._mutex:
+                        self._busy[key] -= 1
+                        if not self._busy[key]:
+                            del self._busy[key]
+
+        return list(
+            await asyncio.gather(
+                *(run(credentials) for credentials in credentials_list), return_exceptions=True
+            )
+        )
 
     async def close_all(self) -> None:
-        """Close all connections in pool"""
-        for connection in self._pool.values():
-            await connection.close()
-        self._pool.clear()
+        """Close all connections in pool; other loops close theirs on their own thread"""
+        loop = asyncio.get_running_loop()
+        with self._mutex:
+            entries = list(self._pool.items())
+        for key, (_connection, closer) in entries:
+            if key[0] is loop:
+                await self._remove(key)
+            else:
+                with suppress(RuntimeError):  # that loop is already closed
+                    key[0].call_soon_threadsafe(closer.cancel)
 
 
 # Dependency injection container
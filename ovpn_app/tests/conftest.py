@@ -2,10 +2,19 @@
 Test configuration and fixtures
 """
 
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+from ovpn_app.models import ClientCertificate, ClientCertificateMaterial, OpenVPNServer
 
-from ovpn_app.models import ClientCertificate, OpenVPNServer
+
+@pytest.fixture(autouse=True)
+def field_encryption_key(settings):
+    """Key for EncryptedTextField; there is no fallback to SECRET_KEY"""
+    settings.FIELD_ENCRYPTION_KEY = "test-field-encryption-key"
 
 
 @pytest.fixture
@@ -44,3 +53,28 @@ def test_client(db, test_server):
     return ClientCertificate.objects.create(
         server=test_server, name="test-client", email="test@example.com"
     )
+
+
+@pytest.fixture
+def vpn_server(db, admin_user):
+    """Create OpenVPN server with all required fields"""
+    return OpenVPNServer.objects.create(
+        name="VPN Server",
+        host="192.168.1.101",
+        ssh_username="test",
+        ssh_password="test123",
+        created_by=admin_user,
+    )
+
+
+@pytest.fixture
+def client_certificate(db, vpn_server, admin_user):
+    """Create active client certificate on vpn_server"""
+    client = ClientCertificate.objects.create(
+        server=vpn_server,
+        name="client-1",
+        expires_at=timezone.now() + timedelta(days=365),
+        created_by=admin_user,
+    )
+    ClientCertificateMaterial.objects.create(cert=client, client_cert="CERT", client_key="KEY")
+    return client
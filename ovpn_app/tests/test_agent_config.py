@@ -0,0 +1,56 @@
+"""
+Tests for the agent config helpers
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ovpn_app.config import agent_config
+from ovpn_app.config.agent_config import server_agent_config
+from ovpn_app.models import OpenVPNServer
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(agent_config, "_config_cache", {})
+
+
+def make_server():
+    return OpenVPNServer(
+        pk=1,
+        name="vpn",
+        host="10.0.0.1",
+        openvpn_port=1194,
+        openvpn_protocol="udp",
+        server_subnet="10.8.0.0",
+        server_netmask="255.255.255.0",
+        dns_servers=["1.1.1.1"],
+        updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+class TestServerAgentConfig:
+    """Tests for server_agent_config()"""
+
+    def test_reused_until_updated_at_changes(self):
+        """The cached config survives unsaved edits and is rebuilt after a save"""
+        server = make_server()
+        assert server_agent_config(server)["port"] == 1194
+
+        server.openvpn_port = 1195
+        assert server_agent_config(server)["port"] == 1194
+
+        server.updated_at += timedelta(seconds=1)
+        assert server_agent_config(server)["port"] == 1195
+
+    def test_returns_a_copy(self):
+        """Changing a returned config does not change the cached one"""
+        server = make_server()
+        config = server_agent_config(server)
+        config["server_host"] = server.host
+        config["dns_servers"].append("8.8.8.8")
+
+        cached = server_agent_config(server)
+        assert cached["dns_servers"] == ["1.1.1.1"]
+        assert "server_host" not in cached
@@ -0,0 +1,58 @@
+"""
+Tests for agent deployment
+"""
+
+import asyncio
+
+from ovpn_app.agent import deployment
+from ovpn_app.agent.deployment import AgentDeployer
+from ovpn_app.ssh_service import CommandResult, SSHCredentials
+
+CREDENTIALS = SSHCredentials(hostname="127.0.0.1", port=22, username="test")
+
+
+class RecordingSSHService:
+    """Records commands without running them"""
+
+    def __init__(self):
+        self.commands = []
+
+    async def execute_command(self, credentials, command):
+        self.commands.append(command)
+        await asyncio.sleep(0.01)
+        return CommandResult(stdout="", stderr="", exit_code=0, success=True)
+
+
+class TestEnsureAgent:
+    """Tests for AgentDeployer.ensure_agent()"""
+
+    def test_deploys_once_per_host(self, monkeypatch):
+        """Concurrent and later calls for the same host share one deploy"""
+        monkeypatch.setattr(deployment, "_deployed", set())
+        monkeypatch.setattr(deployment, "_deploying", {})
+        ssh = RecordingSSHService()
+        deployer = AgentDeployer(ssh)
+
+        async def run():
+            await asyncio.gather(*(deployer.ensure_agent(CREDENTIALS) for _ in range(3)))
+            return await deployer.ensure_agent(CREDENTIALS)
+
+        result = asyncio.run(run())
+
+        assert result.success
+        assert len(ssh.commands) == 1
+
+    def test_removed_agent_is_redeployed(self, monkeypatch):
+        """remove_agent() forgets the host"""
+        monkeypatch.setattr(deployment, "_deployed", set())
+        monkeypatch.setattr(deployment, "_deploying", {})
+        ssh = RecordingSSHService()
+        deployer = AgentDeployer(ssh)
+
+        asyncio.run(deployer.ensure_agent(CREDENTIALS))
+        asyncio.run(deployer.remove_agent(CREDENTIALS))
+        ssh.commands.clear()
+        asyncio.run(deployer.ensure_agent(CREDENTIALS))
+
+        assert len(ssh.commands) == 1
+        assert "ovpn-agent" in ssh.commands[0]
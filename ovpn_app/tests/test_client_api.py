@@ -0,0 +1,68 @@
+"""
+Tests for client certificate API views
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ovpn_app.api.viewsets import ClientCertificateViewSet
+from ovpn_app.models import CertificateAuthority, ClientCertificate
+
+
+@pytest.fixture
+def server_ca(vpn_server):
+    """CA for vpn_server, needed to render client configs"""
+    return CertificateAuthority.objects.create(
+        server=vpn_server,
+        ca_cert="CA",
+        ca_key="CAKEY",
+        organization="Org",
+        email="ca@example.com",
+        expires_at=timezone.now() + timedelta(days=365),
+    )
+
+
+@pytest.mark.django_db
+class TestClientCertificateViewSet:
+    """Tests for ClientCertificateViewSet"""
+
+    def _create(self, user, **data):
+        request = APIRequestFactory().post("/", data, format="json")
+        force_authenticate(request, user=user)
+        return ClientCertificateViewSet.as_view({"post": "create"})(request)
+
+    def test_create_then_generate_config(self, vpn_server, server_ca, admin_user):
+        """A client created through the API has material for config generation"""
+        response = self._create(
+            admin_user,
+            server=vpn_server.pk,
+            name="api-client",
+            expires_at=(timezone.now() + timedelta(days=30)).isoformat(),
+            created_by=admin_user.pk,
+            client_cert="CERT",
+            client_key="KEY",
+        )
+
+        assert response.status_code == 201, response.data
+        assert response.data["client_cert"] == "CERT"
+        client = ClientCertificate.objects.with_config_relations().get(name="api-client")
+        for config in (
+            client.generate_config(),
+            ClientCertificateViewSet()._generate_client_config(client),
+        ):
+            assert "<cert>\nCERT\n</cert>" in config
+            assert "<key>\nKEY\n</key>" in config
+
+    def test_create_with_material_defaults_to_empty(self, vpn_server, server_ca, admin_user):
+        """Agent-managed clients get an empty material row instead of none"""
+        client = ClientCertificate.objects.create_with_material(
+            server=vpn_server,
+            name="agent-client",
+            expires_at=timezone.now() + timedelta(days=30),
+            created_by=admin_user,
+        )
+
+        assert "<cert>\n\n</cert>" in client.generate_config()
@@ -0,0 +1,92 @@
+"""
+Tests for exceptions
+"""
+
+import pickle
+
+import pytest
+
+from ovpn_app.exceptions import (
+    CertificateNotFoundError,
+    ErrorSeverity,
+    OpenVPNAppError,
+    OpenVPNConfigurationError,
+    OpenVPNError,
+    OpenVPNInstallationError,
+    Result,
+    SSHCommandError,
+    SSHConnectionError,
+)
+
+
+class TestOpenVPNAppError:
+    """Tests for exception args, repr and pickling"""
+
+    def test_args_hold_constructor_fields(self):
+        """args and repr carry the raw fields while str() formats the message"""
+        error = SSHConnectionError("h", "boom")
+
+        assert error.args == ("h", "boom")
+        assert repr(error) == "SSHConnectionError('h', 'boom')"
+        assert str(error) == "Failed to connect to h: boom"
+
+    def test_pickle_round_trip(self):
+        """Domain errors survive pickling with their fields and severity"""
+        for error in (
+            SSHConnectionError("h", "boom"),
+            SSHCommandError("ls", 2, "denied"),
+            CertificateNotFoundError("client1"),
+            OpenVPNAppError("plain", ErrorSeverity.CRITICAL),
+        ):
+            restored = pickle.loads(pickle.dumps(error))
+
+            assert type(restored) is type(error)
+            assert restored.args == error.args
+            assert str(restored) == str(error)
+            assert restored.severity == error.severity
+
+
+class TestOpenVPNInstallationErrors:
+    """Tests for the install/configure error classes"""
+
+    def test_separate_classes(self):
+        """Installation and configuration errors are distinct OpenVPNError subclasses"""
+        error = OpenVPNInstallationError("srv", "apt failed")
+
+        assert OpenVPNInstallationError.__bases__ == (OpenVPNError,)
+        assert OpenVPNConfigurationError.__bases__ == (OpenVPNError,)
+        assert str(error) == "Failed to install OpenVPN on server 'srv': apt failed"
+        assert not isinstance(error, OpenVPNConfigurationError)
+        configuration = OpenVPNConfigurationError("srv")
+        assert str(configuration) == "Failed to configure OpenVPN on server 'srv'"
+
+    def test_pickle_round_trip(self):
+        """Fields survive pickling"""
+        restored = pickle.loads(pickle.dumps(OpenVPNInstallationError("srv", "apt failed")))
+
+        assert type(restored) is OpenVPNInstallationError
+        assert restored.args == ("srv", "apt failed")
+        assert restored.reason == "apt failed"
+
+
+class TestResult:
+    """Tests for Result unwrapping"""
+
+    def test_unwrap(self):
+        """Successful results unwrap to their data, None included"""
+        assert Result.ok(5).unwrap() == 5
+        assert Result.ok(None).unwrap() is None
+        assert Result(success=True).unwrap() is None
+        with pytest.raises(ValueError):
+            Result.fail("nope").unwrap()
+
+    def test_unwrap_or_falls_back_without_data(self):
+        """unwrap_or returns the default for failures and for results without data"""
+        assert Result.ok(5).unwrap_or(0) == 5
+        assert Result.ok(None).unwrap_or(0) == 0
+        assert Result.fail("nope").unwrap_or(0) == 0
+
+    def test_map_skips_results_without_data(self):
+        """map treats a missing payload the same way unwrap_or does"""
+        assert Result.ok(2).map(lambda x: Result.ok(x * 2)).unwrap() == 4
+        assert Result(success=True).map(lambda x: Result.ok(x)).is_failure()
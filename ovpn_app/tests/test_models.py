@@ -2,9 +2,23 @@
 Tests for models
 """
 
+from datetime import timedelta
+
 import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
 
-from ovpn_app.models import ClientCertificate, OpenVPNServer, VPNConnection
+from ovpn_app.fields import encrypt_value
+from ovpn_app.models import (
+    CertificateAuthority,
+    ClientCertificate,
+    ClientCertificateMaterial,
+    OpenVPNServer,
+    ServerTask,
+    VPNConnection,
+)
 
 
 @pytest.mark.django_db
@@ -103,3 +117,325 @@ class TestVPNConnection:
 
         formatted = connection.format_duration()
         assert isinstance(formatted, str)
+
+
+@pytest.mark.django_db
+class TestClientCertificateRevocation:
+    """Test certificate revocation helpers"""
+
+    def test_revoke_sets_status_and_timestamp(self, client_certificate):
+        """Test single certificate revocation is persisted"""
+        client_certificate.revoke()
+        client_certificate.refresh_from_db()
+
+        assert client_certificate.status == "revoked"
+        assert client_certificate.revoked_at is not None
+
+    def test_bulk_revoke_only_touches_active(self, client_certificate, vpn_server, admin_user):
+        """Test bulk revocation skips already revoked certificates"""
+        revoked = ClientCertificate.objects.create(
+            server=vpn_server,
+            name="client-2",
+            status="revoked",
+            expires_at=client_certificate.expires_at,
+            created_by=admin_user,
+        )
+
+        count = ClientCertificate.bulk_revoke([client_certificate.pk, revoked.pk])
+
+        client_certificate.refresh_from_db()
+        assert count == 1
+        assert client_certificate.status == "revoked"
+        assert client_certificate.revoked_at is not None
+
+
+@pytest.mark.django_db
+class TestClientCertificateQuerySet:
+    """Test ClientCertificate queryset helpers"""
+
+    def test_active_matches_is_valid(self, client_certificate, vpn_server, admin_user):
+        """Test active() filters the same rows as is_valid()"""
+        expired = ClientCertificate.objects.create(
+            server=vpn_server,
+            name="expired",
+            expires_at=timezone.now() - timedelta(days=1),
+            created_by=admin_user,
+        )
+
+        active = list(ClientCertificate.objects.active())
+        annotated = {c.pk: c.is_valid_db for c in ClientCertificate.objects.with_is_valid()}
+
+        assert active == [client_certificate]
+        assert annotated == {client_certificate.pk: True, expired.pk: False}
+        assert client_certificate.is_valid() and not expired.is_valid()
+
+
+class TestFormatBytes:
+    """Test VPNConnection.format_bytes"""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            (0, "0.00 B"),
+            (1023, "1023.00 B"),
+            (1024, "1.00 KB"),
+            (1536, "1.50 KB"),
+            (1024**2, "1.00 MB"),
+            (5 * 1024**3, "5.00 GB"),
+            (2 * 1024**4, "2.00 TB"),
+            (2048 * 1024**4, "2048.00 TB"),
+        ],
+    )
+    def test_format_bytes(self, value, expected):
+        """Test unit selection and rounding"""
+        assert VPNConnection.format_bytes(value) == expected
+
+
+class TestFormatDuration:
+    """Test VPNConnection.format_duration with an injected timestamp"""
+
+    @pytest.mark.parametrize(
+        "delta,expected",
+        [
+            (timedelta(seconds=42), "42s"),
+            (timedelta(minutes=5, seconds=3), "5m 3s"),
+            (timedelta(hours=2, minutes=7, seconds=9), "2h 7m"),
+            (timedelta(days=1, hours=3, minutes=4), "1d 3h 4m"),
+        ],
+    )
+    def test_format_duration(self, delta, expected):
+        """Test formatting relative to a shared ``now``"""
+        now = timezone.now()
+        connection = VPNConnection(connected_at=now - delta)
+
+        assert connection.format_duration(now) == expected
+
+
+@pytest.mark.django_db
+class TestClientCertificateMaterial:
+    """Tests for the split-out certificate/key material"""
+
+    def test_generate_config_reads_material(self, client_certificate):
+        """Config embeds PEM blobs from ClientCertificateMaterial"""
+        CertificateAuthority.objects.create(
+            server=client_certificate.server,
+            ca_cert="CA",
+            ca_key="CAKEY",
+            organization="Org",
+            email="ca@example.com",
+            expires_at=timezone.now() + timedelta(days=365),
+        )
+        client = ClientCertificate.objects.with_config_relations().get(pk=client_certificate.pk)
+
+        config = client.generate_config()
+
+        assert "<cert>\nCERT\n</cert>" in config
+        assert "<key>\nKEY\n</key>" in config
+
+    def test_material_deleted_with_certificate(self, client_certificate):
+        """Material rows cascade with their certificate"""
+        client_certificate.delete()
+
+        assert not ClientCertificateMaterial.objects.exists()
+
+
+@pytest.mark.django_db
+class TestServerTask:
+    """Tests for ServerTask JSON payloads"""
+
+    def test_mark_completed_accepts_datetime_result(self, vpn_server, admin_user):
+        """Results with datetimes are serialized instead of raising TypeError"""
+        task = ServerTask.objects.create(
+            server=vpn_server, task_type="install", task_id="task-1", created_by=admin_user
+        )
+        finished = timezone.now()
+
+        task.mark_completed({"finished": finished})
+        task.refresh_from_db()
+
+        assert task.status == "completed"
+        assert task.result == {"finished": DjangoJSONEncoder().default(finished)}
+
+
+@pytest.mark.django_db
+class TestListViewQuerySets:
+    """Tests for list_view() helpers"""
+
+    def test_server_list_view_skips_secrets(self, vpn_server):
+        """SSH secrets are deferred on server lists"""
+        server = OpenVPNServer.objects.list_view().get(pk=vpn_server.pk)
+
+        assert {"ssh_password", "ssh_private_key"} <= server.get_deferred_fields()
+        assert server.name == vpn_server.name
+
+    def test_task_list_view_skips_payloads(self, vpn_server, admin_user):
+        """JSON payloads are deferred on task lists"""
+        ServerTask.objects.create(
+            server=vpn_server, task_type="install", task_id="task-1", created_by=admin_user
+        )
+
+        task = ServerTask.objects.list_view().get(task_id="task-1")
+
+        assert task.get_deferred_fields() == {"parameters", "result", "error_message"}
+
+
+@pytest.mark.django_db
+class TestEncryptedSecrets:
+    """Tests for encrypted SSH secrets on OpenVPNServer"""
+
+    def test_secrets_encrypted_at_rest(self, vpn_server):
+        """Database holds ciphertext, the model exposes plaintext"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT ssh_password FROM ovpn_app_openvpnserver WHERE id = %s", [vpn_server.pk]
+            )
+            (stored,) = cursor.fetchone()
+
+        assert stored != "test123"
+        assert OpenVPNServer.objects.get(pk=vpn_server.pk).ssh_password == "test123"
+
+    def test_plaintext_rows_still_readable(self, vpn_server):
+        """Rows written before encryption load unchanged"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE ovpn_app_openvpnserver SET ssh_password = %s WHERE id = %s",
+                ["legacy", vpn_server.pk],
+            )
+
+        assert OpenVPNServer.objects.get(pk=vpn_server.pk).ssh_password == "legacy"
+
+    def _stored_password(self, server):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT ssh_password FROM ovpn_app_openvpnserver WHERE id = %s", [server.pk]
+            )
+            return cursor.fetchone()[0]
+
+    def test_prefixed_plaintext_is_encrypted(self, vpn_server):
+        """A secret that merely looks like a token is still encrypted"""
+        vpn_server.ssh_password = "aesgcm:not-a-token"
+        vpn_server.save()
+
+        assert self._stored_password(vpn_server) != "aesgcm:not-a-token"
+        assert OpenVPNServer.objects.get(pk=vpn_server.pk).ssh_password == "aesgcm:not-a-token"
+
+    def test_key_is_independent_of_secret_key(self, vpn_server, settings):
+        """Rotating SECRET_KEY keeps stored secrets readable"""
+        settings.SECRET_KEY = "rotated"
+
+        assert OpenVPNServer.objects.get(pk=vpn_server.pk).ssh_password == "test123"
+
+    def test_missing_key_is_an_error(self, settings):
+        """Without FIELD_ENCRYPTION_KEY secrets are not silently keyed by SECRET_KEY"""
+        settings.FIELD_ENCRYPTION_KEY = None
+
+        with pytest.raises(ImproperlyConfigured):
+            encrypt_value("secret")
+
+
+@pytest.mark.django_db
+class TestClientCertificateBulkImport:
+    """Tests for ClientCertificate.objects.bulk_import()"""
+
+    def test_creates_and_updates(self, client_certificate, vpn_server, admin_user):
+        """New names are inserted, existing ones get fresh material and expiry"""
+        expires_at = timezone.now() + timedelta(days=30)
+        specs = [
+            {"name": "client-1", "cert": "NEWCERT", "key": "NEWKEY", "expires_at": expires_at},
+            {"name": "client-2", "cert": "CERT2", "key": "KEY2", "expires_at": expires_at},
+        ]
+
+        count = ClientCertificate.objects.bulk_import(vpn_server, specs, admin_user)
+
+        assert count == 2
+        clients = {c.name: c for c in ClientCertificate.objects.select_related("material")}
+        assert set(clients) == {"client-1", "client-2"}
+        assert clients["client-1"].pk == client_certificate.pk
+        assert clients["client-1"].expires_at == expires_at
+        assert clients["client-1"].material.client_cert == "NEWCERT"
+        assert clients["client-2"].material.client_key == "KEY2"
+
+
+@pytest.mark.django_db
+class TestRecordTraffic:
+    """Tests for VPNConnection.record_traffic()"""
+
+    def test_adds_deltas(self, client_certificate):
+        """Counters are incremented in the database"""
+        conn = VPNConnection.objects.create(
+            client=client_certificate,
+            client_ip="192.168.1.10",
+            virtual_ip="10.8.0.2",
+            bytes_received=100,
+            bytes_sent=50,
+        )
+
+        updated = VPNConnection.record_traffic(conn.pk, rx=10, tx=5)
+        conn.refresh_from_db()
+
+        assert updated == 1
+        assert (conn.bytes_received, conn.bytes_sent) == (110, 55)
+
+
+@pytest.mark.django_db
+class TestServerWithActiveClients:
+    """Tests for OpenVPNServer.objects.with_active_clients()"""
+
+    def test_prefetches_only_active(
+        self, client_certificate, vpn_server, admin_user, django_assert_num_queries
+    ):
+        """Revoked certificates are excluded and no extra queries are made"""
+        ClientCertificate.objects.create(
+            server=vpn_server,
+            name="client-revoked",
+            status="revoked",
+            revoked_at=timezone.now(),
+            expires_at=client_certificate.expires_at,
+            created_by=admin_user,
+        )
+
+        with django_assert_num_queries(2):
+            server = OpenVPNServer.objects.with_active_clients().get(pk=vpn_server.pk)
+            names = [(c.name, c.created_by.username) for c in server.active_clients]
+
+        assert names == [("client-1", admin_user.username)]
+
+
+@pytest.mark.django_db
+class TestDNSServersList:
+    """Tests for OpenVPNServer.get_dns_servers_list()"""
+
+    def test_configured_servers_returned(self, vpn_server):
+        """Configured DNS servers are returned as-is"""
+        vpn_server.dns_servers = ["1.1.1.1"]
+
+        assert vpn_server.get_dns_servers_list() == ["1.1.1.1"]
+
+    @pytest.mark.parametrize("value", [[], None, "8.8.8.8"])
+    def test_fallback_to_defaults(self, vpn_server, value):
+        """Empty or malformed values fall back to the public resolvers"""
+        vpn_server.dns_servers = value
+
+        assert vpn_server.get_dns_servers_list() == ["8.8.8.8", "8.8.4.4"]
+
+
+@pytest.mark.django_db
+class TestMarkExpired:
+    """Tests for ClientCertificate.mark_expired()"""
+
+    def test_only_past_active_certificates(self, client_certificate, vpn_server, admin_user):
+        """Active certificates past expiry become expired, others are untouched"""
+        expired = ClientCertificate.objects.create(
+            server=vpn_server,
+            name="client-old",
+            expires_at=timezone.now() - timedelta(days=1),
+            created_by=admin_user,
+        )
+
+        count = ClientCertificate.mark_expired()
+        expired.refresh_from_db()
+        client_certificate.refresh_from_db()
+
+        assert count == 1
+        assert expired.status == "expired"
+        assert client_certificate.status == "active"
@@ -0,0 +1,585 @@
+"""
+Tests for openvpn_service_simple
+"""
+
+import asyncio
+import shlex
+import subprocess
+import time
+from contextlib import asynccontextmanager
+
+from ovpn_app import openvpn_service_simple
+from ovpn_app.openvpn_service_simple import (
+    _RELOAD_SERVER,
+    _SUDO_CHECK,
+    PROBE_CACHE_TTL,
+    SETUP_PHASE_DEPENDENCIES,
+    SUDO_REQUIRED_EXIT_CODE,
+    CertificateRevocationService,
+    OpenVPNClientManager,
+    OpenVPNConfigurator,
+    OpenVPNInstaller,
+    OpenVPNManager,
+    build_batch_script,
+    cached_probe,
+    exec_retry,
+    failed_command,
+)
+from ovpn_app.ssh_service import (
+    CommandResult,
+    SSHCommandError,
+    SSHConnectionError,
+    SSHCredentials,
+)
+
+
+class FakeSSHService:
+    """Runs commands with the local bash and records them"""
+
+    def __init__(self):
+        self.commands = []
+        self.uploads = {}
+        self.sessions = 0
+
+    @asynccontextmanager
+    async def session(self, credentials):
+        self.sessions += 1
+        yield
+
+    async def upload_file(self, credentials, remote_path, content):
+        self.uploads[remote_path] = content
+
+    async def execute_command(self, credentials, command):
+        self.commands.append(command)
+        proc = subprocess.run(["bash", "-c", command], capture_output=True, text=True)
+        return CommandResult(
+            stdout=proc.stdout,
+            stderr=proc.stderr,
+            exit_code=proc.returncode,
+            success=proc.returncode == 0,
+        )
+
+
+class RecordingSSHService(FakeSSHService):
+    """Records commands without running them"""
+
+    async def execute_command(self, credentials, command):
+        self.commands.append(command)
+        return CommandResult(stdout="", stderr="", exit_code=0, success=True)
+
+
+CREDENTIALS = SSHCredentials(hostname="127.0.0.1", port=22, username="test")
+
+
+class TestBatchScript:
+    """Tests for build_batch_script() / failed_command()"""
+
+    def test_stops_at_first_failure(self, tmp_path):
+        """A failing command inside an && list stops the script"""
+        script = build_batch_script(
+            [f"cd {tmp_path} && echo one", "cd /nonexistent && echo two", "echo three"]
+        )
+
+        proc = subprocess.run(["bash", "-c", script], capture_output=True, text=True)
+
+        assert proc.returncode != 0
+        assert "one" in proc.stdout
+        assert "three" not in proc.stdout
+        assert failed_command(proc.stdout) == "cd /nonexistent && echo two"
+
+    def test_working_directory_carries_over(self, tmp_path):
+        """A cd step applies to the following commands of the same batch"""
+        script = build_batch_script([f"cd {tmp_path}", "pwd"])
+
+        proc = subprocess.run(["bash", "-c", script], capture_output=True, text=True)
+
+        assert proc.stdout.splitlines()[-1] == str(tmp_path)
+
+    def test_heredoc_commands(self, tmp_path):
+        """Heredoc bodies are written verbatim"""
+        target = tmp_path / "out.conf"
+        script = build_batch_script([f"cat > {target} << 'EOF'\nport $PORT\nEOF"])
+
+        proc = subprocess.run(["bash", "-c", script], capture_output=True, text=True)
+
+        assert proc.returncode == 0
+        assert target.read_text() == "port $PORT\n"
+
+
+class TestConfigureOpenVPN:
+    """Tests for OpenVPNConfigurator.configure_openvpn()"""
+
+    def test_phases_report_failed_command(self, monkeypatch):
+        """Each phase is one exec, dependents of a failed phase are skipped"""
+        ssh = FakeSSHService()
+        configurator = OpenVPNConfigurator(ssh)
+        phases = {name: [f"echo {name}"] for name in SETUP_PHASE_DEPENDENCIES}
+        phases["ca"] = ["true", "false", "true"]
+        monkeypatch.setattr(configurator, "get_setup_phases", lambda *args: phases)
+
+        result = asyncio.run(configurator.configure_openvpn(CREDENTIALS, {}))
+
+        assert len(ssh.commands) == len(phases) - 1
+        assert ssh.sessions == 1
+        assert not any("echo copy" in command for command in ssh.commands)
+        assert not result.success
+        assert result.message.endswith(": false")
+
+    def test_setup_commands_cover_all_phases(self):
+        """The flat command list keeps every phase command in phase order"""
+        configurator = OpenVPNConfigurator(FakeSSHService())
+        phases = configurator.get_setup_phases({})
+
+        commands = configurator.get_setup_commands({})
+
+        assert list(phases) == list(SETUP_PHASE_DEPENDENCIES)
+        assert commands == [c for name in SETUP_PHASE_DEPENDENCIES for c in phases[name]]
+
+    def test_setup_phases_are_cached_per_config(self):
+        """Equal configs share one phase mapping, different configs do not"""
+        configurator = OpenVPNConfigurator(FakeSSHService())
+        config = {"port": 1194, "protocol": "tcp", "dns_servers": ["1.1.1.1"]}
+
+        first = configurator.get_setup_phases(config)
+
+        assert configurator.get_setup_phases(dict(config)) is first
+        assert configurator.get_setup_phases({**config, "port": 443}) is not first
+
+    def test_existing_pki_is_not_regenerated(self, tmp_path):
+        """Keys and certificates that already exist are not generated again"""
+        easy_rsa = tmp_path / "easy-rsa"
+        for name in ("pki/ca.crt", "pki/private/server.key", "pki/issued/server.crt", "ta.key"):
+            (easy_rsa / name).parent.mkdir(parents=True, exist_ok=True)
+            (easy_rsa / name).touch()
+        easyrsa = easy_rsa / "easyrsa"
+        easyrsa.write_text('#!/bin/sh\necho "$@" >> calls\n')
+        easyrsa.chmod(0o755)
+        phases = OpenVPNConfigurator(RecordingSSHService()).get_setup_phases({})
+        script = build_batch_script([*phases["pki_init"], *phases["ca"], *phases["ta"]])
+
+        proc = subprocess.run(
+            ["bash", "-c", script], capture_output=True, text=True, env={"HOME": str(tmp_path)}
+        )
+
+        assert proc.returncode == 0
+        assert (easy_rsa / "calls").read_text() == "gen-crl\n"
+
+    def test_server_conf_is_uploaded(self):
+        """server.conf goes over SFTP and is installed by the server_conf phase"""
+        ssh = RecordingSSHService()
+        configurator = OpenVPNConfigurator(ssh)
+        config = {"protocol": "tcp", "dns_servers": ["1.1.1.1"]}
+        server_conf = configurator.get_setup_files(config)["server_conf"]["server.conf.tmp"]
+
+        asyncio.run(configurator.configure_openvpn(CREDENTIALS, config))
+
+        assert ssh.uploads == {"server.conf.tmp": server_conf}
+        assert 'push "dhcp-option DNS 1.1.1.1"\n' in server_conf
+        assert "explicit-exit-notify" not in server_conf
+        assert not any("<< 'EOF'" in command for command in ssh.commands)
+
+
+class TestCheckOpenVPNInstalled:
+    """Tests for OpenVPNInstaller.check_openvpn_installed()"""
+
+    def test_uses_exit_code_of_dpkg_query(self):
+        """Only the single package is queried and the exit code decides"""
+
+        class StubSSHService:
+            async def execute_command(self, credentials, command):
+                self.command = command
+                return CommandResult(stdout="", stderr="", exit_code=0, success=True)
+
+        ssh = StubSSHService()
+
+        installed = asyncio.run(OpenVPNInstaller(ssh).check_openvpn_installed(CREDENTIALS))
+
+        assert installed
+        assert ssh.command.startswith("dpkg-query -W")
+
+
+class TestRevokeCertificate:
+    """Tests for CertificateRevocationService.revoke_certificate()"""
+
+    class StubSSHService(FakeSSHService):
+        """Returns a canned revocation batch (or raises it)"""
+
+        def __init__(self, batch_stdout, batch_exit_code=0):
+            super().__init__()
+            self.batch = CommandResult(
+                stdout=batch_stdout,
+                stderr="" if batch_exit_code == 0 else "failed",
+                exit_code=batch_exit_code,
+                success=batch_exit_code == 0,
+            )
+
+        async def execute_command(self, credentials, command):
+            self.commands.append(command)
+            if isinstance(self.batch, Exception):
+                raise self.batch
+            return self.batch
+
+    def revoke(self, ssh):
+        service = CertificateRevocationService(ssh)
+        return asyncio.run(service.revoke_certificate(CREDENTIALS, "alice"))
+
+    def test_output_is_command_transcript(self):
+        """Disconnect and revocation run as one exec and report its transcript"""
+        ssh = self.StubSSHService("$ cd ~/easy-rsa\n$ ./easyrsa gen-crl\nok\n")
+
+        result = self.revoke(ssh)
+
+        assert result.success
+        assert len(ssh.commands) == 1
+        assert ssh.commands[0].startswith("bash -c")
+        assert "kill alice" in ssh.commands[0]
+        assert "./easyrsa revoke alice" in ssh.commands[0]
+        assert result.stdout == "$ cd ~/easy-rsa\n$ ./easyrsa gen-crl\nok"
+
+    def test_disconnect_failure_does_not_stop_revocation(self):
+        """The client may not be connected; the kill step never fails the batch"""
+        ssh = RecordingSSHService()
+
+        asyncio.run(CertificateRevocationService(ssh).revoke_certificate(CREDENTIALS, "alice"))
+        script = ssh.commands[0]
+
+        assert "sudo nc -w 1 localhost 7505 2>/dev/null || true" in script
+        assert script.index("kill alice") < script.index("./easyrsa revoke alice")
+
+    def test_lost_connection_is_not_retried(self):
+        """A dropped connection may already have revoked the certificate"""
+        ssh = self.StubSSHService("")
+        ssh.batch = SSHCommandError("connection lost")
+
+        result = self.revoke(ssh)
+
+        assert not result.success
+        assert len(ssh.commands) == 1
+
+    def test_failed_reload_is_not_an_error(self):
+        """The certificate stays revoked if OpenVPN could not be reloaded"""
+        ssh = self.StubSSHService(f"$ {_RELOAD_SERVER}\n", 1)
+
+        assert self.revoke(ssh).success
+
+    def test_failed_revoke_is_reported(self):
+        """Any other failed step fails the revocation"""
+        ssh = self.StubSSHService("$ ./easyrsa gen-crl\n", 1)
+
+        result = self.revoke(ssh)
+
+        assert not result.success
+        assert result.stderr == "failed"
+
+
+class TestDownloadClientConfig:
+    """Tests for OpenVPNClientManager.download_client_config()"""
+
+    class StubSSHService:
+        def __init__(self, content=None):
+            self.content = content
+
+        async def download_file(self, credentials, remote_path):
+            self.remote_path = remote_path
+            if self.content is None:
+                raise FileNotFoundError(remote_path)
+            return self.content
+
+    def test_returns_file_bytes(self):
+        """The SFTP bytes are returned as-is"""
+        ssh = self.StubSSHService(content=b"client\r\n\xd0\x9f")
+
+        result = asyncio.run(OpenVPNClientManager(ssh).download_client_config(CREDENTIALS, "bob"))
+
+        assert result == (True, "bob.ovpn", b"client\r\n\xd0\x9f")
+        assert ssh.remote_path == "client-configs/files/bob.ovpn"
+
+    def test_missing_file(self):
+        """A missing file is reported as a failed download"""
+        ssh = self.StubSSHService()
+
+        result = asyncio.run(OpenVPNClientManager(ssh).download_client_config(CREDENTIALS, "bob"))
+
+        assert result == (False, "", b"")
+
+
+class TestInstallOpenVPN:
+    """Tests for OpenVPNInstaller.install_openvpn()"""
+
+    class StubSSHService(FakeSSHService):
+        def __init__(self, batch_stdout, batch_exit_code):
+            super().__init__()
+            self.batch = CommandResult(
+                stdout=batch_stdout,
+                stderr="",
+                exit_code=batch_exit_code,
+                success=batch_exit_code == 0,
+            )
+
+        async def execute_command(self, credentials, command):
+            self.commands.append(command)
+            if command.startswith("bash -c"):
+                return self.batch
+            # Package not installed yet
+            return CommandResult(stdout="", stderr="", exit_code=1, success=False)
+
+        def package_checks(self):
+            return sum(command.startswith("dpkg-query") for command in self.commands)
+
+    def test_successful_batch_is_not_reverified(self):
+        """A clean batch exit skips the post-install package check"""
+        ssh = self.StubSSHService("$ echo done\n", 0)
+
+        result = asyncio.run(OpenVPNInstaller(ssh).install_openvpn(CREDENTIALS))
+
+        assert result.success
+        assert ssh.package_checks() == 1
+
+    def test_failed_sudo_step_is_verified(self):
+        """A failed sudo step falls back to checking the package"""
+        ssh = self.StubSSHService("$ sudo apt update -y\n", 1)
+
+        result = asyncio.run(OpenVPNInstaller(ssh).install_openvpn(CREDENTIALS))
+
+        assert not result.success
+        assert ssh.package_checks() == 2
+
+    def test_sudo_check_exit_code(self):
+        """Without usable sudo the batch stops with the dedicated exit code"""
+        script = build_batch_script([_SUDO_CHECK, "echo installed"])
+
+        proc = subprocess.run(
+            ["/bin/bash", "-c", script], capture_output=True, text=True, env={"PATH": ""}
+        )
+
+        assert proc.returncode == SUDO_REQUIRED_EXIT_CODE
+        assert "installed" not in proc.stdout
+        assert proc.stderr.strip() == "SUDO_FAIL"
+
+    def test_sudo_check_runs_inside_the_batch(self):
+        """Exit code 77 from the leading sudo check reports missing sudo"""
+        ssh = self.StubSSHService(f"$ {_SUDO_CHECK}\n", SUDO_REQUIRED_EXIT_CODE)
+
+        result = asyncio.run(OpenVPNInstaller(ssh).install_openvpn(CREDENTIALS))
+
+        assert not result.success
+        assert result.error == "Sudo access denied - passwordless sudo required"
+        assert len(ssh.commands) == 2
+        assert ssh.package_checks() == 1
+
+
+class TestCreateClient:
+    """Tests for OpenVPNClientManager.create_client()"""
+
+    def test_failed_upload_is_reported(self):
+        """A failed SFTP upload stops the flow and names the file"""
+
+        class StubSSHService(FakeSSHService):
+            async def upload_file(self, credentials, remote_path, content):
+                raise SSHConnectionError("permission denied")
+
+        ssh = StubSSHService()
+
+        result = asyncio.run(
+            OpenVPNClientManager(ssh).create_client(CREDENTIALS, "bob", "1.2.3.4", 1194, "udp")
+        )
+
+        assert not result.success
+        assert result.message.endswith(": upload client-configs/base.conf")
+        assert ssh.commands == []
+
+    def test_bulk_create_serializes_signing(self):
+        """Clients are provisioned concurrently but sign-req runs one at a time"""
+
+        class SlowSSHService(RecordingSSHService):
+            active = {"gen-req": 0, "sign-req": 0}
+            peak = {"gen-req": 0, "sign-req": 0}
+
+            async def execute_command(self, credentials, command):
+                step = next((s for s in self.active if s in command), None)
+                if step:
+                    self.active[step] += 1
+                    self.peak[step] = max(self.peak[step], self.active[step])
+                await asyncio.sleep(0.01)
+                if step:
+                    self.active[step] -= 1
+                return await super().execute_command(credentials, command)
+
+        ssh = SlowSSHService()
+        names = ["alice", "bob", "carol"]
+
+        results = asyncio.run(
+            OpenVPNClientManager(ssh).create_clients(CREDENTIALS, names, "1.2.3.4", 1194, "udp")
+        )
+
+        assert [r.message for r in results] == [f"Клиент {name} успешно создан" for name in names]
+        assert ssh.peak == {"gen-req": 3, "sign-req": 1}
+        assert len(ssh.uploads) == 2
+        assert ssh.sessions == 1
+
+
+class TestGetStatus:
+    """Tests for OpenVPNManager.get_status()"""
+
+    class StubSSHService:
+        def __init__(self, stdout, exit_code, stderr=""):
+            self.result = CommandResult(
+                stdout=stdout, stderr=stderr, exit_code=exit_code, success=exit_code == 0
+            )
+
+        async def execute_command(self, credentials, command):
+            self.command = command
+            return self.result
+
+    def test_active(self):
+        """Only the state word is fetched and compared"""
+        ssh = self.StubSSHService("active\n", 0)
+
+        status = asyncio.run(OpenVPNManager(ssh).get_status(CREDENTIALS))
+
+        assert ssh.command == "systemctl is-active openvpn@server"
+        assert status == {"running": True, "output": "active", "error": None}
+
+    def test_inactive_is_not_an_error(self):
+        """A non-zero exit for a stopped service is not reported as an error"""
+        ssh = self.StubSSHService("inactive\n", 3)
+
+        status = asyncio.run(OpenVPNManager(ssh).get_status(CREDENTIALS))
+
+        assert status == {"running": False, "output": "inactive", "error": None}
+
+
+class TestExecRetry:
+    """Tests for exec_retry()"""
+
+    class FlakySSHService:
+        def __init__(self, outcomes):
+            self.outcomes = list(outcomes)
+            self.calls = 0
+
+        async def execute_command(self, credentials, command):
+            self.calls += 1
+            outcome = self.outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return CommandResult(stdout="", stderr="", exit_code=outcome, success=outcome == 0)
+
+    def test_retries_transient_failures_with_backoff(self, monkeypatch):
+        """Connection errors and transient exit codes are retried with growing delays"""
+        delays = []
+
+        async def sleep(delay):
+            delays.append(delay)
+
+        monkeypatch.setattr(asyncio, "sleep", sleep)
+        ssh = self.FlakySSHService([SSHCommandError("connection lost"), 255, 0])
+
+        result = asyncio.run(exec_retry(ssh, CREDENTIALS, "true"))
+
+        assert result.success
+        assert ssh.calls == 3
+        assert 1.0 <= delays[0] <= 1.5
+        assert 2.0 <= delays[1] <= 3.0
+
+    def test_other_failures_are_returned_immediately(self):
+        """A regular non-zero exit is not retried"""
+        ssh = self.FlakySSHService([1])
+
+        result = asyncio.run(exec_retry(ssh, CREDENTIALS, "false"))
+
+        assert result.exit_code == 1
+        assert ssh.calls == 1
+
+
+class TestKillClientConnection:
+    """Tests for CertificateRevocationService.kill_client_connection()"""
+
+    STATUS = (
+        "TITLE,OpenVPN 2.6\n"
+        "CLIENT_LIST,bob-laptop,1.2.3.4:5000,10.8.0.3\n"
+        "CLIENT_LIST,bob,1.2.3.5:5000,10.8.0.2\n"
+        "END\n"
+    )
+
+    class ManagementStub(FakeSSHService):
+        """Feeds canned management output into the real awk filter"""
+
+        def __init__(self, status_path):
+            super().__init__()
+            self.status_path = status_path
+
+        async def execute_command(self, credentials, command):
+            if "'status 2'" in command:
+                nc = "echo 'status 2' | sudo nc -w 1 localhost 7505 2>/dev/null"
+                command = command.replace(nc, f"cat {self.status_path}")
+                return await super().execute_command(credentials, command)
+            self.commands.append(command)
+            return CommandResult(stdout="SUCCESS", stderr="", exit_code=0, success=True)
+
+    def kill(self, tmp_path, status, client_name):
+        status_path = tmp_path / "status"
+        status_path.write_text(status)
+        ssh = self.ManagementStub(status_path)
+        service = CertificateRevocationService(ssh)
+        return ssh, asyncio.run(service.kill_client_connection(CREDENTIALS, client_name))
+
+    def test_exact_common_name_is_killed(self, tmp_path):
+        """The CN must match the whole field, not a substring of another CN"""
+        ssh, result = self.kill(tmp_path, self.STATUS, "bob")
+
+        assert result.success
+        assert ssh.commands[-1].startswith("echo 'kill bob'")
+
+    def test_common_name_is_quoted(self, tmp_path):
+        """A CN with shell metacharacters reaches the management interface as one word"""
+        status = "CLIENT_LIST,o'brien;id,1.2.3.4:5000,10.8.0.4\nEND\n"
+        ssh, result = self.kill(tmp_path, status, "o'brien;id")
+
+        assert result.success
+        assert shlex.split(ssh.commands[-1])[:3] == ["echo", "kill o'brien;id", "|"]
+
+    def test_client_not_connected(self, tmp_path):
+        """A CN that only prefixes a connected one is reported as not connected"""
+        ssh, result = self.kill(tmp_path, self.STATUS, "bo")
+
+        assert result.success
+        assert result.stdout == "Client bo is not currently connected"
+        assert not any("kill" in command for command in ssh.commands)
+
+    def test_management_interface_unavailable(self, tmp_path):
+        """No output from the management interface is an error"""
+        _, result = self.kill(tmp_path, "", "bob")
+
+        assert not result.success
+        assert result.stderr == "Management interface not accessible"
+
+
+class TestCachedProbe:
+    """Tests for cached_probe()"""
+
+    def test_only_success_is_cached(self, monkeypatch):
+        """A passing probe is not re-run within the TTL, a failing one is"""
+        monkeypatch.setattr(openvpn_service_simple, "_probe_cache", {})
+        ssh = RecordingSSHService()
+
+        assert asyncio.run(cached_probe(ssh, CREDENTIALS, "sudo -n true"))
+        assert asyncio.run(cached_probe(ssh, CREDENTIALS, "sudo -n true"))
+        assert ssh.commands == ["sudo -n true"]
+
+        other_host = SSHCredentials(hostname="10.0.0.2", port=22, username="test")
+        failing = TestExecRetry.FlakySSHService([1, 1])
+        assert not asyncio.run(cached_probe(failing, other_host, "sudo -n true"))
+        assert not asyncio.run(cached_probe(failing, other_host, "sudo -n true"))
+        assert failing.calls == 2
+
+    def test_expired_entry_is_rechecked(self, monkeypatch):
+        """After the TTL the probe runs again"""
+        monkeypatch.setattr(openvpn_service_simple, "_probe_cache", {})
+        ssh = RecordingSSHService()
+        asyncio.run(cached_probe(ssh, CREDENTIALS, "sudo -n true"))
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + PROBE_CACHE_TTL + 1)
+
+        asyncio.run(cached_probe(ssh, CREDENTIALS, "sudo -n true"))
+
+        assert len(ssh.commands) == 2
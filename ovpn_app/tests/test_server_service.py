@@ -0,0 +1,94 @@
+"""
+Tests for ServerManagementService
+"""
+
+import asyncio
+
+from ovpn_app.models import OpenVPNServer
+from ovpn_app.services.server_service import ServerManagementService
+from ovpn_app.ssh_service import CommandResult, SSHCommandError, SSHConnectionPool
+
+
+def make_server(host="10.0.0.1"):
+    return OpenVPNServer(
+        name=host, host=host, ssh_port=22, ssh_username="root", ssh_password="secret"
+    )
+
+
+class FakeConnection:
+    """Stands in for a pooled AsyncSSHConnection"""
+
+    def __init__(self, host):
+        self.host = host
+        self.commands = []
+        self.closed = False
+
+    async def is_alive(self):
+        return not self.closed
+
+    async def execute_command(self, command):
+        self.commands.append(command)
+        if self.host == "10.0.0.2":
+            raise SSHCommandError("connection lost")
+        if "stop" in command:
+            return CommandResult(stdout="", stderr="not loaded", exit_code=5, success=False)
+        return CommandResult(stdout=f"{self.host} ok", stderr="", exit_code=0, success=True)
+
+    async def close(self):
+        self.closed = True
+
+
+def fake_pool(monkeypatch):
+    pool = SSHConnectionPool()
+    connections = []
+
+    async def create_connection(credentials):
+        connections.append(FakeConnection(credentials.hostname))
+        return connections[-1]
+
+    monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+    return pool, connections
+
+
+class TestServiceControl:
+    """Tests for ServerManagementService.start()/stop()/restart()"""
+
+    def test_commands_share_a_connection_per_loop(self, monkeypatch):
+        """Calls in one loop reuse a connection that is closed when the loop ends"""
+        pool, connections = fake_pool(monkeypatch)
+        service = ServerManagementService(make_server(), connection_pool=pool)
+
+        async def run():
+            return [await service.start(), await service.restart()]
+
+        started, restarted = asyncio.run(run())
+        stopped = asyncio.run(service.stop())
+
+        assert started == {"success": True, "output": "10.0.0.1 ok", "error": ""}
+        assert restarted["success"]
+        assert stopped == {"success": False, "output": "", "error": "not loaded"}
+        assert [c.commands for c in connections] == [
+            ["sudo systemctl start openvpn@server", "sudo systemctl restart openvpn@server"],
+            ["sudo systemctl stop openvpn@server"],
+        ]
+        assert all(connection.closed for connection in connections)
+        assert not pool._pool
+
+
+class TestBulkRestart:
+    """Tests for ServerManagementService.bulk_restart()"""
+
+    def test_results_in_order_with_failures(self, monkeypatch):
+        """A failing server is reported without aborting the others"""
+        pool, connections = fake_pool(monkeypatch)
+        servers = [make_server("10.0.0.1"), make_server("10.0.0.2"), make_server("10.0.0.3")]
+
+        results = asyncio.run(ServerManagementService.bulk_restart(servers, connection_pool=pool))
+
+        assert results == [
+            {"success": True, "output": "10.0.0.1 ok", "error": ""},
+            {"success": False, "output": "", "error": "connection lost"},
+            {"success": True, "output": "10.0.0.3 ok", "error": ""},
+        ]
+        assert all(c.commands == ["sudo systemctl restart openvpn@server"] for c in connections)
+        assert all(connection.closed for connection in connections)
@@ -0,0 +1,329 @@
+"""
+Tests for ssh_service
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from ovpn_app import ssh_service
+from ovpn_app.ssh_service import (
+    CommandResult,
+    SSHCommandError,
+    SSHConnectionPool,
+    SSHCredentials,
+    SSHService,
+)
+
+CREDENTIALS = SSHCredentials(hostname="127.0.0.1", port=22, username="test", password="x")
+
+
+class FakeConnection:
+    """Stands in for AsyncSSHConnection and records its commands"""
+
+    def __init__(self):
+        self.commands = []
+        self.closed = False
+
+    async def execute_command(self, command):
+        self.commands.append(command)
+        return CommandResult(stdout="", stderr="", exit_code=0, success=True)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestSSHServiceSession:
+    """Tests for SSHService.session()"""
+
+    def test_commands_share_one_connection(self, monkeypatch):
+        """Commands inside a session reuse its connection, outside they reconnect"""
+        service = SSHService()
+        connections = []
+
+        async def create_connection(credentials):
+            connections.append(FakeConnection())
+            return connections[-1]
+
+        monkeypatch.setattr(service, "create_connection", create_connection)
+
+        async def run():
+            async with service.session(CREDENTIALS):
+                await service.execute_command(CREDENTIALS, "one")
+                async with service.session(CREDENTIALS):
+                    await asyncio.gather(
+                        service.execute_command(CREDENTIALS, "two"),
+                        service.execute_command(CREDENTIALS, "three"),
+                    )
+                assert not connections[0].closed
+            await service.execute_command(CREDENTIALS, "four")
+
+        asyncio.run(run())
+
+        assert len(connections) == 2
+        assert connections[0].commands == ["one", "two", "three"]
+        assert connections[0].closed
+        assert connections[1].commands == ["four"]
+
+    def test_parallel_commands_keep_order_and_limit(self, monkeypatch):
+        """Results follow command order and at most max_parallel run at once"""
+        service = SSHService()
+        running = []
+        peak = []
+
+        class SlowConnection(FakeConnection):
+            async def execute_command(self, command):
+                running.append(command)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(command)
+                return CommandResult(stdout=command, stderr="", exit_code=0, success=True)
+
+        async def create_connection(credentials):
+            return SlowConnection()
+
+        monkeypatch.setattr(service, "create_connection", create_connection)
+        commands = [f"cmd{i}" for i in range(7)]
+
+        results = asyncio.run(service.execute_commands_parallel(CREDENTIALS, commands, 3))
+
+        assert [r.stdout for r in results] == commands
+        assert max(peak) == 3
+
+    def test_lost_session_is_dropped(self, monkeypatch):
+        """After the session connection dies, commands open their own connections"""
+        service = SSHService()
+        connections = []
+
+        class DeadConnection(FakeConnection):
+            async def execute_command(self, command):
+                raise SSHCommandError("connection lost")
+
+            async def is_alive(self):
+                return False
+
+        async def create_connection(credentials):
+            connections.append(DeadConnection() if not connections else FakeConnection())
+            return connections[-1]
+
+        monkeypatch.setattr(service, "create_connection", create_connection)
+
+        async def run():
+            async with service.session(CREDENTIALS):
+                with pytest.raises(SSHCommandError):
+                    await service.execute_command(CREDENTIALS, "one")
+                await service.execute_command(CREDENTIALS, "two")
+
+        asyncio.run(run())
+
+        assert connections[1].commands == ["two"]
+        assert connections[0].closed
+
+
+class TestCreateConnection:
+    """Tests for SSHService.create_connection()"""
+
+    def test_connection_options(self, monkeypatch):
+        """Connections use keepalives and negotiate compression"""
+        captured = {}
+
+        async def connect(**kwargs):
+            captured.update(kwargs)
+            return object()
+
+        monkeypatch.setattr(ssh_service.asyncssh, "connect", connect)
+
+        asyncio.run(SSHService().create_connection(CREDENTIALS))
+
+        assert captured["compression_algs"] == ("zlib@openssh.com", "none")
+        assert captured["keepalive_interval"] == 30
+        assert captured["password"] == "x"
+
+
+class TestSSHConnectionPool:
+    """Tests for SSHConnectionPool.get_connection()"""
+
+    class LiveConnection(FakeConnection):
+        async def is_alive(self):
+            return True
+
+    def test_reused_within_a_loop_closed_with_it(self, monkeypatch):
+        """A live connection is reused on its own loop and closed when the loop ends"""
+        pool = SSHConnectionPool()
+        connections = []
+
+        async def create_connection(credentials):
+            connections.append(self.LiveConnection())
+            return connections[-1]
+
+        monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+
+        async def get_twice():
+            first = await pool.get_connection(CREDENTIALS)
+            return first, await pool.get_connection(CREDENTIALS)
+
+        first, second = asyncio.run(get_twice())
+        third = asyncio.run(pool.get_connection(CREDENTIALS))
+
+        assert first is second
+        assert third is not first
+        assert len(connections) == 2
+        assert first.closed and third.closed
+        assert not pool._pool
+
+    def test_run_many_limits_hosts_and_keeps_busy_connections(self, monkeypatch):
+        """run_many caps concurrency at the pool size and never evicts a connection in use"""
+        pool = SSHConnectionPool(max_connections=2)
+        running = 0
+        peak = 0
+
+        class SlowConnection(self.LiveConnection):
+            async def execute_command(self, command):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                if self.host == "bad":
+                    raise SSHCommandError("boom")
+                assert not self.closed
+                return await super().execute_command(f"{self.host}:{command}")
+
+        async def create_connection(credentials):
+            connection = SlowConnection()
+            connection.host = credentials.hostname
+            return connection
+
+        monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+        hosts = ["a", "b", "bad", "c", "d"]
+        credentials = [
+            SSHCredentials(hostname=host, port=22, username="test", password="x") for host in hosts
+        ]
+
+        async def run():
+            results = await pool.run_many(credentials, "restart", concurrency=5)
+            assert len(pool._pool) == 2
+            return results
+
+        results = asyncio.run(run())
+
+        assert peak == 2
+        assert isinstance(results[2], SSHCommandError)
+        assert [r.success for i, r in enumerate(results) if i != 2] == [True] * 4
+
+    def test_evicts_least_recently_used_and_idle(self, monkeypatch):
+        """A full pool evicts the least recently used connection; idle ones expire"""
+        pool = SSHConnectionPool(max_connections=2)
+        connections = {}
+
+        async def create_connection(credentials):
+            connections[credentials.hostname] = self.LiveConnection()
+            return connections[credentials.hostname]
+
+        monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+        clock = [1000.0]
+        monkeypatch.setattr(ssh_service.time, "monotonic", lambda: clock[0])
+
+        def credentials(host):
+            return SSHCredentials(hostname=host, port=22, username="test", password="x")
+
+        async def run():
+            await pool.get_connection(credentials("a"))
+            await pool.get_connection(credentials("b"))
+            await pool.get_connection(credentials("a"))
+            await pool.get_connection(credentials("c"))
+            assert connections["b"].closed and not connections["a"].closed
+
+            clock[0] += ssh_service.POOL_IDLE_TTL + 1
+            await pool.get_connection(credentials("d"))
+            assert connections["a"].closed and connections["c"].closed
+            assert [key for _loop, key in pool._pool] == ["test@d:22"]
+
+        asyncio.run(run())
+
+    def test_concurrent_callers_share_one_connect(self, monkeypatch):
+        """Concurrent requests for the same server wait for a single connection"""
+        pool = SSHConnectionPool()
+        connections = []
+
+        async def create_connection(credentials):
+            await asyncio.sleep(0.01)
+            connections.append(self.LiveConnection())
+            return connections[-1]
+
+        monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+
+        async def run():
+            return await asyncio.gather(*(pool.get_connection(CREDENTIALS) for _ in range(3)))
+
+        results = asyncio.run(run())
+
+        assert len(connections) == 1
+        assert all(result is connections[0] for result in results)
+
+    def test_threads_keep_their_own_connections(self, monkeypatch):
+        """Loops on different threads never share, replace or close each other's connections"""
+        pool = SSHConnectionPool()
+        connections = []
+
+        async def create_connection(credentials):
+            connections.append(self.LiveConnection())
+            return connections[-1]
+
+        monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+        opened = threading.Barrier(2)
+        seen = []
+
+        def request():
+            async def run():
+                connection = await pool.get_connection(CREDENTIALS)
+                await asyncio.get_running_loop().run_in_executor(None, opened.wait)
+                assert await pool.get_connection(CREDENTIALS) is connection
+                assert not connection.closed
+                seen.append(connection)
+
+            asyncio.run(run())
+
+        threads = [threading.Thread(target=request) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(seen) == 2 and seen[0] is not seen[1]
+        assert all(connection.closed for connection in connections)
+        assert not pool._pool
+
+    def test_failed_connect_leaves_no_lock(self, monkeypatch):
+        """Polling an unreachable server does not keep a lock (and its loop) per call"""
+        pool = SSHConnectionPool()
+
+        async def create_connection(credentials):
+            raise ssh_service.SSHConnectionError("unreachable")
+
+        monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+
+        for _ in range(5):
+            with pytest.raises(ssh_service.SSHConnectionError):
+                asyncio.run(pool.get_connection(CREDENTIALS))
+
+        assert not pool._locks
+        assert not pool._pool
+
+    def test_close_all(self, monkeypatch):
+        """close_all() closes the running loop's connections right away"""
+        pool = SSHConnectionPool()
+
+        async def create_connection(credentials):
+            return self.LiveConnection()
+
+        monkeypatch.setattr(pool._ssh_service, "create_connection", create_connection)
+
+        async def run():
+            connection = await pool.get_connection(CREDENTIALS)
+            await pool.close_all()
+            assert connection.closed
+            assert not pool._pool
+
+        asyncio.run(run())
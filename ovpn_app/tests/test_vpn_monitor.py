@@ -0,0 +1,51 @@
+"""
+Tests for vpn_monitor
+"""
+
+import asyncio
+
+from ovpn_app.models import OpenVPNServer
+from ovpn_app.ssh_service import CommandResult
+from ovpn_app.vpn_monitor import VPNMonitor
+
+
+class LoadConnection:
+    """Stands in for AsyncSSHConnection and answers every command with a load average"""
+
+    def __init__(self):
+        self.commands = []
+        self.closed = False
+
+    async def execute_command(self, command):
+        self.commands.append(command)
+        return CommandResult(stdout="0.1 0.2 0.3 1/100 42", stderr="", exit_code=0, success=True)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestVPNMonitorSession:
+    """Tests for VPNMonitor.session()"""
+
+    def test_calls_share_one_connection(self, monkeypatch):
+        """Monitor calls inside a session run over a single SSH connection"""
+        server = OpenVPNServer(host="127.0.0.1", ssh_username="test", ssh_private_key="key")
+        monitor = VPNMonitor(server)
+        connections = []
+
+        async def create_connection(credentials):
+            connections.append(LoadConnection())
+            return connections[-1]
+
+        monkeypatch.setattr(monitor.ssh_service, "create_connection", create_connection)
+
+        async def run():
+            async with monitor.session():
+                return await monitor.get_system_load(), await monitor.get_server_uptime()
+
+        load, _ = asyncio.run(run())
+
+        assert load == "0.1 0.2 0.3"
+        assert len(connections) == 1
+        assert len(connections[0].commands) == 2
+        assert connections[0].closed
@@ -28,6 +28,9 @@ class DashboardView(LoginRequiredMixin, ListView):
     context_object_name = "servers"
     model = OpenVPNServer
 
+    def get_queryset(self):
+        return OpenVPNServer.objects.list_view()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
@@ -38,7 +41,7 @@ class DashboardView(LoginRequiredMixin, ListView):
                 "running_servers": OpenVPNServer.objects.filter(status="running").count(),
                 "total_clients": ClientCertificate.objects.count(),
                 "active_connections": VPNConnection.objects.count(),
-                "recent_tasks": ServerTask.objects.select_related("server")[:5],
+                "recent_tasks": ServerTask.objects.list_view().select_related("server")[:5],
             }
         )
 
@@ -54,7 +57,7 @@ class ServerListView(LoginRequiredMixin, ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        queryset = OpenVPNServer.objects.all()
+        queryset = OpenVPNServer.objects.list_view()
         search_query = self.request.GET.get("search")
 
         if search_query:
@@ -74,14 +77,17 @@ class ServerDetailView(LoginRequiredMixin, DetailView):
     template_name = "ovpn_app/server_detail.html"
     context_object_name = "server"
 
+    def get_queryset(self):
+        return OpenVPNServer.objects.with_active_clients()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        server = self.get_object()
+        server = self.object
 
         context.update(
             {
                 "clients": server.clients.all()[:10],
-                "active_clients_count": server.clients.filter(revoked_at__isnull=True).count(),
+                "active_clients_count": len(server.active_clients),
                 "recent_tasks": server.tasks.all()[:5],
                 "active_connections": VPNConnection.objects.filter(client__server=server).count(),
             }
@@ -342,7 +348,7 @@ class ConnectionListView(LoginRequiredMixin, ListView):
         context = super().get_context_data(**kwargs)
 
         # Get all servers for filter
-        context["servers"] = OpenVPNServer.objects.all()
+        context["servers"] = OpenVPNServer.objects.list_view()
 
         # Statistics
         connections = self.get_queryset()
@@ -362,7 +368,7 @@ class ConnectionListView(LoginRequiredMixin, ListView):
 @login_required
 def monitoring_view(request):
     """Real-time monitoring page"""
-    servers = OpenVPNServer.objects.all()  # Show all servers, not just running
+    servers = OpenVPNServer.objects.list_view()  # Show all servers, not just running
     return render(request, "ovpn_app/monitoring.html", {"servers": servers})
 
 
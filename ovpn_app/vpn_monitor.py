@@ -3,9 +3,14 @@ VPN Connection Monitor Service
 Monitors OpenVPN server status and updates connection records
 """
 
+import asyncio
 import logging
+from datetime import datetime
+from datetime import timezone as dt_timezone
 from typing import Dict, List, Optional
 
+from asgiref.sync import sync_to_async
+from dateutil import parser as date_parser
 
 from .models import ClientCertificate, OpenVPNServer, VPNConnection
 from .ssh_service import SSHCredentials, SSHService
@@ -26,18 +31,24 @@ class VPNMonitor:
             private_key_content=server.ssh_private_key,
         )
 
+    def session(self):
+        """
+        Keep one SSH connection open for the monitor calls inside the block
+
+        Each call then runs on its own channel of that connection instead of
+        connecting and authenticating again.
+        """
+        return self.ssh_service.session(self.credentials)
+
     async def get_active_connections(self) -> List[Dict]:
         """
         Get active connections from OpenVPN status
         Returns list of connection dictionaries
         """
         try:
-            # Create SSH connection
-            conn = await self.ssh_service.create_connection(self.credentials)
-
             # Read OpenVPN status file
             status_cmd = "sudo cat /var/log/openvpn/openvpn-status.log 2>/dev/null || sudo openvpn-status 2>/dev/null"
-            result = await conn.execute_command(status_cmd)
+            result = await self.ssh_service.execute_command(self.credentials, status_cmd)
 
             if result.exit_code != 0:
                 logger.warning(f"Could not read status for {self.server.name}: {result.stderr}")
@@ -55,12 +66,9 @@ class VPNMonitor:
         Returns: 'running', 'stopped', or 'error'
         """
         try:
-            # Create SSH connection
-            conn = await self.ssh_service.create_connection(self.credentials)
-
             # Check OpenVPN service status
             status_cmd = "sudo systemctl is-active openvpn@server 2>/dev/null || sudo systemctl is-active openvpn 2>/dev/null"
-            result = await conn.execute_command(status_cmd)
+            result = await self.ssh_service.execute_command(self.credentials, status_cmd)
 
             status_output = result.stdout.strip()
 
@@ -71,7 +79,7 @@ class VPNMonitor:
             else:
                 # Try alternative check via process
                 ps_cmd = "ps aux | grep -v grep | grep openvpn"
-                ps_result = await conn.execute_command(ps_cmd)
+                ps_result = await self.ssh_service.execute_command(self.credentials, ps_cmd)
 
                 if ps_result.exit_code == 0 and ps_result.stdout.strip():
                     return "running"
@@ -88,8 +96,6 @@ class VPNMonitor:
             status = await self.check_server_status()
 
             # Update in database
-            from asgiref.sync import sync_to_async
-
             @sync_to_async
             def update_status():
                 self.server.status = status
@@ -104,10 +110,10 @@ class VPNMonitor:
     async def get_server_uptime(self) -> Optional[str]:
         """Get server uptime"""
         try:
-            conn = await self.ssh_service.create_connection(self.credentials)
-
             # Get uptime
-            result = await conn.execute_command("uptime -p 2>/dev/null || uptime")
+            result = await self.ssh_service.execute_command(
+                self.credentials, "uptime -p 2>/dev/null || uptime"
+            )
 
             if result.exit_code == 0:
                 uptime_str = result.stdout.strip()
@@ -124,10 +130,10 @@ class VPNMonitor:
     async def get_system_load(self) -> Optional[str]:
         """Get system load average"""
         try:
-            conn = await self.ssh_service.create_connection(self.credentials)
-
             # Get load average from /proc/loadavg
-            result = await conn.execute_command("cat /proc/loadavg 2>/dev/null")
+            result = await self.ssh_service.execute_command(
+                self.credentials, "cat /proc/loadavg 2>/dev/null"
+            )
 
             if result.exit_code == 0:
                 # Format: 0.52 0.58 0.59 1/820 29386
@@ -144,23 +150,17 @@ class VPNMonitor:
     async def get_openvpn_uptime(self) -> Optional[str]:
         """Get OpenVPN service uptime"""
         try:
-            conn = await self.ssh_service.create_connection(self.credentials)
-
             # Get service start time
-            result = await conn.execute_command(
+            result = await self.ssh_service.execute_command(
+                self.credentials,
                 "systemctl show openvpn@server -p ActiveEnterTimestamp --value 2>/dev/null || "
-                "systemctl show openvpn -p ActiveEnterTimestamp --value 2>/dev/null"
+                "systemctl show openvpn -p ActiveEnterTimestamp --value 2>/dev/null",
             )
 
             if result.exit_code == 0 and result.stdout.strip():
-                from datetime import datetime
-                from datetime import timezone as dt_timezone
-
-                from dateutil import parser
-
                 try:
                     # Parse timestamp
-                    start_time = parser.parse(result.stdout.strip())
+                    start_time = date_parser.parse(result.stdout.strip())
                     now = datetime.now(dt_timezone.utc)
 
                     # Calculate duration
@@ -235,8 +235,6 @@ class VPNMonitor:
         Update VPNConnection records based on current server status
         Also updates server status (running/stopped)
         """
-        from asgiref.sync import sync_to_async
-
         logger.info(f"Updating connections for {self.server.name}")
 
         # First, update server status
@@ -279,10 +277,6 @@ class VPNMonitor:
                 virtual_ip = "10.8.0.0"  # Default fallback
 
             # Parse connected_since timestamp
-            from datetime import timezone as dt_timezone
-
-            from dateutil import parser as date_parser
-
             connected_at = None
             try:
                 # Parse OpenVPN timestamp: "2025-11-11 23:05:27"
@@ -316,7 +310,15 @@ class VPNMonitor:
                     existing.virtual_ip = virtual_ip
                     existing.bytes_received = conn_data["bytes_received"]
                     existing.bytes_sent = conn_data["bytes_sent"]
-                    existing.save()
+                    existing.save(
+                        update_fields=[
+                            "client_ip",
+                            "virtual_ip",
+                            "bytes_received",
+                            "bytes_sent",
+                            "last_seen",
+                        ]
+                    )
                     return existing, False
                 else:
                     # Create new connection with parsed timestamp
@@ -353,12 +355,9 @@ class VPNMonitor:
     async def _get_virtual_ip(self, client_name: str) -> Optional[str]:
         """Get virtual IP for client from routing table"""
         try:
-            # Create SSH connection
-            conn = await self.ssh_service.create_connection(self.credentials)
-
             # Try to get IP from status routing table
             status_cmd = "sudo cat /var/log/openvpn/openvpn-status.log 2>/dev/null"
-            result = await conn.execute_command(status_cmd)
+            result = await self.ssh_service.execute_command(self.credentials, status_cmd)
 
             if result.exit_code == 0:
                 # Parse routing table section
@@ -393,7 +392,6 @@ class VPNMonitor:
 
 async def monitor_all_servers():
     """Monitor all running OpenVPN servers"""
-    from asgiref.sync import sync_to_async
 
     # Get servers synchronously
     @sync_to_async
@@ -405,14 +403,13 @@ async def monitor_all_servers():
     for server in servers:
         try:
             monitor = VPNMonitor(server)
-            await monitor.update_connections()
+            async with monitor.session():
+                await monitor.update_connections()
         except Exception as e:
             logger.error(f"Error monitoring {server.name}: {e}")
 
 
 def sync_monitor_all_servers():
     """Synchronous wrapper for monitor_all_servers"""
-    import asyncio
-
     # Use asyncio.run() which creates a new event loop
     asyncio.run(monitor_all_servers())
@@ -18,6 +18,11 @@ environ.Env.read_env(BASE_DIR / ".env")
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = env("SECRET_KEY", default="django-insecure-change-this-in-production")
 
+# Key for encrypted model fields (SSH secrets); required, independent of SECRET_KEY.
+# Changing it makes stored secrets unreadable. Databases written before this
+# setting was required were encrypted with SECRET_KEY: set this to that value.
+FIELD_ENCRYPTION_KEY = env("FIELD_ENCRYPTION_KEY", default=None)
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env("DEBUG", default=True)
 
@@ -162,6 +167,9 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Run asyncio.run() loops (SSH calls) on uvloop when it is installed
+USE_UVLOOP = env.bool("USE_UVLOOP", default=True)
+
 # Celery Configuration
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default="redis://localhost:6379/0")